@@ -0,0 +1 @@
+# Benchmarks de bout en bout : serveur de sitemaps synthétique et mesure du pipeline d'analyse
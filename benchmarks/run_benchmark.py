@@ -0,0 +1,205 @@
+"""
+Benchmark de bout en bout - découverte, crawl et traitement des URLs sur un site synthétique local
+
+Usage : python -m benchmarks.run_benchmark --scenarios 10k 1m [--out-of-core] [--output resultats.json]
+
+Chaque scénario démarre son propre serveur synthétique et s'exécute dans un
+processus neuf (caches vides, pic de RSS propre au scénario).
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nombre d'URLs par scénario
+SCENARIOS = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000
+}
+
+STAGES = ['discovery', 'fetch', 'process']
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Pic de mémoire résidente en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_stages(base_url, out_of_core=False):
+    """Exécute get_sitemap_urls → crawl → traitement et retourne les mesures du scénario."""
+    import streamlit as st
+    from core.sitemap_analyzer import get_sitemap_urls, fetch_and_parse_sitemaps, fetch_sitemaps_to_store
+    from core.sitemap_parser import get_parse_pool
+    from core.url_processor import process_urls, process_url_batches
+
+    st.session_state.selected_language = 'fr'
+    exclusions = {'dir_1': [], 'dir_2': [], 'dir_3': []}
+    timings = {}
+
+    start = time.perf_counter()
+    sitemap_urls, _ = get_sitemap_urls(base_url)
+    timings['discovery'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if out_of_core:
+        store_path, url_count = fetch_sitemaps_to_store(sitemap_urls, site=base_url)
+    else:
+        urls_df = fetch_and_parse_sitemaps(sitemap_urls, site=base_url)
+        url_count = len(urls_df)
+    timings['fetch'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if out_of_core:
+        success = process_url_batches(base_url, store_path, -1, False, exclusions)
+    else:
+        success = process_urls(base_url, urls_df, -1, False, exclusions)
+    timings['process'] = time.perf_counter() - start
+
+    # Arrêt du pool pour que le pic de RSS des processus de parsing soit comptabilisé
+    get_parse_pool().shutdown()
+
+    total = sum(timings.values())
+    return {
+        'urls': url_count,
+        'success': bool(success),
+        'timings': timings,
+        'total': total,
+        'urls_per_second': url_count / total if total else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_rss_workers_mb': peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f'{base_url}/robots.txt', timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Le serveur synthétique ne répond pas sur {base_url}")
+            time.sleep(0.1)
+
+
+def run_scenario(name, args):
+    """Démarre le serveur synthétique puis exécute le scénario dans un processus dédié."""
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+
+    server = subprocess.Popen([
+        sys.executable, '-m', 'benchmarks.sitemap_server', '--port', str(port), '--urls', str(SCENARIOS[name]),
+        '--index-depth', str(args.index_depth), '--gzip-ratio', str(args.gzip_ratio),
+        '--latency', str(args.latency), '--error-rate', str(args.error_rate)
+    ], cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        _wait_for_server(base_url)
+        command = [sys.executable, '-m', 'benchmarks.run_benchmark', '--worker', base_url]
+        if args.out_of_core:
+            command.append('--out-of-core')
+        # Répertoire de travail temporaire : caches HTTP, état incrémental et snapshots vides
+        with tempfile.TemporaryDirectory(prefix='sitemap-bench-') as workdir:
+            completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Échec du scénario {name} :\n{completed.stderr[-2000:]}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+
+    result['scenario'] = name
+    return result
+
+
+def format_results(results):
+    """Met en forme les résultats en tableau texte."""
+    header = f"{'scénario':<10}{'URLs':>12}" + ''.join(f'{stage + " (s)":>16}' for stage in STAGES)
+    header += f"{'total (s)':>12}{'URLs/s':>12}{'RSS (Mo)':>12}{'RSS pool':>12}"
+    lines = [header, '-' * len(header)]
+    for result in results:
+        line = f"{result['scenario']:<10}{result['urls']:>12}"
+        line += ''.join(f"{result['timings'][stage]:>16.2f}" for stage in STAGES)
+        line += f"{result['total']:>12.2f}{result['urls_per_second']:>12.0f}"
+        line += f"{result['peak_rss_mb']:>12.0f}{result['peak_rss_workers_mb']:>12.0f}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def find_regressions(results, baseline, tolerance):
+    """Compare le débit à un fichier de référence et liste les scénarios en régression."""
+    reference = {result['scenario']: result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = reference.get(result['scenario'])
+        if previous and result['urls_per_second'] < previous['urls_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{result['scenario']} : {result['urls_per_second']:.0f} URLs/s "
+                f"(référence {previous['urls_per_second']:.0f} URLs/s)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout de l'analyse de sitemaps")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=['10k'])
+    parser.add_argument('--out-of-core', action='store_true', help='ingestion en batches Arrow sur disque')
+    parser.add_argument('--index-depth', type=int, default=1)
+    parser.add_argument('--gzip-ratio', type=float, default=0.5)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help='fichier JSON où enregistrer les résultats')
+    parser.add_argument('--baseline', help='fichier JSON de référence pour détecter les régressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='baisse de débit tolérée (0.2 = 20%%)')
+    parser.add_argument('--worker', metavar='BASE_URL', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        logging.basicConfig(level=logging.WARNING)
+        logging.getLogger('streamlit').setLevel(logging.ERROR)
+        print(json.dumps(run_stages(args.worker, args.out_of_core)))
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    results = []
+    for name in args.scenarios:
+        logger.info(f"Scénario {name} ({SCENARIOS[name]} URLs)")
+        results.append(run_scenario(name, args))
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.error(f"Régression de débit - {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
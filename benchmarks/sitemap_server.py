@@ -0,0 +1,222 @@
+"""
+Serveur de sitemaps synthétique - robots.txt, index imbriqués et sitemaps enfants XML/gzip générés à la volée
+
+Usage : python -m benchmarks.sitemap_server --urls 1000000 --port 8800 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import functools
+import gzip
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Répartition par défaut du nombre de directories par URL (profondeur: poids)
+DEFAULT_PATH_DEPTHS = {0: 0.05, 1: 0.25, 2: 0.4, 3: 0.2, 4: 0.1}
+
+# Nombre de valeurs distinctes par niveau de directory
+DEFAULT_FANOUT = (40, 25, 15, 10, 10)
+
+
+def parse_path_depths(value):
+    """Convertit '1:0.2,2:0.5,3:0.3' en dictionnaire {profondeur: poids}."""
+    depths = {}
+    for item in value.split(','):
+        depth, _, weight = item.partition(':')
+        depths[int(depth)] = float(weight)
+    return depths
+
+
+class SyntheticSite:
+    """
+    Description déterministe d'un site synthétique.
+
+    Les URLs sont réparties dans des sitemaps enfants de `urls_per_sitemap`
+    entrées, regroupés par des index de sitemaps imbriqués sur `index_depth`
+    niveaux (au plus `index_fanout` entrées par index). Une fraction
+    `gzip_ratio` des enfants est servie en .xml.gz. Rien n'est stocké : chaque
+    document est regénéré à partir de son chemin.
+    """
+
+    def __init__(self, urls, urls_per_sitemap=50_000, index_depth=1, index_fanout=50, gzip_ratio=0.5,
+                 path_depths=None, fanout=DEFAULT_FANOUT, lastmod='2024-01-01', seed=0):
+        self.urls = urls
+        self.urls_per_sitemap = urls_per_sitemap
+        self.index_depth = index_depth
+        self.index_fanout = index_fanout
+        self.gzip_ratio = gzip_ratio
+        self.path_depths = path_depths or DEFAULT_PATH_DEPTHS
+        self.fanout = fanout
+        self.lastmod = lastmod
+        self.seed = seed
+        self.child_count = max(1, math.ceil(urls / urls_per_sitemap))
+
+    def child_path(self, k):
+        """Chemin du k-ième sitemap enfant (gzip pour une fraction déterministe des enfants)."""
+        is_gzip = random.Random(f'{self.seed}-gz-{k}').random() < self.gzip_ratio
+        return f'/sitemaps/child-{k}.xml.gz' if is_gzip else f'/sitemaps/child-{k}.xml'
+
+    def index_entries(self, level, start, end):
+        """Entrées d'un index couvrant les enfants [start, end) avec `level` niveaux d'index restants."""
+        if level <= 1:
+            return [self.child_path(k) for k in range(start, end)]
+        # Découpage en sous-index de taille égale, au plus index_fanout par index
+        step = max(1, math.ceil((end - start) / self.index_fanout))
+        return [f'/sitemaps/index-{level - 1}-{s}-{min(s + step, end)}.xml' for s in range(start, end, step)]
+
+    def render_index(self, base_url, level, start, end):
+        """Génère le XML d'un index de sitemaps."""
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{SITEMAP_NS}">']
+        for path in self.index_entries(level, start, end):
+            lines.append(f'<sitemap><loc>{base_url}{path}</loc><lastmod>{self.lastmod}</lastmod></sitemap>')
+        lines.append('</sitemapindex>')
+        return '\n'.join(lines).encode('utf-8')
+
+    def render_child(self, base_url, k):
+        """Génère le XML du k-ième sitemap enfant."""
+        rng = random.Random(f'{self.seed}-child-{k}')
+        depths, weights = zip(*self.path_depths.items())
+        first = k * self.urls_per_sitemap
+        last = min(first + self.urls_per_sitemap, self.urls)
+
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{SITEMAP_NS}">']
+        for i, depth in zip(range(first, last), rng.choices(depths, weights, k=last - first)):
+            segments = [f'level{level + 1}-{rng.randrange(self.fanout[min(level, len(self.fanout) - 1)])}'
+                        for level in range(depth)]
+            segments.append(f'page-{i}')
+            lines.append(f'<url><loc>{base_url}/{"/".join(segments)}</loc><lastmod>{self.lastmod}</lastmod></url>')
+        lines.append('</urlset>')
+        return '\n'.join(lines).encode('utf-8')
+
+    def resolve(self, base_url, path):
+        """Retourne (Content-Type, corps) du document demandé, ou None si le chemin est inconnu."""
+        if path == '/robots.txt':
+            return 'text/plain', f'User-agent: *\nAllow: /\nSitemap: {base_url}/sitemap_index.xml\n'.encode('utf-8')
+        if path == '/sitemap_index.xml':
+            return 'application/xml', self.render_index(base_url, self.index_depth, 0, self.child_count)
+
+        name = path.rsplit('/', 1)[-1]
+        try:
+            if name.startswith('index-') and name.endswith('.xml'):
+                level, start, end = (int(part) for part in name[len('index-'):-len('.xml')].split('-'))
+                return 'application/xml', self.render_index(base_url, level, start, end)
+            k = int(name[len('child-'):].split('.')[0]) if name.startswith('child-') else None
+        except ValueError:
+            return None
+
+        if k is not None and path == self.child_path(k):
+            body = self.render_child(base_url, k)
+            if name.endswith('.gz'):
+                return 'application/x-gzip', gzip.compress(body, compresslevel=5)
+            return 'application/xml', body
+        return None
+
+
+class SitemapRequestHandler(BaseHTTPRequestHandler):
+    """Sert les documents du site synthétique avec latence et erreurs simulées."""
+
+    protocol_version = 'HTTP/1.1'
+    site = None
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    error_status = 503
+
+    def do_GET(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if self.path != '/robots.txt' and random.random() < self.error_rate:
+            self._send(self.error_status, 'text/plain', b'synthetic error', {'Retry-After': '1'})
+            return
+
+        document = _resolve(self.site, f'http://{self.headers.get("Host")}', self.path)
+        if document is None:
+            self._send(404, 'text/plain', b'not found')
+            return
+        self._send(200, *document)
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve(site, base_url, path):
+    # Les quelques derniers documents générés sont gardés pour ne pas mesurer le serveur
+    return site.resolve(base_url, path)
+
+
+def create_server(site, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503):
+    """Crée le serveur HTTP du site synthétique (port 0 : port libre choisi par le système)."""
+    handler = type('ConfiguredSitemapHandler', (SitemapRequestHandler,), {
+        'site': site,
+        'latency': latency,
+        'jitter': jitter,
+        'error_rate': error_rate,
+        'error_status': error_status
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server_thread(site, **options):
+    """Démarre le serveur dans un thread et retourne (serveur, URL de base)."""
+    server = create_server(site, **options)
+    threading.Thread(target=server.serve_forever, name='synthetic-sitemaps', daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serveur de sitemaps synthétique pour les benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--urls', type=int, default=10_000, help="nombre total d'URLs")
+    parser.add_argument('--urls-per-sitemap', type=int, default=50_000)
+    parser.add_argument('--index-depth', type=int, default=1, help="niveaux d'index de sitemaps imbriqués")
+    parser.add_argument('--index-fanout', type=int, default=50, help='entrées maximum par index')
+    parser.add_argument('--gzip-ratio', type=float, default=0.5, help='part des sitemaps enfants servis en gzip')
+    parser.add_argument('--path-depths', type=parse_path_depths, default=None,
+                        help="répartition des profondeurs d'URL, ex. '1:0.2,2:0.5,3:0.3'")
+    parser.add_argument('--latency', type=float, default=0.0, help='latence fixe par requête (secondes)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latence aléatoire additionnelle (secondes)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='part des requêtes en erreur')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    site = SyntheticSite(args.urls, urls_per_sitemap=args.urls_per_sitemap, index_depth=args.index_depth,
+                         index_fanout=args.index_fanout, gzip_ratio=args.gzip_ratio, path_depths=args.path_depths,
+                         seed=args.seed)
+    server = create_server(site, args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, error_status=args.error_status)
+    logger.info(f"Site synthétique de {args.urls} URLs ({site.child_count} sitemaps) sur "
+                f"http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
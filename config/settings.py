@@ -24,6 +24,124 @@ DEFAULT_LIMITS = {
     'request_timeout': 30
 }
 
+# Crawler de sitemaps (requêtes simultanées et profondeur des index)
+CRAWLER_SETTINGS = {
+    'max_concurrency': 32,
+    'max_per_host': 8,
+    'max_depth': 3,
+    'chunk_size': 64 * 1024,  # taille des morceaux lus pendant le téléchargement
+    'max_queued_results': 16  # sitemaps terminés en attente d'affichage (backpressure)
+}
+
+# Parsing des sitemaps dans un pool de processus (pipeline téléchargement → parsing)
+PARSE_SETTINGS = {
+    'process_pool': True,
+    'workers': None,  # None : un processus par cœur
+    'max_pending': 16,  # documents téléchargés en attente de parsing (backpressure)
+    'max_buffered_mb': 8,  # au-delà, un document téléchargé est écrit dans un fichier temporaire
+    'start_method': 'spawn'
+}
+
+# Découverte des sitemaps (sondes concurrentes et cache par domaine)
+DISCOVERY_SETTINGS = {
+    'timeout': 5,
+    'ttl': 3600,
+    'locations': ['sitemap.xml', 'sitemap_index.xml', 'sitemap.xml.gz']
+}
+
+# Session HTTP partagée (pool de connexions et politique de retry)
+HTTP_SETTINGS = {
+    'pool_connections': 10,
+    'retries': 2,
+    'backoff_factor': 0.5,
+    'retry_statuses': (500, 502, 504)  # 429/503 sont gérés par le limiteur de débit
+}
+
+# Limiteur de débit adaptatif par hôte (token bucket + backoff sur 429/503)
+RATE_LIMIT_SETTINGS = {
+    'initial_rate': 10.0,  # requêtes par seconde et par hôte
+    'min_rate': 0.5,
+    'max_rate': 100.0,
+    'burst': 10,
+    'increase': 1.0,  # augmentation additive après chaque succès
+    'decrease_factor': 0.5,  # réduction multiplicative après un 429/503
+    'throttle_statuses': (429, 503),
+    'max_retries': 5,
+    'backoff_base': 1.0,
+    'max_backoff': 60
+}
+
+# Cache HTTP sur disque (robots.txt et sitemaps)
+HTTP_CACHE_SETTINGS = {
+    'enabled': True,
+    'directory': '.cache/http',
+    'max_size_mb': 500,
+    'max_age': 300  # secondes avant revalidation conditionnelle
+}
+
+# Rafraîchissement incrémental des index de sitemaps (basé sur lastmod)
+INCREMENTAL_SETTINGS = {
+    'enabled': True,
+    'directory': '.cache/sitemaps'
+}
+
+# Historique des analyses (snapshots d'URLs par domaine)
+SNAPSHOT_SETTINGS = {
+    'enabled': True,
+    'directory': '.cache/snapshots',
+    'max_snapshots': 20
+}
+
+# Ingestion hors mémoire (record batches Arrow) pour les très gros sites
+OUT_OF_CORE_SETTINGS = {
+    'directory': '.cache/url_batches',
+    'batch_size': 100_000
+}
+
+# Lecture des exports SEMrush par chunks (agrégats mis à jour au fil de la lecture)
+SEMRUSH_SETTINGS = {
+    'chunk_size': 500_000,  # lignes par chunk (lecteur pandas)
+    'block_size': 16 * 1024 * 1024,  # octets par bloc (lecteur pyarrow)
+    'engine': 'pyarrow',  # lecteur CSV colonnaire multi-thread, 'pandas' pour le lecteur C de pandas
+    'workers': None  # fichiers lus en parallèle (None : un par cœur)
+}
+
+# Cache local des exports SEMrush parsés (clé : empreinte du contenu du fichier)
+SEMRUSH_CACHE_SETTINGS = {
+    'enabled': True,
+    'directory': '.cache/semrush',
+    'max_size_mb': 2000
+}
+
+# Stockage partitionné (marché / période) des exports SEMrush importés en masse
+SEMRUSH_STORE_SETTINGS = {
+    'directory': '.cache/semrush_store',
+    'manifest': 'manifest.csv'  # colonnes file;market;period, prioritaire sur le nom des fichiers
+}
+
+# Recherche dans l'index inversé des mots-clés SEMrush
+KEYWORD_INDEX_SETTINGS = {
+    'max_results': 500  # lignes affichées (les plus fort trafic), l'agrégat par URL porte sur toutes
+}
+
+# Profondeur de la hiérarchie de directories analysée (dir_1 à dir_N)
+HIERARCHY_SETTINGS = {
+    'default_depth': 3,
+    'max_depth': 8
+}
+
+# Canonicalisation des URLs avant la jointure sitemap / SEMrush (clé de hachage 64 bits)
+URL_CANONICALIZATION_SETTINGS = {
+    'ignore_scheme': True,  # http et https désignent la même page
+    'ignore_www': True,
+    'strip_default_port': True,  # :80 et :443
+    'lowercase_path': False,
+    'strip_trailing_slash': True,
+    'strip_fragment': True,
+    'drop_query': False,
+    'tracking_parameters': ['utm_*', 'gclid', 'fbclid', 'msclkid', 'dclid', 'mc_cid', 'mc_eid', '_ga']
+}
+
 # Headers pour les requêtes HTTP
 DEFAULT_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
@@ -46,6 +46,7 @@ TRANSLATIONS = {
         'active_exclusions': 'Exclusions actives:',
         'sitemap_manual': 'Sitemap fourni manuellement utilisé.',
         'sitemap_robots': 'Sitemaps récupérés depuis robots.txt.',
+        'sitemap_discovered': 'Aucun sitemap dans robots.txt. Sitemaps trouvés aux emplacements courants.',
         'sitemap_fallback': 'Aucun sitemap trouvé dans robots.txt. Utilisation du fallback /sitemap.xml.',
         'sitemap_error': 'Erreur lors de la lecture du robots.txt. Utilisation du fallback /sitemap.xml.',
 
@@ -140,7 +141,91 @@ TRANSLATIONS = {
         'usage_guide': 'Guide d\'usage des filtres :',
         'max_categories_help': 'Limite le nombre de catégories dir_1 à afficher dans l\'analyse. Les catégories sont classées par ordre décroissant du nombre d\'URLs. `-1` = afficher toutes les catégories.',
         'exclusions_config': 'Configuration des exclusions :',
-        'exclusions_warning': '⚠️ Important : Pour de meilleurs résultats, évitez d\'utiliser des termes d\'exclusion différents sur plusieurs niveaux de directory (dir_1, dir_2, dir_3).'
+        'exclusions_warning': '⚠️ Important : Pour de meilleurs résultats, évitez d\'utiliser des termes d\'exclusion différents sur plusieurs niveaux de directory (dir_1, dir_2, dir_3).',
+
+        # Historique des analyses
+        'snapshot_history': 'Historique des analyses',
+        'snapshot_none': 'Au moins deux analyses de ce domaine sont nécessaires pour comparer.',
+        'snapshot_reference': 'Analyse de référence',
+        'snapshot_compared': 'Analyse comparée',
+        'urls_added': 'URLs ajoutées',
+        'urls_removed': 'URLs supprimées',
+        'urls_moved': 'URLs déplacées',
+        'moved_in': 'Déplacées vers',
+        'moved_out': 'Déplacées depuis',
+        'old_url': 'Ancienne URL',
+        'new_url': 'Nouvelle URL',
+
+        # Mode hors mémoire
+        'out_of_core_mode': 'Mode grands sites (traitement hors mémoire)',
+        'out_of_core_help': 'Les URLs sont stockées sur disque en batches Arrow et traitées batch par batch. Le tableau des URLs affiche alors les comptages par chemin.',
+
+        # Progression du crawl
+        'crawl_sitemaps_done': 'Sitemaps traités',
+        'crawl_urls_found': 'URLs récupérées',
+        'crawl_partial_breakdown': 'Répartition provisoire par dir_1',
+
+        # Profondeur de la hiérarchie
+        'hierarchy_depth': 'Profondeur de la hiérarchie',
+        'hierarchy_depth_help': 'Nombre de niveaux de directories analysés (dir_1 à dir_N). Les catalogues profonds peuvent nécessiter 5 ou 6 niveaux.',
+        'exclusions_dir_n': 'Exclusions niveau {level} (dir_{level})',
+        'exclusions_help_n': 'Catégories à exclure au niveau {level} (séparées par des virgules)',
+        'select_dir_n': 'Sélectionner Dir_{level}',
+        'dir_n_urls_help': 'Nombre d\'URLs dans le Dir_{level} sélectionné',
+        'filter_by_dir_n': 'Filtrer par Dir_{level}',
+
+        # Moteur d'exclusions
+        'exclusions_syntax': "Valeur exacte (blog), préfixe ou glob (page-*, fr-??) ou expression régulière préfixée par re: (re:^[a-z]{2}-[a-z]{2}$). Les virgules à l'intérieur de {…} ne séparent pas les règles ; ailleurs, écrivez `\\,` pour une virgule littérale.",
+        'exclusion_report': 'URLs exclues par règle',
+        'exclusion_rule': 'Règle',
+        'rule_type': 'Type',
+        'urls_excluded': 'URLs exclues',
+
+        # Réutilisation du crawl
+        'crawl_reused': 'URLs déjà récupérées pour ce site et ces sitemaps : seuls les filtres sont réappliqués.',
+        'refresh_crawl_button': '🔄 Relancer le crawl',
+        'refresh_crawl_help': "Télécharge à nouveau les sitemaps au lieu de réutiliser les URLs déjà récupérées, puis lance l'analyse (un nouveau snapshot est enregistré).",
+
+        # Lecture des exports SEMrush
+        'semrush_keep_raw': 'Conserver les lignes brutes par mot-clé',
+        'semrush_keep_raw_help': 'Nécessaire pour afficher le tableau détaillé des mots-clés. Sans cette option, les exports sont lus par morceaux et seuls les totaux par URL sont gardés en mémoire.',
+
+        # Cache SEMrush
+        'semrush_cache': 'Exports SEMrush en cache',
+        'semrush_cache_empty': 'Aucun export en cache. Les fichiers analysés y sont ajoutés et rechargés instantanément lors des analyses suivantes.',
+        'semrush_cache_clear': 'Vider le cache',
+        'file_name': 'Fichier',
+        'last_used': 'Dernière utilisation',
+
+        # Import SEMrush en masse
+        'semrush_bulk_title': 'Import en masse (archive zip ou répertoire)',
+        'semrush_bulk_help': 'Le marché et la période sont lus dans le nom des fichiers (nom par défaut des exports : ...-Positions-fr-20240315-...) ou dans un fichier manifest.csv (colonnes file;market;period).',
+        'semrush_bulk_zip': 'Archive zip d\'exports',
+        'semrush_bulk_directory': 'Ou répertoire local d\'exports',
+        'semrush_bulk_button': 'Importer',
+        'semrush_bulk_no_source': 'Ajoutez une archive zip ou indiquez un répertoire existant.',
+        'semrush_bulk_done': '{ingested} exports importés, {duplicates} déjà présents, {failed} ignorés ou en erreur.',
+        'semrush_bulk_error': 'Erreur',
+        'semrush_bulk_no_market': 'Marché non déterminé (nom du fichier ou manifeste)',
+        'semrush_bulk_empty': 'Aucun export importé.',
+        'semrush_bulk_exports': 'Exports',
+        'semrush_bulk_use': 'Inclure les exports importés dans l\'analyse',
+        'semrush_bulk_markets': 'Marchés',
+        'semrush_bulk_markets_help': 'Tous les marchés importés si aucun n\'est sélectionné.',
+        'period': 'Période',
+        'latest_period': 'La plus récente par marché',
+        'semrush_bulk_clear': 'Supprimer les exports importés',
+
+        # Recherche de mots-clés
+        'keyword_search': 'Recherche de mots-clés',
+        'keyword_search_query': 'Mot-clé',
+        'keyword_search_help': 'Recherche dans les exports importés en masse, sans tenir compte des majuscules, des accents ni de la ponctuation.',
+        'keyword_search_mode': 'Recherche',
+        'keyword_search_prefix': 'Commence par',
+        'keyword_search_tokens': 'Contient les mots',
+        'keyword_search_results': '{total} lignes trouvées, {shown} affichées (trafic le plus élevé).',
+        'keyword_search_none': 'Aucun mot-clé trouvé.',
+        'keyword_search_by_directory': 'Mots-clés trouvés par directory'
     },
 
     'en': {
@@ -186,6 +271,7 @@ TRANSLATIONS = {
         'active_exclusions': 'Active exclusions:',
         'sitemap_manual': 'Manually provided sitemap used.',
         'sitemap_robots': 'Sitemaps retrieved from robots.txt.',
+        'sitemap_discovered': 'No sitemap in robots.txt. Sitemaps found at common locations.',
         'sitemap_fallback': 'No sitemap found in robots.txt. Using fallback /sitemap.xml.',
         'sitemap_error': 'Error reading robots.txt. Using fallback /sitemap.xml.',
 
@@ -280,7 +366,91 @@ TRANSLATIONS = {
         'usage_guide': 'Filter usage guide:',
         'max_categories_help': 'Limits the number of dir_1 categories to display in the analysis. Categories are sorted by descending number of URLs. `-1` = show all categories.',
         'exclusions_config': 'Exclusions configuration:',
-        'exclusions_warning': '⚠️ Important: For better results, avoid using different exclusion terms across multiple directory levels (dir_1, dir_2, dir_3).'
+        'exclusions_warning': '⚠️ Important: For better results, avoid using different exclusion terms across multiple directory levels (dir_1, dir_2, dir_3).',
+
+        # Analysis history
+        'snapshot_history': 'Analysis history',
+        'snapshot_none': 'At least two analyses of this domain are needed to compare.',
+        'snapshot_reference': 'Reference analysis',
+        'snapshot_compared': 'Compared analysis',
+        'urls_added': 'Added URLs',
+        'urls_removed': 'Removed URLs',
+        'urls_moved': 'Moved URLs',
+        'moved_in': 'Moved in',
+        'moved_out': 'Moved out',
+        'old_url': 'Old URL',
+        'new_url': 'New URL',
+
+        # Out-of-core mode
+        'out_of_core_mode': 'Large site mode (out-of-core processing)',
+        'out_of_core_help': 'URLs are stored on disk in Arrow batches and processed batch by batch. The URL table then shows counts per path.',
+
+        # Crawl progress
+        'crawl_sitemaps_done': 'Sitemaps processed',
+        'crawl_urls_found': 'URLs retrieved',
+        'crawl_partial_breakdown': 'Partial breakdown by dir_1',
+
+        # Hierarchy depth
+        'hierarchy_depth': 'Hierarchy depth',
+        'hierarchy_depth_help': 'Number of directory levels analysed (dir_1 to dir_N). Deep catalogs may need 5 or 6 levels.',
+        'exclusions_dir_n': 'Level {level} exclusions (dir_{level})',
+        'exclusions_help_n': 'Categories to exclude at level {level} (comma separated)',
+        'select_dir_n': 'Select Dir_{level}',
+        'dir_n_urls_help': 'Number of URLs in the selected Dir_{level}',
+        'filter_by_dir_n': 'Filter by Dir_{level}',
+
+        # Exclusion engine
+        'exclusions_syntax': 'Exact value (blog), prefix or glob (page-*, fr-??) or regular expression prefixed with re: (re:^[a-z]{2}-[a-z]{2}$). Commas inside {…} do not separate rules; elsewhere, write `\\,` for a literal comma.',
+        'exclusion_report': 'URLs excluded per rule',
+        'exclusion_rule': 'Rule',
+        'rule_type': 'Type',
+        'urls_excluded': 'Excluded URLs',
+
+        # Crawl reuse
+        'crawl_reused': 'URLs already fetched for this site and these sitemaps: only the filters are applied again.',
+        'refresh_crawl_button': '🔄 Refresh crawl',
+        'refresh_crawl_help': 'Downloads the sitemaps again instead of reusing the URLs already fetched, then runs the analysis (a new snapshot is saved).',
+
+        # SEMrush export reading
+        'semrush_keep_raw': 'Keep raw per-keyword rows',
+        'semrush_keep_raw_help': 'Required to display the detailed keyword table. Without this option, exports are read in chunks and only per-URL totals are kept in memory.',
+
+        # SEMrush cache
+        'semrush_cache': 'Cached SEMrush exports',
+        'semrush_cache_empty': 'No cached exports. Analyzed files are added here and reloaded instantly on later analyses.',
+        'semrush_cache_clear': 'Clear cache',
+        'file_name': 'File',
+        'last_used': 'Last used',
+
+        # SEMrush bulk import
+        'semrush_bulk_title': 'Bulk import (zip archive or directory)',
+        'semrush_bulk_help': 'Market and period are read from the file names (default export name: ...-Positions-fr-20240315-...) or from a manifest.csv file (columns file;market;period).',
+        'semrush_bulk_zip': 'Zip archive of exports',
+        'semrush_bulk_directory': 'Or local directory of exports',
+        'semrush_bulk_button': 'Import',
+        'semrush_bulk_no_source': 'Add a zip archive or enter an existing directory.',
+        'semrush_bulk_done': '{ingested} exports imported, {duplicates} already present, {failed} skipped or failed.',
+        'semrush_bulk_error': 'Error',
+        'semrush_bulk_no_market': 'Market not found (file name or manifest)',
+        'semrush_bulk_empty': 'No imported exports.',
+        'semrush_bulk_exports': 'Exports',
+        'semrush_bulk_use': 'Include imported exports in the analysis',
+        'semrush_bulk_markets': 'Markets',
+        'semrush_bulk_markets_help': 'All imported markets if none is selected.',
+        'period': 'Period',
+        'latest_period': 'Latest per market',
+        'semrush_bulk_clear': 'Delete imported exports',
+
+        # Keyword search
+        'keyword_search': 'Keyword search',
+        'keyword_search_query': 'Keyword',
+        'keyword_search_help': 'Searches the bulk-imported exports, ignoring case, accents and punctuation.',
+        'keyword_search_mode': 'Match',
+        'keyword_search_prefix': 'Starts with',
+        'keyword_search_tokens': 'Contains the words',
+        'keyword_search_results': '{total} rows found, {shown} shown (highest traffic).',
+        'keyword_search_none': 'No keyword found.',
+        'keyword_search_by_directory': 'Matching keywords by directory'
     },
 
     'es': {
@@ -326,6 +496,7 @@ TRANSLATIONS = {
         'active_exclusions': 'Exclusiones activas:',
         'sitemap_manual': 'Sitemap proporcionado manualmente utilizado.',
         'sitemap_robots': 'Sitemaps recuperados desde robots.txt.',
+        'sitemap_discovered': 'Ningún sitemap en robots.txt. Sitemaps encontrados en las ubicaciones habituales.',
         'sitemap_fallback': 'No se encontró sitemap en robots.txt. Usando fallback /sitemap.xml.',
         'sitemap_error': 'Error leyendo robots.txt. Usando fallback /sitemap.xml.',
 
@@ -420,7 +591,91 @@ TRANSLATIONS = {
         'usage_guide': 'Guía de uso de filtros:',
         'max_categories_help': 'Limita el número de categorías dir_1 a mostrar en el análisis. Las categorías se ordenan por número descendente de URLs. `-1` = mostrar todas las categorías.',
         'exclusions_config': 'Configuración de exclusiones:',
-        'exclusions_warning': '⚠️ Importante: Para mejores resultados, evita usar términos de exclusión diferentes en múltiples niveles de directorio (dir_1, dir_2, dir_3).'
+        'exclusions_warning': '⚠️ Importante: Para mejores resultados, evita usar términos de exclusión diferentes en múltiples niveles de directorio (dir_1, dir_2, dir_3).',
+
+        # Historial de análisis
+        'snapshot_history': 'Historial de análisis',
+        'snapshot_none': 'Se necesitan al menos dos análisis de este dominio para comparar.',
+        'snapshot_reference': 'Análisis de referencia',
+        'snapshot_compared': 'Análisis comparado',
+        'urls_added': 'URLs añadidas',
+        'urls_removed': 'URLs eliminadas',
+        'urls_moved': 'URLs movidas',
+        'moved_in': 'Movidas hacia',
+        'moved_out': 'Movidas desde',
+        'old_url': 'URL antigua',
+        'new_url': 'URL nueva',
+
+        # Modo fuera de memoria
+        'out_of_core_mode': 'Modo sitios grandes (procesamiento fuera de memoria)',
+        'out_of_core_help': 'Las URLs se almacenan en disco en lotes Arrow y se procesan lote a lote. La tabla de URLs muestra entonces los recuentos por ruta.',
+
+        # Progreso del rastreo
+        'crawl_sitemaps_done': 'Sitemaps procesados',
+        'crawl_urls_found': 'URLs recuperadas',
+        'crawl_partial_breakdown': 'Distribución provisional por dir_1',
+
+        # Profundidad de la jerarquía
+        'hierarchy_depth': 'Profundidad de la jerarquía',
+        'hierarchy_depth_help': 'Número de niveles de directorio analizados (dir_1 a dir_N). Los catálogos profundos pueden necesitar 5 o 6 niveles.',
+        'exclusions_dir_n': 'Exclusiones nivel {level} (dir_{level})',
+        'exclusions_help_n': 'Categorías a excluir en el nivel {level} (separadas por comas)',
+        'select_dir_n': 'Seleccionar Dir_{level}',
+        'dir_n_urls_help': 'Número de URLs en el Dir_{level} seleccionado',
+        'filter_by_dir_n': 'Filtrar por Dir_{level}',
+
+        # Motor de exclusiones
+        'exclusions_syntax': 'Valor exacto (blog), prefijo o glob (page-*, fr-??) o expresión regular con el prefijo re: (re:^[a-z]{2}-[a-z]{2}$). Las comas dentro de {…} no separan las reglas; en otros lugares, escriba `\\,` para una coma literal.',
+        'exclusion_report': 'URLs excluidas por regla',
+        'exclusion_rule': 'Regla',
+        'rule_type': 'Tipo',
+        'urls_excluded': 'URLs excluidas',
+
+        # Reutilización del rastreo
+        'crawl_reused': 'URLs ya recuperadas para este sitio y estos sitemaps: solo se vuelven a aplicar los filtros.',
+        'refresh_crawl_button': '🔄 Volver a rastrear',
+        'refresh_crawl_help': 'Vuelve a descargar los sitemaps en lugar de reutilizar las URLs ya recuperadas y luego lanza el análisis (se guarda una nueva instantánea).',
+
+        # Lectura de exportaciones SEMrush
+        'semrush_keep_raw': 'Conservar las filas brutas por palabra clave',
+        'semrush_keep_raw_help': 'Necesario para mostrar la tabla detallada de palabras clave. Sin esta opción, las exportaciones se leen por partes y solo se conservan en memoria los totales por URL.',
+
+        # Caché SEMrush
+        'semrush_cache': 'Exportaciones SEMrush en caché',
+        'semrush_cache_empty': 'No hay exportaciones en caché. Los archivos analizados se añaden aquí y se recargan al instante en los análisis siguientes.',
+        'semrush_cache_clear': 'Vaciar la caché',
+        'file_name': 'Archivo',
+        'last_used': 'Último uso',
+
+        # Importación masiva de SEMrush
+        'semrush_bulk_title': 'Importación masiva (archivo zip o directorio)',
+        'semrush_bulk_help': 'El mercado y el periodo se leen del nombre de los archivos (nombre por defecto de las exportaciones: ...-Positions-fr-20240315-...) o de un archivo manifest.csv (columnas file;market;period).',
+        'semrush_bulk_zip': 'Archivo zip de exportaciones',
+        'semrush_bulk_directory': 'O directorio local de exportaciones',
+        'semrush_bulk_button': 'Importar',
+        'semrush_bulk_no_source': 'Añada un archivo zip o indique un directorio existente.',
+        'semrush_bulk_done': '{ingested} exportaciones importadas, {duplicates} ya presentes, {failed} ignoradas o con error.',
+        'semrush_bulk_error': 'Error',
+        'semrush_bulk_no_market': 'Mercado no determinado (nombre del archivo o manifiesto)',
+        'semrush_bulk_empty': 'Ninguna exportación importada.',
+        'semrush_bulk_exports': 'Exportaciones',
+        'semrush_bulk_use': 'Incluir las exportaciones importadas en el análisis',
+        'semrush_bulk_markets': 'Mercados',
+        'semrush_bulk_markets_help': 'Todos los mercados importados si no se selecciona ninguno.',
+        'period': 'Periodo',
+        'latest_period': 'La más reciente por mercado',
+        'semrush_bulk_clear': 'Eliminar las exportaciones importadas',
+
+        # Búsqueda de palabras clave
+        'keyword_search': 'Búsqueda de palabras clave',
+        'keyword_search_query': 'Palabra clave',
+        'keyword_search_help': 'Busca en las exportaciones importadas en masa, sin tener en cuenta mayúsculas, acentos ni puntuación.',
+        'keyword_search_mode': 'Búsqueda',
+        'keyword_search_prefix': 'Empieza por',
+        'keyword_search_tokens': 'Contiene las palabras',
+        'keyword_search_results': '{total} filas encontradas, {shown} mostradas (mayor tráfico).',
+        'keyword_search_none': 'No se encontró ninguna palabra clave.',
+        'keyword_search_by_directory': 'Palabras clave encontradas por directorio'
     },
 
     'de': {
@@ -466,6 +721,7 @@ TRANSLATIONS = {
         'active_exclusions': 'Aktive Ausschlüsse:',
         'sitemap_manual': 'Manuell bereitgestellte Sitemap verwendet.',
         'sitemap_robots': 'Sitemaps aus robots.txt abgerufen.',
+        'sitemap_discovered': 'Keine Sitemap in robots.txt. Sitemaps an üblichen Speicherorten gefunden.',
         'sitemap_fallback': 'Keine Sitemap in robots.txt gefunden. Verwende Fallback /sitemap.xml.',
         'sitemap_error': 'Fehler beim Lesen von robots.txt. Verwende Fallback /sitemap.xml.',
 
@@ -560,7 +816,91 @@ TRANSLATIONS = {
         'usage_guide': 'Leitfaden zur Filternutzung:',
         'max_categories_help': 'Begrenzt die Anzahl der dir_1-Kategorien, die in der Analyse angezeigt werden. Kategorien werden nach absteigender URL-Anzahl sortiert. `-1` = alle Kategorien anzeigen.',
         'exclusions_config': 'Ausschlüsse-Konfiguration:',
-        'exclusions_warning': '⚠️ Wichtig: Für bessere Ergebnisse vermeiden Sie unterschiedliche Ausschlussbegriffe auf mehreren Verzeichnisebenen (dir_1, dir_2, dir_3).'
+        'exclusions_warning': '⚠️ Wichtig: Für bessere Ergebnisse vermeiden Sie unterschiedliche Ausschlussbegriffe auf mehreren Verzeichnisebenen (dir_1, dir_2, dir_3).',
+
+        # Analyseverlauf
+        'snapshot_history': 'Analyseverlauf',
+        'snapshot_none': 'Für einen Vergleich sind mindestens zwei Analysen dieser Domain erforderlich.',
+        'snapshot_reference': 'Referenzanalyse',
+        'snapshot_compared': 'Verglichene Analyse',
+        'urls_added': 'Hinzugefügte URLs',
+        'urls_removed': 'Entfernte URLs',
+        'urls_moved': 'Verschobene URLs',
+        'moved_in': 'Hierher verschoben',
+        'moved_out': 'Wegverschoben',
+        'old_url': 'Alte URL',
+        'new_url': 'Neue URL',
+
+        # Out-of-Core-Modus
+        'out_of_core_mode': 'Modus für große Websites (Out-of-Core-Verarbeitung)',
+        'out_of_core_help': 'URLs werden in Arrow-Batches auf der Festplatte gespeichert und Batch für Batch verarbeitet. Die URL-Tabelle zeigt dann die Anzahl pro Pfad.',
+
+        # Crawl-Fortschritt
+        'crawl_sitemaps_done': 'Verarbeitete Sitemaps',
+        'crawl_urls_found': 'Abgerufene URLs',
+        'crawl_partial_breakdown': 'Vorläufige Verteilung nach dir_1',
+
+        # Hierarchietiefe
+        'hierarchy_depth': 'Hierarchietiefe',
+        'hierarchy_depth_help': 'Anzahl der analysierten Verzeichnisebenen (dir_1 bis dir_N). Tiefe Kataloge benötigen ggf. 5 oder 6 Ebenen.',
+        'exclusions_dir_n': 'Ausschlüsse Ebene {level} (dir_{level})',
+        'exclusions_help_n': 'Auszuschließende Kategorien auf Ebene {level} (durch Kommas getrennt)',
+        'select_dir_n': 'Dir_{level} auswählen',
+        'dir_n_urls_help': 'Anzahl der URLs im ausgewählten Dir_{level}',
+        'filter_by_dir_n': 'Nach Dir_{level} filtern',
+
+        # Ausschluss-Engine
+        'exclusions_syntax': 'Exakter Wert (blog), Präfix oder Glob (page-*, fr-??) oder regulärer Ausdruck mit dem Präfix re: (re:^[a-z]{2}-[a-z]{2}$). Kommas innerhalb von {…} trennen keine Regeln; an anderen Stellen schreiben Sie `\\,` für ein wörtliches Komma.',
+        'exclusion_report': 'Ausgeschlossene URLs pro Regel',
+        'exclusion_rule': 'Regel',
+        'rule_type': 'Typ',
+        'urls_excluded': 'Ausgeschlossene URLs',
+
+        # Wiederverwendung des Crawls
+        'crawl_reused': 'URLs für diese Website und diese Sitemaps bereits abgerufen: nur die Filter werden erneut angewendet.',
+        'refresh_crawl_button': '🔄 Crawl neu starten',
+        'refresh_crawl_help': 'Lädt die Sitemaps erneut herunter, statt die bereits abgerufenen URLs wiederzuverwenden, und startet dann die Analyse (ein neuer Snapshot wird gespeichert).',
+
+        # Einlesen der SEMrush-Exporte
+        'semrush_keep_raw': 'Rohzeilen pro Keyword behalten',
+        'semrush_keep_raw_help': 'Erforderlich für die detaillierte Keyword-Tabelle. Ohne diese Option werden Exporte stückweise gelesen und nur die Summen pro URL im Speicher gehalten.',
+
+        # SEMrush-Cache
+        'semrush_cache': 'Zwischengespeicherte SEMrush-Exporte',
+        'semrush_cache_empty': 'Keine Exporte im Cache. Analysierte Dateien werden hier abgelegt und bei späteren Analysen sofort neu geladen.',
+        'semrush_cache_clear': 'Cache leeren',
+        'file_name': 'Datei',
+        'last_used': 'Zuletzt verwendet',
+
+        # SEMrush-Massenimport
+        'semrush_bulk_title': 'Massenimport (ZIP-Archiv oder Verzeichnis)',
+        'semrush_bulk_help': 'Markt und Zeitraum werden aus den Dateinamen (Standardname der Exporte: ...-Positions-fr-20240315-...) oder aus einer Datei manifest.csv (Spalten file;market;period) gelesen.',
+        'semrush_bulk_zip': 'ZIP-Archiv mit Exporten',
+        'semrush_bulk_directory': 'Oder lokales Verzeichnis mit Exporten',
+        'semrush_bulk_button': 'Importieren',
+        'semrush_bulk_no_source': 'Fügen Sie ein ZIP-Archiv hinzu oder geben Sie ein vorhandenes Verzeichnis an.',
+        'semrush_bulk_done': '{ingested} Exporte importiert, {duplicates} bereits vorhanden, {failed} übersprungen oder fehlerhaft.',
+        'semrush_bulk_error': 'Fehler',
+        'semrush_bulk_no_market': 'Markt nicht erkannt (Dateiname oder Manifest)',
+        'semrush_bulk_empty': 'Keine importierten Exporte.',
+        'semrush_bulk_exports': 'Exporte',
+        'semrush_bulk_use': 'Importierte Exporte in die Analyse einbeziehen',
+        'semrush_bulk_markets': 'Märkte',
+        'semrush_bulk_markets_help': 'Alle importierten Märkte, wenn keiner ausgewählt ist.',
+        'period': 'Zeitraum',
+        'latest_period': 'Neueste je Markt',
+        'semrush_bulk_clear': 'Importierte Exporte löschen',
+
+        # Keyword-Suche
+        'keyword_search': 'Keyword-Suche',
+        'keyword_search_query': 'Keyword',
+        'keyword_search_help': 'Durchsucht die per Massenimport geladenen Exporte, ohne Groß-/Kleinschreibung, Akzente und Satzzeichen zu berücksichtigen.',
+        'keyword_search_mode': 'Suche',
+        'keyword_search_prefix': 'Beginnt mit',
+        'keyword_search_tokens': 'Enthält die Wörter',
+        'keyword_search_results': '{total} Zeilen gefunden, {shown} angezeigt (höchster Traffic).',
+        'keyword_search_none': 'Kein Keyword gefunden.',
+        'keyword_search_by_directory': 'Gefundene Keywords nach Verzeichnis'
     },
 
     'it': {
@@ -606,6 +946,7 @@ TRANSLATIONS = {
         'active_exclusions': 'Esclusioni attive:',
         'sitemap_manual': 'Sitemap fornita manualmente utilizzata.',
         'sitemap_robots': 'Sitemap recuperate da robots.txt.',
+        'sitemap_discovered': 'Nessuna sitemap in robots.txt. Sitemap trovate nelle posizioni comuni.',
         'sitemap_fallback': 'Nessuna sitemap trovata in robots.txt. Usando fallback /sitemap.xml.',
         'sitemap_error': 'Errore nella lettura di robots.txt. Usando fallback /sitemap.xml.',
 
@@ -700,7 +1041,91 @@ TRANSLATIONS = {
         'usage_guide': 'Guida all\'uso dei filtri:',
         'max_categories_help': 'Limita il numero di categorie dir_1 da mostrare nell\'analisi. Le categorie sono ordinate per numero decrescente di URL. `-1` = mostra tutte le categorie.',
         'exclusions_config': 'Configurazione esclusioni:',
-        'exclusions_warning': '⚠️ Importante: Per migliori risultati, evitare di usare termini di esclusione diversi su più livelli di directory (dir_1, dir_2, dir_3).'
+        'exclusions_warning': '⚠️ Importante: Per migliori risultati, evitare di usare termini di esclusione diversi su più livelli di directory (dir_1, dir_2, dir_3).',
+
+        # Cronologia delle analisi
+        'snapshot_history': 'Cronologia delle analisi',
+        'snapshot_none': 'Servono almeno due analisi di questo dominio per il confronto.',
+        'snapshot_reference': 'Analisi di riferimento',
+        'snapshot_compared': 'Analisi confrontata',
+        'urls_added': 'URL aggiunti',
+        'urls_removed': 'URL rimossi',
+        'urls_moved': 'URL spostati',
+        'moved_in': 'Spostati in',
+        'moved_out': 'Spostati da',
+        'old_url': 'URL precedente',
+        'new_url': 'Nuovo URL',
+
+        # Modalità fuori memoria
+        'out_of_core_mode': 'Modalità siti grandi (elaborazione fuori memoria)',
+        'out_of_core_help': 'Gli URL vengono salvati su disco in batch Arrow ed elaborati batch per batch. La tabella degli URL mostra quindi i conteggi per percorso.',
+
+        # Avanzamento della scansione
+        'crawl_sitemaps_done': 'Sitemap elaborate',
+        'crawl_urls_found': 'URL recuperati',
+        'crawl_partial_breakdown': 'Distribuzione provvisoria per dir_1',
+
+        # Profondità della gerarchia
+        'hierarchy_depth': 'Profondità della gerarchia',
+        'hierarchy_depth_help': 'Numero di livelli di directory analizzati (da dir_1 a dir_N). I cataloghi profondi possono richiedere 5 o 6 livelli.',
+        'exclusions_dir_n': 'Esclusioni livello {level} (dir_{level})',
+        'exclusions_help_n': 'Categorie da escludere al livello {level} (separate da virgole)',
+        'select_dir_n': 'Seleziona Dir_{level}',
+        'dir_n_urls_help': 'Numero di URL nel Dir_{level} selezionato',
+        'filter_by_dir_n': 'Filtra per Dir_{level}',
+
+        # Motore di esclusione
+        'exclusions_syntax': "Valore esatto (blog), prefisso o glob (page-*, fr-??) o espressione regolare con il prefisso re: (re:^[a-z]{2}-[a-z]{2}$). Le virgole all'interno di {…} non separano le regole; altrove, scrivere `\\,` per una virgola letterale.",
+        'exclusion_report': 'URL escluse per regola',
+        'exclusion_rule': 'Regola',
+        'rule_type': 'Tipo',
+        'urls_excluded': 'URL escluse',
+
+        # Riutilizzo della scansione
+        'crawl_reused': 'URL già recuperate per questo sito e queste sitemap: vengono riapplicati solo i filtri.',
+        'refresh_crawl_button': '🔄 Ripeti la scansione',
+        'refresh_crawl_help': "Scarica di nuovo le sitemap invece di riutilizzare gli URL già recuperati, poi avvia l'analisi (viene salvato un nuovo snapshot).",
+
+        # Lettura degli export SEMrush
+        'semrush_keep_raw': 'Conserva le righe grezze per parola chiave',
+        'semrush_keep_raw_help': 'Necessario per visualizzare la tabella dettagliata delle parole chiave. Senza questa opzione, gli export vengono letti a blocchi e in memoria restano solo i totali per URL.',
+
+        # Cache SEMrush
+        'semrush_cache': 'Export SEMrush in cache',
+        'semrush_cache_empty': 'Nessun export in cache. I file analizzati vengono aggiunti qui e ricaricati istantaneamente nelle analisi successive.',
+        'semrush_cache_clear': 'Svuota la cache',
+        'file_name': 'File',
+        'last_used': 'Ultimo utilizzo',
+
+        # Importazione massiva SEMrush
+        'semrush_bulk_title': 'Importazione massiva (archivio zip o cartella)',
+        'semrush_bulk_help': 'Il mercato e il periodo vengono letti dal nome dei file (nome predefinito degli export: ...-Positions-fr-20240315-...) o da un file manifest.csv (colonne file;market;period).',
+        'semrush_bulk_zip': 'Archivio zip di export',
+        'semrush_bulk_directory': 'Oppure cartella locale di export',
+        'semrush_bulk_button': 'Importa',
+        'semrush_bulk_no_source': 'Aggiungi un archivio zip o indica una cartella esistente.',
+        'semrush_bulk_done': '{ingested} export importati, {duplicates} già presenti, {failed} ignorati o in errore.',
+        'semrush_bulk_error': 'Errore',
+        'semrush_bulk_no_market': 'Mercato non determinato (nome del file o manifest)',
+        'semrush_bulk_empty': 'Nessun export importato.',
+        'semrush_bulk_exports': 'Export',
+        'semrush_bulk_use': 'Includi gli export importati nell\'analisi',
+        'semrush_bulk_markets': 'Mercati',
+        'semrush_bulk_markets_help': 'Tutti i mercati importati se nessuno è selezionato.',
+        'period': 'Periodo',
+        'latest_period': 'La più recente per mercato',
+        'semrush_bulk_clear': 'Elimina gli export importati',
+
+        # Ricerca di parole chiave
+        'keyword_search': 'Ricerca di parole chiave',
+        'keyword_search_query': 'Parola chiave',
+        'keyword_search_help': 'Cerca negli export importati in massa, ignorando maiuscole, accenti e punteggiatura.',
+        'keyword_search_mode': 'Ricerca',
+        'keyword_search_prefix': 'Inizia con',
+        'keyword_search_tokens': 'Contiene le parole',
+        'keyword_search_results': '{total} righe trovate, {shown} mostrate (traffico più alto).',
+        'keyword_search_none': 'Nessuna parola chiave trovata.',
+        'keyword_search_by_directory': 'Parole chiave trovate per directory'
     }
 }
 
@@ -708,6 +1133,12 @@ def get_text(key, lang='fr'):
     """Récupère le texte traduit pour une clé donnée."""
     return TRANSLATIONS.get(lang, TRANSLATIONS['fr']).get(key, key)
 
+def get_level_text(level_keys, generic_key, level, lang='fr'):
+    """Texte propre à un niveau de directory : clé dédiée pour les premiers niveaux, clé générique ({level}) au-delà."""
+    if level <= len(level_keys):
+        return get_text(level_keys[level - 1], lang)
+    return get_text(generic_key, lang).format(level=level)
+
 def get_available_languages():
     """Retourne la liste des langues disponibles."""
     return {
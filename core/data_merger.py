@@ -2,30 +2,115 @@
 Logique de jointure et agrégation des données sitemap et SEMrush
 """
 
+import numpy as np
 import pandas as pd
 import logging
-from core.semrush_processor import prepare_semrush_data
+from pandas.api.types import union_categoricals
+from core.url_batches import iter_url_batches
+from utils.data_utils import to_categories, get_directory_columns
 
 logger = logging.getLogger(__name__)
 
-def create_main_dataframe(sitemap_df, semrush_df):
-    """Crée le dataframe principal avec jointure sitemap et SEMrush."""
+def _iter_store_urls(url_store):
+    """Batches du stockage Arrow avec les mêmes regroupements de catégories que le tableau agrégé."""
+    for batch_df in iter_url_batches(url_store['path']):
+        batch_df.loc[batch_df['dir_1'].isin(url_store['single_categories']), 'dir_1'] = 'no directory'
+        yield batch_df[batch_df['dir_1'].isin(url_store['top_categories'])]
+
+def load_matching_store_urls(url_store, keys, domain):
+    """
+    Relit le stockage Arrow batch par batch et ne garde que les URLs dont la clé
+    de jointure est demandée, avec les mêmes regroupements de catégories que le
+    tableau agrégé.
+    """
+    matched = [batch_df[batch_df['url_key'].isin(keys)] for batch_df in _iter_store_urls(url_store)]
+
+    sitemap_df = pd.concat(matched, ignore_index=True)
+    sitemap_df.insert(0, 'dominio', domain)
+    sitemap_df = to_categories(sitemap_df, ['dominio'] + get_directory_columns(sitemap_df))
+    logger.info(f"URLs du stockage Arrow correspondant aux données SEMrush : {len(sitemap_df)}")
+    return sitemap_df
+
+def build_url_directory_index(sitemap_df, url_store=None):
+    """
+    Directories de chaque URL du sitemap, triés par clé de jointure (une ligne par clé).
+
+    Construit une fois par analyse : clés 64 bits et codes de catégories, sans
+    les URLs. En mode hors mémoire, le stockage Arrow n'est relu qu'à ce moment.
+    """
+    dir_columns = get_directory_columns(sitemap_df)
+    if url_store:
+        keys, directories = [], {dir_col: [] for dir_col in dir_columns}
+        for batch_df in _iter_store_urls(url_store):
+            keys.append(batch_df['url_key'].to_numpy(dtype=np.uint64))
+            for dir_col in dir_columns:
+                directories[dir_col].append(batch_df[dir_col].astype('category'))
+        index_df = pd.DataFrame({
+            'url_key': np.concatenate(keys) if keys else np.array([], dtype=np.uint64),
+            **{dir_col: union_categoricals(values, ignore_order=True) if values else pd.Categorical([])
+               for dir_col, values in directories.items()}
+        })
+    else:
+        index_df = sitemap_df[['url_key'] + dir_columns]
+
+    index_df = index_df.drop_duplicates('url_key').sort_values('url_key', ignore_index=True)
+    logger.info(f"Index des directories par URL construit : {len(index_df)} URLs")
+    return index_df
+
+def match_url_directories(url_index, semrush_df):
+    """
+    URLs SEMrush présentes dans le sitemap, avec leurs directories.
+
+    Recherche dichotomique des clés dans l'index trié : l'URL SEMrush tient lieu
+    d'URL du sitemap (même URL canonique).
+    """
+    index_keys = url_index['url_key'].to_numpy()
+    keys = semrush_df['url_key'].to_numpy(dtype=np.uint64)
+    if not len(index_keys) or not len(keys):
+        return pd.DataFrame()
+
+    positions = np.minimum(np.searchsorted(index_keys, keys), len(index_keys) - 1)
+    found = index_keys[positions] == keys
+    matched_df = pd.concat([
+        url_index.iloc[positions[found]].drop(columns='url_key').reset_index(drop=True),
+        semrush_df[found].drop(columns='url_key').reset_index(drop=True)
+    ], axis=1)
+    matched_df.insert(0, 'url', matched_df['URL'])
+    return matched_df
+
+def count_urls_by(sitemap_df, dir_col):
+    """Compte les URLs du sitemap par directory (tableau détaillé ou agrégé)."""
+    if 'count' in sitemap_df.columns:
+        return sitemap_df.groupby(dir_col, observed=True)['count'].sum().rename('url').reset_index()
+    return sitemap_df.groupby(dir_col, observed=True)['url'].count().reset_index()
+
+def create_main_dataframe(sitemap_df, semrush_df, url_store=None):
+    """
+    Crée le dataframe principal avec jointure sitemap et SEMrush.
+
+    `semrush_df` est le tableau SEMrush agrégé par URL, marché et type de position
+    (voir process_semrush_files).
+
+    Si `url_store` est fourni (mode hors mémoire), `sitemap_df` est le tableau
+    agrégé et les URLs sont relues depuis le stockage Arrow batch par batch.
+    """
     logger.info("Création du main dataframe")
 
-    # Préparation des données SEMrush
-    semrush_prepared = prepare_semrush_data(semrush_df)
+    semrush_prepared = semrush_df
 
     if semrush_prepared.empty:
         logger.warning("Pas de données SEMrush disponibles")
         return pd.DataFrame(), pd.DataFrame()
 
-    # Jointure avec les données du sitemap
-    main_df = sitemap_df.merge(
+    if url_store:
+        sitemap_df = load_matching_store_urls(url_store, semrush_prepared['url_key'], sitemap_df['dominio'].iloc[0])
+
+    # Jointure sur les clés 64 bits des URLs canoniques (une URL du sitemap par clé)
+    main_df = sitemap_df.drop_duplicates('url_key').merge(
         semrush_prepared,
-        left_on='url',
-        right_on='URL',
+        on='url_key',
         how='right'  # Pour garder toutes les URLs de SEMrush
-    )
+    ).drop(columns='url_key')
 
     # Identification des URLs non présentes dans le sitemap
     urls_not_in_sitemap = main_df[main_df['dominio'].isna()].copy()
@@ -35,104 +120,51 @@ def create_main_dataframe(sitemap_df, semrush_df):
 
     return urls_in_sitemap, urls_not_in_sitemap
 
-def create_directory_performance_summary(sitemap_df, semrush_df, dir_1_filter=None, dir_2_filter=None):
-    """Crée un résumé des performances par niveau de directory."""
-    logger.info("Création du résumé des performances par directory")
-
-    summary_dfs = []
-
-    # Analyse niveau 1 (toujours affiché)
-    if dir_1_filter is None:
-        # Compter d'abord le nombre total d'URLs depuis le sitemap
-        sitemap_counts = sitemap_df.groupby('dir_1')['url'].count().reset_index()
-
-        # Calculer les métriques SEMrush par URL unique
-        semrush_metrics = semrush_df.groupby(['dir_1', 'url']).agg({
-            'Traffic': 'sum',
-            'Number of Keywords': 'sum',
-            'Search Volume': 'sum'
-        }).reset_index().groupby('dir_1').sum().drop('url', axis=1).reset_index()
-
-        # Joindre les deux ensembles de données
-        dir_1_summary = sitemap_counts.merge(
-            semrush_metrics,
-            on='dir_1',
-            how='left'
-        ).fillna(0)
-
-        dir_1_summary['Niveau'] = 'Dir_1'
-        dir_1_summary = dir_1_summary.rename(columns={
-            'dir_1': 'Directory',
-            'url': 'Nombre URLs',
-            'Traffic': 'Traffic Total',
-            'Number of Keywords': 'Total Mots-clés',
-            'Search Volume': 'Volume Total'
-        })
-        summary_dfs.append(dir_1_summary)
-
-    # Analyse niveau 2 (si dir_1 est filtré et dir_2 n'est pas filtré)
-    if dir_1_filter is not None and dir_2_filter is None:
-        filtered_sitemap = sitemap_df[sitemap_df['dir_1'] == dir_1_filter]
-        filtered_semrush = semrush_df[semrush_df['dir_1'] == dir_1_filter]
-
-        sitemap_counts = filtered_sitemap.groupby('dir_2')['url'].count().reset_index()
-
-        semrush_metrics = filtered_semrush.groupby(['dir_2', 'url']).agg({
-            'Traffic': 'sum',
-            'Number of Keywords': 'sum',
-            'Search Volume': 'sum'
-        }).reset_index().groupby('dir_2').sum().drop('url', axis=1).reset_index()
-
-        dir_2_summary = sitemap_counts.merge(
-            semrush_metrics,
-            on='dir_2',
-            how='left'
-        ).fillna(0)
-
-        dir_2_summary['Niveau'] = 'Dir_2'
-        dir_2_summary = dir_2_summary.rename(columns={
-            'dir_2': 'Directory',
-            'url': 'Nombre URLs',
-            'Traffic': 'Traffic Total',
-            'Number of Keywords': 'Total Mots-clés',
-            'Search Volume': 'Volume Total'
-        })
-        summary_dfs.append(dir_2_summary)
-
-    # Analyse niveau 3 (si dir_1 et dir_2 sont filtrés)
-    if dir_1_filter is not None and dir_2_filter is not None:
-        filtered_sitemap = sitemap_df[
-            (sitemap_df['dir_1'] == dir_1_filter) &
-            (sitemap_df['dir_2'] == dir_2_filter)
-        ]
-        filtered_semrush = semrush_df[
-            (semrush_df['dir_1'] == dir_1_filter) &
-            (semrush_df['dir_2'] == dir_2_filter)
-        ]
-
-        sitemap_counts = filtered_sitemap.groupby('dir_3')['url'].count().reset_index()
-
-        semrush_metrics = filtered_semrush.groupby(['dir_3', 'url']).agg({
-            'Traffic': 'sum',
-            'Number of Keywords': 'sum',
-            'Search Volume': 'sum'
-        }).reset_index().groupby('dir_3').sum().drop('url', axis=1).reset_index()
-
-        dir_3_summary = sitemap_counts.merge(
-            semrush_metrics,
-            on='dir_3',
-            how='left'
-        ).fillna(0)
-
-        dir_3_summary['Niveau'] = 'Dir_3'
-        dir_3_summary = dir_3_summary.rename(columns={
-            'dir_3': 'Directory',
-            'url': 'Nombre URLs',
-            'Traffic': 'Traffic Total',
-            'Number of Keywords': 'Total Mots-clés',
-            'Search Volume': 'Volume Total'
-        })
-        summary_dfs.append(dir_3_summary)
-
-    result = pd.concat(summary_dfs, ignore_index=True)
-    return result.sort_values(by='Traffic Total', ascending=False).reset_index(drop=True)
\ No newline at end of file
+def create_directory_performance_summary(sitemap_df, semrush_df, path=()):
+    """
+    Crée un résumé des performances par niveau de directory.
+
+    Le résumé porte sur le niveau qui suit le chemin sélectionné `path`
+    (dir_1 sans sélection, dir_2 sous un dir_1, ...), limité au dernier niveau
+    de la hiérarchie. `sitemap_df` peut être le tableau agrégé par chemin (rollup).
+    """
+    logger.info(f"Création du résumé des performances par directory - Chemin: {'/'.join(path) or 'aucun'}")
+
+    dir_columns = get_directory_columns(sitemap_df)
+    level = min(len(path) + 1, len(dir_columns))
+    path = tuple(path)[:level - 1]
+    dir_col = dir_columns[level - 1]
+
+    filtered_sitemap = sitemap_df
+    filtered_semrush = semrush_df
+    for parent_col, directory in zip(dir_columns, path):
+        filtered_sitemap = filtered_sitemap[filtered_sitemap[parent_col] == directory]
+        filtered_semrush = filtered_semrush[filtered_semrush[parent_col] == directory]
+
+    # Compter d'abord le nombre total d'URLs depuis le sitemap
+    sitemap_counts = count_urls_by(filtered_sitemap, dir_col)
+
+    # Calculer les métriques SEMrush par URL unique
+    semrush_metrics = filtered_semrush.groupby([dir_col, 'url'], observed=True).agg({
+        'Traffic': 'sum',
+        'Number of Keywords': 'sum',
+        'Search Volume': 'sum'
+    }).reset_index().drop(columns='url').groupby(dir_col, observed=True).sum().reset_index()
+
+    # Joindre les deux ensembles de données
+    summary = sitemap_counts.merge(
+        semrush_metrics,
+        on=dir_col,
+        how='left'
+    ).fillna(0)
+
+    summary['Niveau'] = f'Dir_{level}'
+    summary = summary.rename(columns={
+        dir_col: 'Directory',
+        'url': 'Nombre URLs',
+        'Traffic': 'Traffic Total',
+        'Number of Keywords': 'Total Mots-clés',
+        'Search Volume': 'Volume Total'
+    })
+
+    return summary.sort_values(by='Traffic Total', ascending=False).reset_index(drop=True)
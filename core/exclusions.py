@@ -0,0 +1,177 @@
+"""
+Moteur d'exclusions compilé - Règles exactes, préfixes, globs et regex sur les niveaux de directories
+"""
+
+import fnmatch
+import logging
+import re
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Préfixe des règles écrites en expression régulière (ex. "re:^fr-[a-z]{2}$")
+REGEX_PREFIX = 're:'
+
+# Caractères qui font d'une règle un glob (ex. "page-*", "fr-??")
+GLOB_CHARACTERS = '*?['
+
+# Drapeaux globaux en tête d'une regex (ex. "(?i)") : convertis en drapeaux locaux "(?i:...)"
+GLOBAL_FLAGS_PATTERN = re.compile(r'\(\?([aiLmsux]+)\)')
+
+
+def parse_rule(pattern):
+    """
+    Retourne (type, expression régulière) d'une règle : exact, prefix, glob ou regex.
+
+    L'expression est appliquée à la valeur entière du directory ; une règle regex
+    est recherchée n'importe où dans la valeur (ancres ^ et $ possibles).
+    """
+    if pattern.startswith(REGEX_PREFIX):
+        expression = pattern[len(REGEX_PREFIX):]
+        flags = GLOBAL_FLAGS_PATTERN.match(expression)
+        if flags:
+            expression = expression[flags.end():]
+        group = f'(?{flags.group(1) if flags else ""}:{expression})'
+        # Ancrée en début de valeur : inutile d'essayer chaque position
+        return 'regex', f'{group}.*' if expression.startswith('^') else f'.*?{group}.*'
+    if not any(char in pattern for char in GLOB_CHARACTERS):
+        return 'exact', None
+    if pattern.endswith('*') and not any(char in pattern[:-1] for char in GLOB_CHARACTERS):
+        return 'prefix', None
+    return 'glob', fnmatch.translate(pattern)
+
+
+class ExclusionEngine:
+    """Exclusions compilées une fois pour toute l'analyse, appliquées aux catégories des niveaux et non aux lignes."""
+
+    def __init__(self, exclusions):
+        self.rules = []
+        self._exact = {}
+        self._prefixes = {}
+        self._regexes = {}
+
+        for dir_level, patterns in exclusions.items():
+            prefixes = {}
+            expressions = []
+            for pattern in patterns:
+                rule_id = len(self.rules)
+                kind, expression = parse_rule(pattern)
+                if kind == 'exact':
+                    self._exact.setdefault((dir_level, pattern), rule_id)
+                elif kind == 'prefix':
+                    prefixes.setdefault(pattern[:-1], rule_id)
+                else:
+                    expressions.append((rule_id, pattern, expression))
+                self.rules.append({'level': dir_level, 'pattern': pattern, 'kind': kind})
+
+            if prefixes:
+                self._prefixes[dir_level] = (prefixes, sorted({len(prefix) for prefix in prefixes}))
+            if expressions:
+                self._regexes[dir_level] = self._compile_level(dir_level, expressions)
+
+        self._levels = list(dict.fromkeys(rule['level'] for rule in self.rules))
+        self._value_rules = {dir_level: {} for dir_level in self._levels}
+        self.counts = np.zeros(len(self.rules), dtype=np.int64)
+
+        logger.info(f"Exclusions compilées - {len(self.rules)} règles sur {len(self._levels)} niveaux")
+
+    def _compile_level(self, dir_level, expressions):
+        """
+        Compile les globs et regex d'un niveau : (expression fusionnée ou None, [(règle, regex séparée)]).
+
+        Les règles invalides sont écartées ; celles qui définissent des groupes
+        sont appliquées séparément, comme toutes les règles si la fusion échoue.
+        """
+        merged = []
+        separate = []
+        for rule_id, pattern, expression in expressions:
+            try:
+                regex = re.compile(expression, re.DOTALL)
+            except re.error as e:
+                logger.error(f"Règle d'exclusion ignorée ({dir_level}: {pattern}) : {e}")
+                self.rules[rule_id]['kind'] = 'invalid'
+                continue
+            if regex.groups:
+                separate.append((rule_id, regex))
+            else:
+                merged.append((rule_id, expression, regex))
+
+        if not merged:
+            return None, separate
+        try:
+            combined = re.compile('|'.join(f'(?P<r{rule_id}>{expression})' for rule_id, expression, _ in merged),
+                                  re.DOTALL)
+        except re.error as e:
+            logger.warning(f"Fusion des règles d'exclusion impossible ({dir_level}) : {e}")
+            return None, sorted(separate + [(rule_id, regex) for rule_id, _, regex in merged], key=lambda rule: rule[0])
+        return combined, separate
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def _value_rule(self, dir_level, value):
+        """Première règle (par ordre de saisie) qui couvre une valeur d'un niveau, -1 sinon."""
+        candidates = []
+        exact_rule = self._exact.get((dir_level, value))
+        if exact_rule is not None:
+            candidates.append(exact_rule)
+        if dir_level in self._prefixes:
+            prefixes, lengths = self._prefixes[dir_level]
+            candidates += [prefixes[value[:length]] for length in lengths
+                           if length <= len(value) and value[:length] in prefixes]
+        if dir_level in self._regexes:
+            combined, separate = self._regexes[dir_level]
+            match = combined.fullmatch(value) if combined is not None else None
+            if match is not None:
+                candidates.append(int(match.lastgroup[1:]))
+            separate_rule = next((rule_id for rule_id, regex in separate if regex.fullmatch(value)), None)
+            if separate_rule is not None:
+                candidates.append(separate_rule)
+        return min(candidates, default=-1)
+
+    def _category_rules(self, dir_level, categories):
+        """Règle associée à chaque catégorie d'un niveau (mémorisée d'un batch à l'autre)."""
+        value_rules = self._value_rules[dir_level]
+        for value in categories:
+            if value not in value_rules:
+                value_rules[value] = self._value_rule(dir_level, value)
+        return np.array([value_rules[value] for value in categories], dtype=np.int64)
+
+    def match(self, url_df):
+        """Règle appliquée à chaque ligne (-1 : ligne conservée)."""
+        row_rules = np.full(len(url_df), -1, dtype=np.int64)
+        for dir_level in self._levels:
+            if dir_level not in url_df.columns:
+                continue
+            column = url_df[dir_level]
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype('category')
+            category_rules = self._category_rules(dir_level, column.cat.categories)
+            if not (category_rules >= 0).any():
+                continue
+            codes = column.cat.codes.to_numpy()
+            level_rules = np.where(codes >= 0, category_rules[codes], -1)
+            # Les niveaux précédents sont prioritaires
+            row_rules = np.where(row_rules >= 0, row_rules, level_rules)
+        return row_rules
+
+    def apply(self, url_df):
+        """Retourne le masque des lignes exclues et met à jour les comptages par règle."""
+        row_rules = self.match(url_df)
+        excluded = row_rules >= 0
+        self.counts += np.bincount(row_rules[excluded], minlength=len(self.rules))
+        return excluded
+
+    def report(self):
+        """Tableau du nombre d'URLs exclues par règle."""
+        report_df = pd.DataFrame(self.rules, columns=['level', 'pattern', 'kind'])
+        report_df['excluded'] = self.counts
+        return report_df
+
+
+def compile_exclusions(exclusions):
+    """Compile un dictionnaire {dir_N: [règles]} (déjà compilé : retourné tel quel)."""
+    if isinstance(exclusions, ExclusionEngine):
+        return exclusions
+    return ExclusionEngine({dir_level: patterns for dir_level, patterns in (exclusions or {}).items() if patterns})
@@ -0,0 +1,106 @@
+"""
+Cache de fichiers sur disque - Index SQLite des entrées et éviction LRU par taille, commun aux caches HTTP et SEMrush
+"""
+
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Base des caches disque : fichiers par entrée, index SQLite et éviction LRU.
+
+    Les sous-classes déclarent leurs colonnes (COLUMNS) et les suffixes des
+    fichiers d'une entrée (FILE_SUFFIXES).
+    """
+
+    # Libellé du cache dans les logs
+    LABEL = ''
+
+    # Colonnes propres au cache, en SQL (ex. "url TEXT")
+    COLUMNS = ()
+
+    # Suffixes des fichiers d'une entrée (<clé>.<suffixe>)
+    FILE_SUFFIXES = ()
+
+    def __init__(self, directory, max_size_mb):
+        self.directory = directory
+        self.max_size = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        columns = ', '.join(('key TEXT PRIMARY KEY', *self.COLUMNS, 'size INTEGER', 'stored_at REAL', 'last_access REAL'))
+        with self._connect() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS entries ({columns})")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _file_path(self, key, suffix):
+        return os.path.join(self.directory, f'{key}.{suffix}')
+
+    @staticmethod
+    def _touch(conn, key):
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+    def _insert(self, key, values, size):
+        """Enregistre (ou remplace) l'entrée d'une clé puis applique l'éviction."""
+        now = time.time()
+        row = (key, *values, size, now, now)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO entries VALUES ({', '.join('?' * len(row))})", row)
+        self.evict()
+
+    def _remove(self, conn, key):
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        for suffix in self.FILE_SUFFIXES:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._file_path(key, suffix))
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+        with self._lock, self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_size:
+                return
+
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_size:
+                    break
+                self._remove(conn, key)
+                total -= size
+                evicted += 1
+
+        logger.info(f"Cache {self.LABEL} : {evicted} entrées évincées")
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock, self._connect() as conn:
+            keys = [key for (key,) in conn.execute("SELECT key FROM entries").fetchall()]
+            for key in keys:
+                self._remove(conn, key)
+        logger.info(f"Cache {self.LABEL} vidé - {len(keys)} entrées supprimées")
+
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_cache(cache_class):
+    """Retourne l'instance partagée d'une classe de cache (créée à la demande)."""
+    with _shared_caches_lock:
+        if cache_class not in _shared_caches:
+            _shared_caches[cache_class] = cache_class()
+        return _shared_caches[cache_class]
@@ -0,0 +1,132 @@
+"""
+Cache HTTP sur disque - Corps bruts et validateurs (ETag / Last-Modified) avec éviction LRU
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from config.settings import HTTP_CACHE_SETTINGS
+from core.file_cache import FileCache, get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache(FileCache):
+    """
+    Cache persistant des réponses HTTP.
+
+    Les corps sont stockés dans des fichiers, les métadonnées (validateurs,
+    taille, dates) dans l'index SQLite de FileCache, borné par une éviction LRU.
+    """
+
+    LABEL = 'HTTP'
+    COLUMNS = ('url TEXT', 'etag TEXT', 'last_modified TEXT', 'content_type TEXT')
+    FILE_SUFFIXES = ('body',)
+
+    def __init__(self, directory=None, max_size_mb=None, max_age=None):
+        super().__init__(directory or HTTP_CACHE_SETTINGS['directory'],
+                         max_size_mb or HTTP_CACHE_SETTINGS['max_size_mb'])
+        self.max_age = max_age if max_age is not None else HTTP_CACHE_SETTINGS['max_age']
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return self._file_path(key, 'body')
+
+    def get(self, url):
+        """Retourne l'entrée en cache (dictionnaire) pour une URL, ou None."""
+        key = self._key(url)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, content_type, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or not os.path.exists(self._body_path(key)):
+                return None
+            self._touch(conn, key)
+
+        etag, last_modified, content_type, stored_at = row
+        return {
+            'key': key,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'fresh': time.time() - stored_at < self.max_age
+        }
+
+    def read_body(self, entry):
+        """Lit le corps stocké pour une entrée."""
+        with self.open_body(entry) as f:
+            return f.read()
+
+    def open_body(self, entry):
+        """Ouvre le corps stocké en lecture binaire (lecture par morceaux)."""
+        return open(self._body_path(entry['key']), 'rb')
+
+    def refresh(self, entry):
+        """Marque une entrée comme revalidée (réponse 304)."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE entries SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, entry['key'])
+            )
+
+    def store(self, url, content, headers):
+        """Enregistre le corps et les validateurs d'une réponse 200."""
+        writer = self.open_writer(url, headers)
+        writer.write(content)
+        writer.commit()
+
+    def open_writer(self, url, headers):
+        """Retourne un writer qui enregistre un corps par morceaux, validé à la fin."""
+        return CacheWriter(self, url, headers)
+
+    def _commit(self, url, tmp_path, size, headers):
+        key = self._key(url)
+        os.replace(tmp_path, self._body_path(key))
+        self._insert(key, (url, headers.get('ETag'), headers.get('Last-Modified'), headers.get('Content-Type', '')),
+                     size)
+
+
+class CacheWriter:
+    """Écrit un corps de réponse dans un fichier temporaire, publié dans le cache au commit."""
+
+    def __init__(self, cache, url, headers):
+        self._cache = cache
+        self._url = url
+        self._headers = headers
+        self._tmp_path = f'{cache._body_path(cache._key(url))}.{threading.get_ident()}.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._size = 0
+        self.closed = False
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self._size += len(chunk)
+
+    def commit(self):
+        """Publie le corps complet dans le cache."""
+        if self.closed:
+            return
+        self.closed = True
+        self._file.close()
+        self._cache._commit(self._url, self._tmp_path, self._size, self._headers)
+
+    def abort(self):
+        """Abandonne un corps incomplet."""
+        if self.closed:
+            return
+        self.closed = True
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def get_http_cache():
+    """Retourne le cache HTTP partagé (créé à la demande)."""
+    return get_shared_cache(HttpCache)
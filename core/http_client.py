@@ -0,0 +1,192 @@
+"""
+Client HTTP partagé - Session avec pool de connexions pour robots.txt et sitemaps
+"""
+
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from requests.structures import CaseInsensitiveDict
+from config.settings import (
+    DEFAULT_HEADERS, DEFAULT_LIMITS, HTTP_SETTINGS, CRAWLER_SETTINGS, HTTP_CACHE_SETTINGS,
+    RATE_LIMIT_SETTINGS
+)
+from core.http_cache import get_http_cache
+from core.rate_limiter import get_rate_limiter, host_of, parse_retry_after, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size=None):
+    """Crée une session HTTP avec keep-alive, pool de connexions et politique de retry."""
+    pool_size = pool_size or CRAWLER_SETTINGS['max_concurrency']
+
+    retry = Retry(
+        total=HTTP_SETTINGS['retries'],
+        backoff_factor=HTTP_SETTINGS['backoff_factor'],
+        status_forcelist=HTTP_SETTINGS['retry_statuses'],
+        allowed_methods=('GET', 'HEAD'),
+        # Retry-After (429/503) est géré par le limiteur de débit par hôte
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_SETTINGS['pool_connections'],
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    # Encodages compressés supportés par urllib3 (gzip, deflate, br/zstd si disponibles)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    logger.info(f"Session HTTP créée - pool de {pool_size} connexions par hôte")
+    return session
+
+
+def get_session():
+    """Retourne la session HTTP partagée par le processus (créée à la demande)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def http_get(url, timeout=None, **kwargs):
+    """Effectue une requête GET via la session partagée."""
+    timeout = timeout or DEFAULT_LIMITS['request_timeout']
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+class _CacheTeeReader:
+    """Lit le corps d'une réponse en flux tout en l'écrivant dans le cache."""
+
+    def __init__(self, raw, writer):
+        self._raw = raw
+        self._writer = writer
+
+    def read(self, amt=None):
+        chunk = self._raw.read(amt, decode_content=True)
+        if chunk:
+            self._writer.write(chunk)
+        else:
+            self._writer.commit()
+        return chunk
+
+    def close(self):
+        self._writer.abort()
+        self._raw.close()
+
+    def release_conn(self):
+        self._raw.release_conn()
+
+
+def _response_from_cache(url, cache, entry, stream=False):
+    """Construit une réponse 200 à partir d'une entrée du cache."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({'Content-Type': entry['content_type']})
+    if stream:
+        # Le fichier sert de flux brut : iter_content le lit par morceaux
+        response.raw = cache.open_body(entry)
+    else:
+        response._content = cache.read_body(entry)
+    response.from_cache = True
+    return response
+
+
+def cached_get(url, timeout=None, stream=False, before_request=None):
+    """
+    GET avec cache disque : réutilise une entrée fraîche sans requête,
+    sinon envoie une requête conditionnelle et réutilise le corps stocké sur un 304.
+
+    Avec stream=True, le corps est lu par morceaux via iter_content, que ce soit
+    depuis le disque ou depuis le réseau (écrit dans le cache au fil de la lecture).
+    `before_request()` est appelé juste avant la requête réseau, jamais pour une
+    entrée fraîche servie depuis le disque.
+    """
+    if not HTTP_CACHE_SETTINGS['enabled']:
+        if before_request is not None:
+            before_request()
+        return http_get(url, timeout=timeout, stream=stream)
+
+    cache = get_http_cache()
+    entry = cache.get(url)
+
+    if entry is not None and entry['fresh']:
+        logger.info(f"Cache HTTP (frais) : {url}")
+        return _response_from_cache(url, cache, entry, stream)
+
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    if before_request is not None:
+        before_request()
+    response = http_get(url, timeout=timeout, headers=headers, stream=stream)
+
+    if response.status_code == 304 and entry is not None:
+        logger.info(f"Cache HTTP (revalidé 304) : {url}")
+        response.close()
+        cache.refresh(entry)
+        return _response_from_cache(url, cache, entry, stream)
+
+    if response.status_code == 200:
+        if stream:
+            response.raw = _CacheTeeReader(response.raw, cache.open_writer(url, response.headers))
+        else:
+            cache.store(url, response.content, response.headers)
+    response.from_cache = False
+    return response
+
+
+def throttled_get(url, timeout=None, stream=False):
+    """
+    GET (avec cache disque) soumis au limiteur de débit de l'hôte.
+
+    Seules les requêtes qui partent sur le réseau consomment un jeton : une entrée
+    fraîche du cache est servie sans attendre le limiteur. Les réponses 429/503
+    sont réessayées après le délai Retry-After ou un backoff exponentiel avec
+    jitter, et réduisent le débit autorisé pour l'hôte.
+    """
+    limiter = get_rate_limiter()
+    host = host_of(url)
+    max_retries = RATE_LIMIT_SETTINGS['max_retries']
+    requested = False
+
+    def acquire():
+        nonlocal requested
+        requested = True
+        limiter.acquire(host)
+
+    for attempt in range(max_retries + 1):
+        requested = False
+        response = cached_get(url, timeout=timeout, stream=stream, before_request=acquire)
+
+        if response.status_code not in RATE_LIMIT_SETTINGS['throttle_statuses']:
+            if requested:
+                limiter.on_success(host)
+            return response
+
+        delay = parse_retry_after(response.headers.get('Retry-After')) or backoff_delay(attempt)
+        delay = min(delay, RATE_LIMIT_SETTINGS['max_backoff'])
+        response.close()
+        limiter.on_throttle(host, delay)
+        if attempt < max_retries:
+            logger.info(f"Réponse {response.status_code} pour {url}, nouvelle tentative {attempt + 1}/{max_retries}")
+
+    logger.error(f"Abandon après {max_retries} tentatives limitées pour {url}")
+    return response
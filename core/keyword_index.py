@@ -0,0 +1,142 @@
+"""
+Index inversé des mots-clés SEMrush - Recherche par préfixe ou par mots sur des tables Arrow triées
+"""
+
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Séparateurs de mots : tout ce qui n'est ni une lettre ni un chiffre
+WORD_SEPARATOR_PATTERN = r'[^\p{L}\p{N}]+'
+
+# Borne supérieure de toutes les chaînes commençant par un préfixe donné
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def normalize_keywords(keywords):
+    """Forme normalisée des mots-clés : minuscules, sans accents ni ponctuation, mots séparés par un espace."""
+    keywords = pa.array(keywords, type=pa.string(), from_pandas=True)
+    if isinstance(keywords, pa.ChunkedArray):
+        keywords = keywords.combine_chunks()
+    keywords = pc.replace_substring_regex(pc.utf8_normalize(pc.fill_null(keywords, ''), 'NFKD'), r'\p{Mn}', '')
+    keywords = pc.replace_substring_regex(pc.utf8_lower(keywords), WORD_SEPARATOR_PATTERN, ' ')
+    return pc.utf8_trim_whitespace(keywords)
+
+
+def normalize_query(query):
+    """Requête de recherche normalisée comme les mots-clés indexés."""
+    return normalize_keywords([query])[0].as_py()
+
+
+def _grouped_lists(codes, values, size):
+    """ListArray des valeurs regroupées par code (codes triés, de 0 à size - 1)."""
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=size))))
+    return pa.ListArray.from_arrays(pa.array(offsets.astype(np.int32)), pa.array(values.astype(np.int32)))
+
+
+def build_keyword_index(keywords):
+    """
+    Construit l'index d'une colonne de mots-clés et retourne deux tables triées :
+
+    - termes : un mot-clé normalisé par ligne ('term') et les numéros des
+      lignes de l'export où il apparaît ('rows') ;
+    - mots : un mot par ligne ('token') et les termes qui le contiennent ('terms').
+    """
+    terms = normalize_keywords(keywords)
+    term_codes, term_values = pd.factorize(pd.Series(terms, dtype=pd.ArrowDtype(pa.string())), sort=True)
+    rows = np.argsort(term_codes, kind='stable')
+    terms_table = pa.table({
+        'term': pa.array(term_values, type=pa.string()),
+        'rows': _grouped_lists(term_codes[rows], rows, len(term_values))
+    })
+
+    words = pc.utf8_split_whitespace(terms_table['term'].combine_chunks())
+    word_codes, word_values = pd.factorize(pd.Series(words.flatten(), dtype=pd.ArrowDtype(pa.string())), sort=True)
+    # Couples (mot, terme) distincts, triés par mot puis par terme
+    term_count = max(len(term_values), 1)
+    pairs = np.unique(word_codes.astype(np.int64) * term_count + pc.list_parent_indices(words).to_numpy())
+    tokens_table = pa.table({
+        'token': pa.array(word_values, type=pa.string()),
+        'terms': _grouped_lists(pairs // term_count, pairs % term_count, len(word_values))
+    })
+
+    logger.info(f"Index des mots-clés construit - {len(term_values)} termes, {len(word_values)} mots")
+    return terms_table, tokens_table
+
+
+def _scalar_value(scalar):
+    return scalar.as_py()
+
+
+def _prefix_range(values, prefix):
+    """Plage [début, fin) des valeurs (tableau trié) qui commencent par `prefix`."""
+    start = bisect.bisect_left(values, prefix, key=_scalar_value)
+    end = bisect.bisect_left(values, prefix + PREFIX_UPPER_BOUND, lo=start, key=_scalar_value)
+    return start, end
+
+
+def _exact_range(values, value):
+    start = bisect.bisect_left(values, value, key=_scalar_value)
+    end = bisect.bisect_right(values, value, lo=start, key=_scalar_value)
+    return start, end
+
+
+class KeywordIndex:
+    """
+    Index d'un export SEMrush, relu par memory-map.
+
+    Les recherches sont des recherches dichotomiques dans les tables triées
+    (quelques dizaines d'accès par requête) suivies de la lecture des listes
+    de lignes : rien n'est parcouru ligne à ligne.
+    """
+
+    def __init__(self, terms_table, tokens_table):
+        self._terms = terms_table.column('term').combine_chunks()
+        self._rows = terms_table.column('rows').combine_chunks()
+        self._tokens = tokens_table.column('token').combine_chunks()
+        self._token_terms = tokens_table.column('terms').combine_chunks()
+
+    def _term_rows(self, term_ids):
+        if len(term_ids) == 0:
+            return np.array([], dtype=np.int32)
+        return self._rows.take(pa.array(term_ids)).flatten().to_numpy()
+
+    def search_prefix(self, query):
+        """Lignes dont le mot-clé normalisé commence par la requête normalisée."""
+        start, end = _prefix_range(self._terms, query)
+        return self._rows.slice(start, end - start).flatten().to_numpy()
+
+    def search_tokens(self, words):
+        """
+        Lignes dont le mot-clé contient tous les mots de la requête (le dernier
+        mot comme préfixe, pour une recherche au fil de la saisie).
+        """
+        term_lists = []
+        for i, word in enumerate(words):
+            start, end = _prefix_range(self._tokens, word) if i == len(words) - 1 else _exact_range(self._tokens, word)
+            term_lists.append(self._token_terms.slice(start, end - start).flatten().to_numpy())
+
+        # Intersection en partant du mot le plus sélectif : les autres listes ne servent qu'à filtrer les candidats
+        term_lists.sort(key=len)
+        # Termes distincts et triés par un masque sur tous les termes (plus rapide qu'un np.unique)
+        selected = np.zeros(len(self._terms), dtype=bool)
+        selected[term_lists[0]] = True
+        term_ids = np.flatnonzero(selected)
+        for word_term_ids in term_lists[1:]:
+            if len(term_ids) == 0:
+                break
+            term_ids = term_ids[np.isin(term_ids, word_term_ids, kind='table')]
+        return self._term_rows(term_ids)
+
+    def search(self, query, mode='prefix'):
+        """Numéros des lignes de l'export correspondant à une requête normalisée (mode 'prefix' ou 'tokens')."""
+        if not query:
+            return np.array([], dtype=np.int32)
+        if mode == 'tokens':
+            return self.search_tokens(query.split(' '))
+        return self.search_prefix(query)
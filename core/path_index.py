@@ -0,0 +1,103 @@
+"""
+Index des chemins d'URLs - Tableau trié par chemin avec comptages et plages de lignes par préfixe
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from utils.data_utils import to_categories, get_directory_columns
+
+logger = logging.getLogger(__name__)
+
+
+class PathIndex:
+    """
+    Index hiérarchique dir_1/dir_2/... construit une fois par analyse.
+
+    Le tableau est trié par codes de catégories, niveau après niveau : toutes
+    les lignes sous un préfixe (dir_1, ..., dir_k) forment une plage contiguë
+    retrouvée par une recherche dichotomique par niveau. Les comptages sont
+    lus sur une somme cumulée (colonne `weight_column` pour un tableau agrégé,
+    une URL par ligne sinon).
+
+    `rollup` contient une ligne par chemin complet avec son nombre d'URLs :
+    c'est l'agrégat partagé par le treemap et les résumés par directory,
+    calculé une seule fois quelle que soit la profondeur.
+    """
+
+    def __init__(self, df, dir_columns=None, weight_column=None):
+        self.dir_columns = list(dir_columns or get_directory_columns(df))
+        df = to_categories(df.copy(), self.dir_columns)
+
+        # np.lexsort trie sur la dernière clé en premier, et il est stable (ordre du sitemap conservé)
+        order = np.lexsort([df[dir_col].cat.codes.to_numpy() for dir_col in reversed(self.dir_columns)])
+        self.frame = df.iloc[order].reset_index(drop=True)
+
+        self._codes = [self.frame[dir_col].cat.codes.to_numpy() for dir_col in self.dir_columns]
+        self._categories = [self.frame[dir_col].cat.categories for dir_col in self.dir_columns]
+        weights = self.frame[weight_column].to_numpy() if weight_column else np.ones(len(self.frame), dtype=np.int64)
+        self._cumulative = np.concatenate(([0], np.cumsum(weights, dtype=np.int64)))
+        self._children = {}
+        self.rollup = self._build_rollup()
+
+        logger.info(f"Index des chemins construit - {len(self.frame)} lignes, {len(self.dir_columns)} niveaux")
+
+    def _build_rollup(self):
+        """Agrège le tableau trié par chemin complet (une ligne par feuille de la hiérarchie)."""
+        if self.frame.empty:
+            return self.frame[self._rollup_columns()].assign(count=pd.Series(dtype='int64'))
+        changed = np.zeros(len(self.frame) - 1, dtype=bool)
+        for codes in self._codes:
+            changed |= codes[1:] != codes[:-1]
+        leaf_starts = np.flatnonzero(np.r_[True, changed])
+        counts = np.diff(self._cumulative[np.r_[leaf_starts, len(self.frame)]])
+        rollup = self.frame.iloc[leaf_starts][self._rollup_columns()].reset_index(drop=True)
+        rollup['count'] = counts
+        return rollup
+
+    def _rollup_columns(self):
+        return (['dominio'] if 'dominio' in self.frame.columns else []) + self.dir_columns
+
+    def _range(self, path):
+        """Plage [début, fin) des lignes sous le préfixe `path` (tuple de directories)."""
+        start, end = 0, len(self.frame)
+        for level, value in enumerate(path):
+            code = self._categories[level].get_indexer([value])[0]
+            if code < 0:
+                return 0, 0
+            codes = self._codes[level][start:end]
+            start, end = (start + np.searchsorted(codes, code, side='left'),
+                          start + np.searchsorted(codes, code, side='right'))
+            if start == end:
+                break
+        return start, end
+
+    def count(self, path=()):
+        """Nombre d'URLs sous un préfixe."""
+        start, end = self._range(path)
+        return int(self._cumulative[end] - self._cumulative[start])
+
+    def rows(self, path=()):
+        """Lignes du tableau sous un préfixe (vue sur une plage contiguë, sans masque)."""
+        start, end = self._range(path)
+        return self.frame.iloc[start:end]
+
+    def children(self, path=()):
+        """Directories du niveau suivant sous un préfixe, triées par ordre alphabétique."""
+        path = tuple(path)
+        if path not in self._children:
+            level = len(path)
+            if level >= len(self.dir_columns):
+                return []
+            start, end = self._range(path)
+            codes = self._codes[level][start:end]
+            # Plage triée : les valeurs distinctes commencent là où le code change
+            first_rows = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else []
+            self._children[path] = sorted(self._categories[level][codes[first_rows]].tolist())
+        return self._children[path]
+
+
+def build_path_index(directories_df):
+    """Construit l'index des chemins d'un tableau détaillé ou agrégé (colonne 'count')."""
+    weight_column = 'count' if 'count' in directories_df.columns else None
+    return PathIndex(directories_df, weight_column=weight_column)
@@ -0,0 +1,108 @@
+"""
+Limiteur de débit adaptatif par hôte - Token bucket avec backoff sur 429/503
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+from config.settings import RATE_LIMIT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en délai en secondes."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt):
+    """Délai de backoff exponentiel avec jitter pour la tentative donnée."""
+    delay = min(RATE_LIMIT_SETTINGS['max_backoff'], RATE_LIMIT_SETTINGS['backoff_base'] * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class _HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+
+class HostRateLimiter:
+    """
+    Token bucket par hôte dont le débit s'adapte aux réponses.
+
+    Chaque succès augmente le débit de façon additive, chaque 429/503 le divise
+    (AIMD) et bloque l'hôte pendant le délai Retry-After ou de backoff.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or RATE_LIMIT_SETTINGS
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = _HostBucket(self.settings['initial_rate'], self.settings['burst'])
+        return self._buckets[host]
+
+    def acquire(self, host):
+        """Attend qu'un jeton soit disponible pour l'hôte puis le consomme."""
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+
+                if now >= bucket.blocked_until and bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                wait = max(bucket.blocked_until - now, (1 - bucket.tokens) / bucket.rate)
+            time.sleep(wait)
+
+    def on_success(self, host):
+        """Augmente progressivement le débit après une réponse normale."""
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.rate = min(self.settings['max_rate'], bucket.rate + self.settings['increase'])
+
+    def on_throttle(self, host, delay):
+        """Réduit le débit et suspend l'hôte après une réponse 429/503."""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            # Une seule réduction par épisode de limitation (réponses simultanées)
+            if now >= bucket.blocked_until:
+                bucket.rate = max(self.settings['min_rate'], bucket.rate * self.settings['decrease_factor'])
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            bucket.tokens = 0
+            rate = bucket.rate
+        logger.warning(f"Hôte {host} limité : pause de {delay:.1f}s, débit réduit à {rate:.2f} req/s")
+
+
+_limiter = HostRateLimiter()
+
+
+def get_rate_limiter():
+    """Retourne le limiteur partagé par le processus."""
+    return _limiter
+
+
+def host_of(url):
+    """Retourne l'hôte d'une URL (clé du limiteur)."""
+    return urlparse(url).netloc.lower()
@@ -0,0 +1,125 @@
+"""
+Cache des exports SEMrush - Résultats parsés stockés en Arrow sous l'empreinte du contenu, avec éviction LRU
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+import pandas as pd
+import pyarrow as pa
+from config.settings import SEMRUSH_CACHE_SETTINGS
+from core.file_cache import FileCache, get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Version du format des tables en cache (à incrémenter si le parsing change)
+CACHE_FORMAT_VERSION = 1
+
+# Taille des morceaux lus pour calculer l'empreinte d'un fichier
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file):
+    """Empreinte SHA-256 du contenu d'un fichier uploadé (lu par morceaux, position remise au début)."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _arrow_dtype(arrow_type):
+    """Type pandas d'une colonne relue : Arrow, sauf les colonnes dictionnaire qui restent catégorielles."""
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+class SemrushCache(FileCache):
+    """
+    Cache persistant des exports SEMrush parsés.
+
+    Chaque export est identifié par l'empreinte de son contenu et le marché
+    choisi : un même fichier réuploadé (sous n'importe quel nom) est relu
+    depuis le cache. L'agrégat par URL et, s'il a été demandé, le tableau
+    brut sont stockés en Arrow IPC non compressé et relus par memory-map ;
+    l'index et l'éviction LRU sont ceux de FileCache.
+    """
+
+    LABEL = 'SEMrush'
+    COLUMNS = ('digest TEXT', 'name TEXT', 'market TEXT', 'rows INTEGER', 'has_raw INTEGER')
+    FILE_SUFFIXES = ('aggregate.arrow', 'raw.arrow')
+
+    def __init__(self, directory=None, max_size_mb=None):
+        super().__init__(directory or SEMRUSH_CACHE_SETTINGS['directory'],
+                         max_size_mb or SEMRUSH_CACHE_SETTINGS['max_size_mb'])
+
+    @staticmethod
+    def _key(digest, market):
+        return hashlib.sha256(f'{CACHE_FORMAT_VERSION}:{digest}:{market}'.encode('utf-8')).hexdigest()
+
+    def _table_path(self, key, kind):
+        return self._file_path(key, f'{kind}.arrow')
+
+    def load(self, digest, market, keep_raw=False):
+        """Retourne (agrégat, lignes brutes ou None) pour un export, ou None s'il faut le parser."""
+        key = self._key(digest, market)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT has_raw FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (keep_raw and not row[0]):
+                return None
+            self._touch(conn, key)
+
+        try:
+            aggregated = self._read_table(self._table_path(key, 'aggregate'))
+            raw_df = self._read_table(self._table_path(key, 'raw')) if keep_raw else None
+        except (FileNotFoundError, pa.ArrowInvalid) as e:
+            logger.warning(f"Entrée du cache SEMrush illisible, export relu : {e}")
+            return None
+
+        logger.info(f"Export SEMrush chargé depuis le cache ({digest[:12]}, marché {market})")
+        return aggregated, raw_df
+
+    @staticmethod
+    def _read_table(path):
+        # Colonnes Arrow (pd.ArrowDtype) : les buffers restent ceux du fichier mappé, rien n'est copié
+        # ni converti en numpy/objets Python ; les pages ne sont lues qu'à l'accès
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.to_pandas(types_mapper=_arrow_dtype, self_destruct=True)
+
+    @staticmethod
+    def _write_table(path, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def store(self, digest, name, market, aggregated, raw_df=None):
+        """Enregistre le résultat parsé d'un export."""
+        key = self._key(digest, market)
+        size = self._write_table(self._table_path(key, 'aggregate'), aggregated)
+        if raw_df is not None:
+            size += self._write_table(self._table_path(key, 'raw'), raw_df)
+        else:
+            # Un tableau brut plus ancien ne correspondrait plus à l'agrégat
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._table_path(key, 'raw'))
+
+        rows = len(raw_df) if raw_df is not None else int(aggregated['Number of Keywords'].sum())
+        self._insert(key, (digest, name, market, rows, int(raw_df is not None)), size)
+
+    def entries(self):
+        """Contenu du cache, du plus récemment utilisé au plus ancien."""
+        with self._lock, self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT name, market, rows, has_raw, size, stored_at, last_access, digest "
+                "FROM entries ORDER BY last_access DESC", conn
+            )
+
+
+def get_semrush_cache():
+    """Retourne le cache SEMrush partagé (créé à la demande)."""
+    return get_shared_cache(SemrushCache)
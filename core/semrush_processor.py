@@ -2,50 +2,226 @@
 Processeur de données SEMrush
 """
 
-import pandas as pd
+import concurrent.futures
 import logging
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import streamlit as st
+from config.settings import SEMRUSH_SETTINGS, SEMRUSH_CACHE_SETTINGS
+from core.semrush_cache import file_digest, get_semrush_cache
+from core.url_keys import url_keys
 
 logger = logging.getLogger(__name__)
 
-def prepare_semrush_data(df):
-    """Agrège les données SEMrush par URL, marché et type de position."""
-    if df.empty:
-        return pd.DataFrame()
+# Colonnes lues en mode agrégé et leurs types (les autres colonnes de l'export sont ignorées)
+SEMRUSH_DTYPES = {
+    'Keyword': 'str',
+    'URL': 'str',
+    'Position Type': 'category',
+    'Traffic': 'float32',
+    'Search Volume': 'float32'
+}
+
+# Mêmes types pour le lecteur pyarrow
+SEMRUSH_ARROW_TYPES = {
+    'Keyword': pa.string(),
+    'URL': pa.string(),
+    'Position Type': pa.dictionary(pa.int32(), pa.string()),
+    'Traffic': pa.float32(),
+    'Search Volume': pa.float32()
+}
 
-    logger.info("Préparation des données SEMrush")
+# Clés d'agrégation des données SEMrush
+SEMRUSH_GROUP_COLUMNS = ['URL', 'market', 'Position Type']
+
+# Métriques sommées lors de la fusion de deux agrégats
+SEMRUSH_METRICS = ['Traffic', 'Search Volume', 'Number of Keywords']
+
+def aggregate_semrush_rows(df):
+    """Agrège des lignes SEMrush (une par mot-clé) par URL, marché et type de position."""
+    # Sommes en float64 même si les colonnes ont été lues en float32
+    df = df.astype({'Traffic': 'float64', 'Search Volume': 'float64'})
 
     # Grouper par URL, marché et type de position
-    grouped = df.groupby(['URL', 'market', 'Position Type']).agg({
+    grouped = df.groupby(SEMRUSH_GROUP_COLUMNS, observed=True).agg({
         'Traffic': 'sum',
         'Search Volume': 'sum',
         'Keyword': 'count'  # Compte le nombre de mots clés (lignes) par URL
     }).reset_index()
 
     # Renommer la colonne pour plus de clarté
-    grouped = grouped.rename(columns={'Keyword': 'Number of Keywords'})
+    return grouped.rename(columns={'Keyword': 'Number of Keywords'})
+
+def combine_semrush_aggregates(aggregates):
+    """Fusionne des agrégats partiels (chunks, fichiers) en sommant leurs métriques."""
+    combined = pd.concat(aggregates, ignore_index=True)
+    if len(aggregates) == 1:
+        return combined
+    return combined.groupby(SEMRUSH_GROUP_COLUMNS, observed=True)[SEMRUSH_METRICS].sum().reset_index()
 
-    logger.info(f"Données préparées : {len(grouped)} lignes")
+def finalize_semrush_aggregates(grouped):
+    """Types compacts et clé de jointure avec le sitemap sur le tableau agrégé final."""
+    grouped = grouped.astype({
+        'market': 'category',
+        'Position Type': 'category',
+        'Traffic': 'float64',
+        'Search Volume': 'float64',
+        'Number of Keywords': 'int64'
+    })
+
+    # Clé de jointure avec le sitemap (URL canonique hachée)
+    grouped['url_key'] = url_keys(grouped['URL'])
     return grouped
 
-def process_semrush_files(files, markets):
-    """Traite les fichiers SEMrush uploadés et les combine en un seul DataFrame."""
+def _iter_pandas_chunks(file, columns):
+    """Chunks d'un export lus avec le lecteur C de pandas."""
+    with pd.read_csv(
+        file,
+        sep=';',
+        usecols=None if columns is None else lambda column: column in columns,
+        dtype=SEMRUSH_DTYPES,
+        chunksize=SEMRUSH_SETTINGS['chunk_size']
+    ) as reader:
+        yield from reader
+
+def _iter_pyarrow_chunks(file, columns):
+    """Chunks d'un export lus en streaming par le lecteur CSV multi-thread de pyarrow."""
+    reader = pacsv.open_csv(
+        file,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=SEMRUSH_SETTINGS['block_size']),
+        parse_options=pacsv.ParseOptions(delimiter=';'),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types=SEMRUSH_ARROW_TYPES
+        )
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+def iter_semrush_chunks(file, keep_raw=False, columns=None):
+    """
+    Chunks (DataFrames) d'un export SEMrush, avec pyarrow si le moteur est configuré,
+    sinon ou en cas d'échec de pyarrow avec pandas.
+
+    Sans `keep_raw`, seules les colonnes `columns` sont lues (par défaut celles
+    de SEMRUSH_DTYPES).
+    """
+    columns = None if keep_raw else list(columns or SEMRUSH_DTYPES)
+    if SEMRUSH_SETTINGS['engine'] == 'pyarrow':
+        try:
+            # Le premier bloc est lu avant de rendre la main : un échec de pyarrow bascule sur pandas
+            chunks = _iter_pyarrow_chunks(file, columns)
+            first_chunk = next(chunks, None)
+        except pa.ArrowException as e:
+            logger.warning(f"Lecture pyarrow impossible ({type(e).__name__} : {e}), lecture avec pandas")
+            file.seek(0)
+        else:
+            if first_chunk is not None:
+                yield first_chunk
+                yield from chunks
+            return
+    yield from _iter_pandas_chunks(file, columns)
+
+def read_semrush_file(file, market, keep_raw=False, columns=None, on_chunk=None):
+    """
+    Lit un export SEMrush par chunks et retourne (agrégat, lignes brutes ou None).
+
+    Sans `keep_raw`, seules les colonnes utiles sont lues, avec des types
+    compacts, et chaque chunk est aussitôt replié dans l'agrégat courant :
+    la mémoire dépend du nombre d'URLs et non du nombre de mots-clés.
+    `on_chunk` reçoit chaque chunk lu (écriture au fil de l'eau dans un stockage).
+    """
+    chunk_size = SEMRUSH_SETTINGS['chunk_size']
+    partials = []
+    raw_chunks = []
+    rows = 0
+    for chunk in iter_semrush_chunks(file, keep_raw, columns):
+        missing = set(SEMRUSH_DTYPES) - set(chunk.columns)
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans l'export SEMrush : {', '.join(sorted(missing))}")
+
+        chunk['market'] = market.lower()
+        rows += len(chunk)
+        partials.append(aggregate_semrush_rows(chunk))
+        if on_chunk is not None:
+            on_chunk(chunk)
+        if keep_raw:
+            raw_chunks.append(chunk)
+
+        # Repli des agrégats partiels dès qu'ils dépassent la taille d'un chunk
+        if len(partials) > 1 and sum(len(partial) for partial in partials) > chunk_size:
+            partials = [combine_semrush_aggregates(partials)]
+
+    aggregated = combine_semrush_aggregates(partials) if partials else pd.DataFrame()
+    raw_df = pd.concat(raw_chunks, ignore_index=True) if raw_chunks else None
+    logger.info(f"Export SEMrush lu - {rows} lignes, {len(aggregated)} URLs agrégées")
+    return aggregated, raw_df
+
+def load_semrush_file(file, market, keep_raw=False):
+    """
+    Comme `read_semrush_file`, en passant par le cache local : un export déjà
+    parsé (même contenu, même marché) est rechargé sans relire le CSV.
+    """
+    if not SEMRUSH_CACHE_SETTINGS['enabled']:
+        return read_semrush_file(file, market, keep_raw)
+
+    cache = get_semrush_cache()
+    digest = file_digest(file)
+    cached = cache.load(digest, market, keep_raw)
+    if cached is not None:
+        return cached
+
+    aggregated, raw_df = read_semrush_file(file, market, keep_raw)
+    if not aggregated.empty:
+        try:
+            cache.store(digest, getattr(file, 'name', ''), market, aggregated, raw_df)
+        except OSError as e:
+            logger.warning(f"Export SEMrush non mis en cache : {e}")
+    return aggregated, raw_df
+
+def process_semrush_files(files, markets, keep_raw=False, stored_aggregate=None):
+    """
+    Traite les fichiers SEMrush uploadés et retourne (agrégat par URL, marché et type
+    de position, lignes brutes combinées ou DataFrame vide si `keep_raw` est faux).
+
+    Les fichiers sont lus en parallèle ; une erreur de lecture est signalée pour
+    le fichier concerné sans interrompre les autres. `stored_aggregate` est un
+    agrégat déjà lu (stockage des imports en masse) fusionné avec les fichiers.
+    """
     logger.info("Début du traitement des fichiers SEMrush")
-    dfs = []
-    for i, (file, market) in enumerate(zip(files, markets)):
-        if file is not None:
+    uploads = [(i, file, market) for i, (file, market) in enumerate(zip(files, markets)) if file is not None]
+    aggregates = [stored_aggregate] if stored_aggregate is not None and not stored_aggregate.empty else []
+    if not uploads and not aggregates:
+        return pd.DataFrame(), pd.DataFrame()
+
+    raw_dfs = []
+    workers = max(1, min(len(uploads), SEMRUSH_SETTINGS['workers'] or os.cpu_count() or 1))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (i, market, executor.submit(load_semrush_file, file, market, keep_raw))
+            for i, file, market in uploads
+        ]
+        # Résultats relus dans l'ordre des fichiers (messages d'erreur affichés depuis le thread de Streamlit)
+        for i, market, future in futures:
+            logger.info(f"Traitement du fichier SEMrush {i + 1} pour le marché {market}")
             try:
-                logger.info(f"Traitement du fichier SEMrush {i + 1} pour le marché {market}")
-                df = pd.read_csv(file, sep=';')
-                df['market'] = market.lower()
-                dfs.append(df)
-                logger.info(f"Fichier SEMrush {i + 1} traité avec succès - {len(df)} lignes")
+                aggregated, raw_df = future.result()
             except Exception as e:
                 logger.error(f"Erreur lors de la lecture du fichier SEMrush {i + 1}: {e}")
-                st.error(f"Erreur lors de la lecture du fichier SEMrush : {e}")
+                st.error(f"Erreur lors de la lecture du fichier SEMrush #{i + 1} : {e}")
+                continue
+            if not aggregated.empty:
+                aggregates.append(aggregated)
+            if raw_df is not None:
+                raw_dfs.append(raw_df)
+            logger.info(f"Fichier SEMrush {i + 1} traité avec succès - {len(aggregated)} URLs")
+
+    if not aggregates:
+        return pd.DataFrame(), pd.DataFrame()
 
-    if dfs:
-        result_df = pd.concat(dfs, ignore_index=True)
-        logger.info(f"Total des données SEMrush combinées: {len(result_df)} lignes")
-        return result_df
-    return pd.DataFrame()
\ No newline at end of file
+    result_df = finalize_semrush_aggregates(combine_semrush_aggregates(aggregates))
+    raw_result = pd.concat(raw_dfs, ignore_index=True) if raw_dfs else pd.DataFrame()
+    logger.info(f"Total des données SEMrush combinées: {len(result_df)} lignes agrégées, {len(raw_result)} lignes brutes")
+    return result_df, raw_result
@@ -0,0 +1,444 @@
+"""
+Stockage SEMrush partitionné - Import en masse d'exports (zip ou répertoire) par marché et période
+"""
+
+import concurrent.futures
+import io
+import logging
+import os
+import re
+import shutil
+import threading
+import zipfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from config.settings import KEYWORD_INDEX_SETTINGS, SEMRUSH_SETTINGS, SEMRUSH_STORE_SETTINGS
+from core.keyword_index import KeywordIndex, build_keyword_index, normalize_query
+from core.semrush_cache import file_digest
+from core.semrush_processor import (
+    SEMRUSH_DTYPES, SEMRUSH_GROUP_COLUMNS, SEMRUSH_METRICS, combine_semrush_aggregates, finalize_semrush_aggregates,
+    read_semrush_file
+)
+
+logger = logging.getLogger(__name__)
+
+# Lignes par mot-clé conservées dans le stockage (partitions market=.../period=...)
+KEYWORD_SCHEMA = pa.schema([
+    ('Keyword', pa.string()),
+    ('URL', pa.string()),
+    ('Position', pa.int16()),
+    # Chaîne simple : un fichier IPC n'accepte qu'un dictionnaire par colonne, or chaque chunk a le sien
+    ('Position Type', pa.string()),
+    ('Traffic', pa.float32()),
+    ('Search Volume', pa.float32())
+])
+
+# Agrégat par URL de chaque export (mêmes partitions)
+AGGREGATE_SCHEMA = pa.schema([
+    ('URL', pa.string()),
+    ('Position Type', pa.dictionary(pa.int32(), pa.string())),
+    ('Traffic', pa.float64()),
+    ('Search Volume', pa.float64()),
+    ('Number of Keywords', pa.int64())
+])
+
+PARTITIONING = ds.partitioning(pa.schema([('market', pa.string()), ('period', pa.string())]), flavor='hive')
+
+# Période des exports dont le nom ne contient pas de date
+UNKNOWN_PERIOD = 'unknown'
+
+# Base SEMrush dans le nom par défaut des exports (ex. "site.com-organic.Positions-fr-20240315-...")
+EXPORT_MARKET_PATTERN = re.compile(r'positions-([a-z]{2,3})(?:[^a-z]|$)')
+
+# Date de la base dans le nom du fichier : AAAAMMJJ, AAAA-MM-JJ ou AAAA-MM
+EXPORT_PERIOD_PATTERN = re.compile(r'(?<!\d)(20\d{2})[-_]?(0[1-9]|1[0-2])(?:[-_]?(0[1-9]|[12]\d|3[01]))?(?!\d)')
+
+
+def infer_export_metadata(name, manifest=None):
+    """
+    Retourne (marché, période) d'un export : depuis le manifeste s'il le décrit,
+    sinon depuis le nom du fichier. Marché None s'il ne peut être déterminé.
+    """
+    base_name = os.path.basename(name)
+    market, period = (manifest or {}).get(base_name, (None, None))
+
+    lowered = base_name.lower()
+    if not market:
+        # Seule la base du nom par défaut fait foi : un TLD (ex. "mysite.de") n'est pas un marché
+        match = EXPORT_MARKET_PATTERN.search(lowered)
+        market = match.group(1) if match else None
+    if not period:
+        match = EXPORT_PERIOD_PATTERN.search(lowered)
+        period = '-'.join(part for part in match.groups() if part) if match else UNKNOWN_PERIOD
+
+    return (market.lower() if market else None), period
+
+
+def read_manifest(file):
+    """Lit un manifeste (colonnes file, market et period optionnelle) : {nom du fichier: (marché, période)}."""
+    manifest_df = pd.read_csv(file, sep=None, engine='python', dtype=str).fillna('')
+    manifest_df.columns = [column.strip().lower() for column in manifest_df.columns]
+    periods = manifest_df['period'] if 'period' in manifest_df.columns else [''] * len(manifest_df)
+    return {
+        os.path.basename(name.strip()): (market.strip() or None, period.strip() or None)
+        for name, market, period in zip(manifest_df['file'], manifest_df['market'], periods)
+    }
+
+
+class ExportSource:
+    """Exports CSV d'une archive zip ou d'un répertoire local, avec leur manifeste éventuel."""
+
+    def __init__(self, source):
+        if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+            self._zip = None
+            self._directory = source
+            names = [
+                os.path.relpath(os.path.join(root, file_name), source)
+                for root, _, file_names in os.walk(source) for file_name in file_names
+            ]
+        else:
+            self._zip = zipfile.ZipFile(source)
+            self._directory = None
+            names = [info.filename for info in self._zip.infolist() if not info.is_dir()]
+
+        manifest_name = SEMRUSH_STORE_SETTINGS['manifest']
+        manifest_names = [name for name in names if os.path.basename(name).lower() == manifest_name]
+        self.manifest = {}
+        for name in manifest_names:
+            with self.open(name) as file:
+                self.manifest.update(read_manifest(io.TextIOWrapper(file, encoding='utf-8-sig')))
+
+        # Fichiers cachés et métadonnées ajoutées par macOS aux archives ignorés
+        self.names = sorted(
+            name for name in names
+            if name.lower().endswith('.csv') and name not in manifest_names
+            and not any(part.startswith(('.', '__MACOSX')) for part in re.split(r'[\\/]', name))
+        )
+
+    def open(self, name):
+        """Ouvre un fichier de la source en lecture binaire."""
+        if self._zip is not None:
+            return self._zip.open(name)
+        return open(os.path.join(self._directory, name), 'rb')
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _partition_directory(root, market, period):
+    return os.path.join(root, f'market={market}', f'period={period}')
+
+
+class _ArrowPartWriter:
+    """Écrit les chunks d'un export dans un fichier Arrow IPC (publié à la fermeture)."""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        # Préfixe '.' : fichier ignoré par la lecture du dataset tant qu'il n'est pas publié
+        self._tmp_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{threading.get_ident()}.tmp')
+        self._sink = pa.OSFile(self._tmp_path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, df):
+        self.write_table(pa.Table.from_pandas(df[self.schema.names], schema=self.schema, preserve_index=False))
+
+    def write_table(self, table):
+        self._writer.write_table(table)
+
+    def close(self, publish=True):
+        self._writer.close()
+        self._sink.close()
+        if publish:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+
+class SemrushStore:
+    """
+    Stockage local des exports SEMrush importés en masse.
+
+    Chaque export est écrit une seule fois, sous l'empreinte de son contenu,
+    dans la partition de son marché et de sa période :
+    `keywords/market=fr/period=2024-03-15/<empreinte>.arrow` pour les lignes
+    par mot-clé (types compacts) et `aggregates/...` pour son agrégat par URL.
+    Les lignes sont écrites chunk par chunk pendant la lecture : aucun
+    export n'est chargé entièrement en mémoire, et l'analyse ne relit que les
+    agrégats des partitions sélectionnées. L'index inversé des mots-clés de
+    chaque export (`index/...`, voir core.keyword_index) est construit à
+    l'import et relu par memory-map lors des recherches.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or SEMRUSH_STORE_SETTINGS['directory']
+        self.keywords_directory = os.path.join(self.directory, 'keywords')
+        self.aggregates_directory = os.path.join(self.directory, 'aggregates')
+        self.index_directory = os.path.join(self.directory, 'index')
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _ingest_export(self, source, name, market, period):
+        """Importe un export : retourne le nombre de lignes par mot-clé écrites (0 s'il était déjà importé)."""
+        with source.open(name) as file:
+            # Fichier d'une archive : copie locale pour pouvoir le relire depuis le début
+            if not file.seekable():
+                file = io.BytesIO(file.read())
+            digest = file_digest(file)
+
+            aggregate_path = os.path.join(_partition_directory(self.aggregates_directory, market, period),
+                                          f'{digest}.arrow')
+            if os.path.exists(aggregate_path):
+                logger.info(f"Export SEMrush déjà importé : {name}")
+                return 0
+
+            keywords_path = os.path.join(_partition_directory(self.keywords_directory, market, period),
+                                         f'{digest}.arrow')
+            os.makedirs(os.path.dirname(keywords_path), exist_ok=True)
+            os.makedirs(os.path.dirname(aggregate_path), exist_ok=True)
+
+            writer = _ArrowPartWriter(keywords_path, KEYWORD_SCHEMA)
+            try:
+                aggregated, _ = read_semrush_file(file, market, columns=[*SEMRUSH_DTYPES, 'Position'],
+                                                  on_chunk=writer.write)
+            except Exception:
+                writer.close(publish=False)
+                raise
+            writer.close()
+
+        self._build_index(keywords_path, market, period, digest)
+
+        # L'agrégat est publié en dernier : il marque l'export comme importé
+        aggregate_writer = _ArrowPartWriter(aggregate_path, AGGREGATE_SCHEMA)
+        aggregate_writer.write(aggregated)
+        aggregate_writer.close()
+        return int(aggregated['Number of Keywords'].sum())
+
+    def _index_paths(self, market, period, digest):
+        directory = _partition_directory(self.index_directory, market, period)
+        return os.path.join(directory, f'{digest}.terms.arrow'), os.path.join(directory, f'{digest}.tokens.arrow')
+
+    def _build_index(self, keywords_path, market, period, digest):
+        """Construit l'index inversé d'un export depuis ses lignes par mot-clé (colonne Keyword seule)."""
+        terms_table, tokens_table = build_keyword_index(_read_arrow(keywords_path).column('Keyword'))
+        for path, table in zip(self._index_paths(market, period, digest), (terms_table, tokens_table)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writer = _ArrowPartWriter(path, table.schema)
+            writer.write_table(table)
+            writer.close()
+
+    def ingest(self, source, on_progress=None):
+        """
+        Importe en parallèle les exports d'une archive zip ou d'un répertoire.
+
+        Retourne un tableau par fichier (file, market, period, rows, status, error).
+        `on_progress(terminés, total)` est appelé depuis le thread appelant.
+        """
+        export_source = ExportSource(source)
+        report = []
+        exports = []
+        for name in export_source.names:
+            market, period = infer_export_metadata(name, export_source.manifest)
+            if market is None:
+                report.append({'file': name, 'market': None, 'period': period, 'rows': 0,
+                               'status': 'skipped', 'error': 'market'})
+            else:
+                exports.append((name, market, period))
+
+        logger.info(f"Import SEMrush en masse - {len(exports)} exports, {len(report)} sans marché")
+        workers = max(1, min(len(exports), SEMRUSH_SETTINGS['workers'] or os.cpu_count() or 1))
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._ingest_export, export_source, name, market, period): (name, market, period)
+                    for name, market, period in exports
+                }
+                for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                    name, market, period = futures[future]
+                    try:
+                        rows = future.result()
+                        report.append({'file': name, 'market': market, 'period': period, 'rows': rows,
+                                       'status': 'ingested' if rows else 'duplicate', 'error': None})
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'import de l'export SEMrush {name}: {e}")
+                        report.append({'file': name, 'market': market, 'period': period, 'rows': 0,
+                                       'status': 'error', 'error': str(e)})
+                    if on_progress is not None:
+                        on_progress(done, len(exports))
+        finally:
+            export_source.close()
+
+        return pd.DataFrame(report, columns=['file', 'market', 'period', 'rows', 'status', 'error'])
+
+    def _dataset(self, directory):
+        if not os.path.isdir(directory):
+            return None
+        return ds.dataset(directory, format='arrow', partitioning=PARTITIONING)
+
+    def exports(self):
+        """Exports importés : une ligne (market, period, digest) par agrégat publié, lue dans les répertoires."""
+        exports = []
+        if os.path.isdir(self.aggregates_directory):
+            for market_entry in os.scandir(self.aggregates_directory):
+                if not market_entry.name.startswith('market='):
+                    continue
+                market = market_entry.name[len('market='):]
+                for period_entry in os.scandir(market_entry.path):
+                    if not period_entry.name.startswith('period='):
+                        continue
+                    period = period_entry.name[len('period='):]
+                    exports += [
+                        (market, period, entry.name[:-len('.arrow')])
+                        for entry in os.scandir(period_entry.path)
+                        if entry.name.endswith('.arrow') and not entry.name.startswith('.')
+                    ]
+        return pd.DataFrame(exports, columns=['market', 'period', 'digest'])
+
+    def partitions(self):
+        """Contenu du stockage : nombre d'exports, de mots-clés et d'URLs par marché et période."""
+        exports_df = self.exports()
+        if exports_df.empty:
+            return pd.DataFrame(columns=['market', 'period', 'exports', 'keywords', 'urls'])
+
+        rows_df = self._dataset(self.aggregates_directory).to_table(
+            columns=['market', 'period', 'URL', 'Number of Keywords']).to_pandas()
+        # Une URL a une ligne par type de position et par export : comptée une fois par partition
+        partitions_df = rows_df.groupby(['market', 'period']).agg(
+            keywords=('Number of Keywords', 'sum'), urls=('URL', 'nunique')
+        ).join(exports_df.value_counts(['market', 'period']).rename('exports'))
+        return partitions_df.reset_index()[['market', 'period', 'exports', 'keywords', 'urls']]
+
+    def selected_exports(self, markets=None, period=None):
+        """
+        Exports (marché, période, empreinte) sélectionnés : marchés choisis (tous
+        par défaut), période donnée ou la plus récente de chaque marché (les
+        périodes inconnues en dernier recours).
+        """
+        exports_df = self.exports()
+        if markets:
+            exports_df = exports_df[exports_df['market'].isin(markets)]
+        if period is not None:
+            exports_df = exports_df[exports_df['period'] == period]
+        else:
+            latest = {
+                market: max(periods, key=lambda market_period: (market_period != UNKNOWN_PERIOD, market_period))
+                for market, periods in exports_df.groupby('market')['period']
+            }
+            exports_df = exports_df[exports_df['period'] == exports_df['market'].map(latest)]
+        return list(exports_df.itertuples(index=False, name=None))
+
+    def _filter(self, markets=None, period=None):
+        """Filtre du dataset sur les partitions sélectionnées (None si aucune)."""
+        expression = None
+        for market, market_period in dict.fromkeys((market, market_period) for market, market_period, _
+                                                   in self.selected_exports(markets, period)):
+            clause = (ds.field('market') == market) & (ds.field('period') == market_period)
+            expression = clause if expression is None else expression | clause
+        return expression
+
+    def _export_index(self, market, period, digest):
+        """Index et lignes par mot-clé d'un export (memory-map, ouverts une fois), None sans index."""
+        key = (market, period, digest)
+        with self._lock:
+            if key not in self._indexes:
+                terms_path, tokens_path = self._index_paths(market, period, digest)
+                if not os.path.exists(tokens_path):
+                    logger.warning(f"Export SEMrush sans index de mots-clés : {market}/{period}/{digest[:12]}")
+                    self._indexes[key] = None
+                else:
+                    keywords_path = os.path.join(_partition_directory(self.keywords_directory, market, period),
+                                                 f'{digest}.arrow')
+                    self._indexes[key] = (KeywordIndex(_read_arrow(terms_path), _read_arrow(tokens_path)),
+                                          _read_arrow(keywords_path))
+            return self._indexes[key]
+
+    def search_keywords(self, query, mode='prefix', markets=None, period=None, limit=None):
+        """
+        Recherche une requête dans l'index des exports sélectionnés et retourne
+        {'total': nombre de lignes trouvées, 'keywords': les `limit` lignes au plus
+        fort trafic, 'urls': agrégat par URL, marché et type de position de toutes
+        les lignes trouvées (comme process_semrush_files)}.
+        """
+        limit = limit or KEYWORD_INDEX_SETTINGS['max_results']
+        normalized_query = normalize_query(query)
+        total = 0
+        keywords = []
+        aggregates = []
+        for market, export_period, digest in self.selected_exports(markets, period):
+            export_index = self._export_index(market, export_period, digest)
+            if export_index is None:
+                continue
+            index, keywords_table = export_index
+            rows = index.search(normalized_query, mode)
+            if len(rows) == 0:
+                continue
+            matches = keywords_table.take(pa.array(rows))
+
+            total += matches.num_rows
+            top = matches.take(pc.select_k_unstable(matches, min(limit, matches.num_rows), [('Traffic', 'descending')]))
+            keywords.append(top.to_pandas().assign(market=market, period=export_period))
+            # Agrégat par URL calculé en Arrow : seul le résultat (une ligne par URL) passe en pandas
+            aggregated = matches.group_by(['URL', 'Position Type']).aggregate(
+                [('Traffic', 'sum'), ('Search Volume', 'sum'), ('Keyword', 'count')]
+            ).to_pandas()
+            aggregates.append(aggregated.rename(columns={
+                'Traffic_sum': 'Traffic', 'Search Volume_sum': 'Search Volume', 'Keyword_count': 'Number of Keywords'
+            }).assign(market=market))
+
+        if not keywords:
+            return {'total': 0, 'keywords': pd.DataFrame(), 'urls': pd.DataFrame()}
+
+        keywords_df = pd.concat(keywords, ignore_index=True)
+        keywords_df = keywords_df.sort_values('Traffic', ascending=False).head(limit).reset_index(drop=True)
+        urls_df = finalize_semrush_aggregates(combine_semrush_aggregates(aggregates))
+        logger.info(f"Recherche de mots-clés '{query}' ({mode}) : {total} lignes, {len(urls_df)} URLs")
+        return {'total': total, 'keywords': keywords_df, 'urls': urls_df}
+
+    def load_aggregates(self, markets=None, period=None):
+        """
+        Agrégat par URL, marché et type de position des partitions sélectionnées
+        (une seule période par marché : la plus récente si `period` est None).
+        """
+        dataset = self._dataset(self.aggregates_directory)
+        if dataset is None:
+            return pd.DataFrame()
+        expression = self._filter(markets, period)
+        if expression is None:
+            return pd.DataFrame()
+
+        aggregated = dataset.to_table(filter=expression).to_pandas()
+        if aggregated.empty:
+            return pd.DataFrame()
+        # Plusieurs exports d'une même partition (exports découpés) : métriques sommées
+        aggregated = aggregated.groupby(SEMRUSH_GROUP_COLUMNS, observed=True)[SEMRUSH_METRICS].sum().reset_index()
+        logger.info(f"Stockage SEMrush : {len(aggregated)} lignes agrégées chargées")
+        return aggregated
+
+    def clear(self):
+        """Supprime tous les exports importés."""
+        with self._lock:
+            self._indexes.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        logger.info("Stockage SEMrush vidé")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _read_arrow(path):
+    """Table d'un fichier Arrow IPC relue par memory-map (sans copie)."""
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def get_semrush_store():
+    """Retourne le stockage SEMrush partagé (index des mots-clés ouverts gardés d'une recherche à l'autre)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SemrushStore()
+        return _store
@@ -2,54 +2,145 @@
 Analyseur de sitemaps - Logique de récupération et parsing des sitemaps
 """
 
-import advertools as adv
 import pandas as pd
-import requests
 import logging
-import concurrent.futures
+import os
 import streamlit as st
+import tempfile
+from contextlib import closing, suppress
 from urllib.parse import urlparse
-from config.settings import DEFAULT_HEADERS
+from config.settings import CRAWLER_SETTINGS, INCREMENTAL_SETTINGS, PARSE_SETTINGS
 from config.translations import get_text
+from core.sitemap_parser import parse_sitemap_stream, parse_sitemap_columns, get_parse_pool, rebuild_parse_pool
+from core.sitemap_crawler import iter_crawl_sitemaps
+from core.sitemap_state import SitemapState
+from core.url_batches import UrlBatchWriter, RAW_URL_SCHEMA, get_store_directory
+from core.http_client import throttled_get
+from core.sitemap_discovery import discover_sitemaps
 from visualizations.treemap import create_treemap
 
 logger = logging.getLogger(__name__)
 
-def fetch_sitemap(url):
-    """Récupère et parse le sitemap d'une URL donnée."""
+# Content-Types acceptés pour un sitemap (XML brut ou compressé)
+SITEMAP_CONTENT_TYPES = ('xml', 'gzip', 'octet-stream')
+
+# Message affiché selon l'origine des sitemaps découverts
+DISCOVERY_MESSAGES = {
+    'robots': 'sitemap_robots',
+    'locations': 'sitemap_discovered',
+    'fallback': 'sitemap_fallback',
+    'error': 'sitemap_error'
+}
+
+def is_sitemap_content_type(content_type):
+    """Vérifie que le Content-Type correspond à un sitemap XML ou gzip."""
+    return any(marker in content_type for marker in SITEMAP_CONTENT_TYPES)
+
+def open_sitemap_response(url):
+    """
+    Lance le téléchargement d'un sitemap et valide la réponse (status, Content-Type).
+
+    Retourne (réponse en streaming, Content-Type), ou (None, None) si la réponse
+    n'est pas un sitemap (elle est alors fermée).
+    """
+    logger.info(f"Tentative de récupération du sitemap: {url}")
+    response = throttled_get(url, stream=True)
+
+    if response.status_code != 200:
+        logger.error(f"Impossible de récupérer le sitemap (status code: {response.status_code})")
+        response.close()
+        return None, None
+
+    content_type = response.headers.get('Content-Type', '').lower()
+    if not is_sitemap_content_type(content_type):
+        logger.warning(f"Le contenu récupéré n'est pas du XML (type: {content_type})")
+        response.close()
+        return None, None
+
+    return response, content_type
+
+def fetch_sitemap_document(url):
+    """Récupère et parse un document sitemap (un seul téléchargement), sans suivre les index."""
     try:
-        logger.info(f"Tentative de récupération du sitemap: {url}")
+        response, content_type = open_sitemap_response(url)
+        if response is None:
+            return None, pd.DataFrame()
 
-        response = requests.get(url, timeout=30, headers=DEFAULT_HEADERS)
+        with closing(response):
+            # Parsing au fil du téléchargement (décompression gzip incrémentale si besoin)
+            try:
+                chunks = response.iter_content(chunk_size=CRAWLER_SETTINGS['chunk_size'])
+                kind, sitemap_df = parse_sitemap_stream(chunks, content_type)
+            except Exception as e:
+                logger.error(f"Erreur lors de la conversion du sitemap en DataFrame : {e}")
+                return None, pd.DataFrame()
 
-        if response.status_code != 200:
-            logger.error(f"Impossible de récupérer le sitemap (status code: {response.status_code})")
-            return pd.DataFrame()
+        if sitemap_df.empty:
+            logger.warning("Aucune URL trouvée dans le sitemap fourni.")
+        else:
+            logger.info(f"Sitemap récupéré avec succès - {len(sitemap_df)} entrées trouvées.")
+        return kind, sitemap_df
 
-        content_type = response.headers.get('Content-Type', '').lower()
-        if 'xml' not in content_type:
-            logger.warning(f"Le contenu récupéré n'est pas du XML (type: {content_type})")
-            return pd.DataFrame()
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération du sitemap {url} : {e}")
+        return None, pd.DataFrame()
 
-        # Utiliser advertools pour convertir en DataFrame
-        try:
-            sitemap_df = adv.sitemap_to_df(url)
-            if sitemap_df.empty:
-                logger.warning("Aucune URL trouvée dans le sitemap fourni.")
-            else:
-                logger.info(f"Sitemap récupéré avec succès - {len(sitemap_df)} URLs trouvées.")
-            return sitemap_df
-        except Exception as e:
-            logger.error(f"Erreur lors de la conversion du sitemap en DataFrame : {e}")
-            return pd.DataFrame()
+def download_sitemap_document(url):
+    """
+    Télécharge le contenu brut d'un sitemap (gzip conservé tel quel) pour le parsing
+    dans le pool de processus. Retourne (Content-Type, octets), (Content-Type, chemin
+    d'un fichier temporaire) au-delà de PARSE_SETTINGS['max_buffered_mb'], ou (None, None).
+    """
+    spool = None
+    try:
+        response, content_type = open_sitemap_response(url)
+        if response is None:
+            return None, None
+
+        max_buffered = PARSE_SETTINGS['max_buffered_mb'] * 1024 * 1024
+        chunks, buffered = [], 0
+        with closing(response):
+            for chunk in response.iter_content(chunk_size=CRAWLER_SETTINGS['chunk_size']):
+                if spool is not None:
+                    spool.write(chunk)
+                    continue
+                chunks.append(chunk)
+                buffered += len(chunk)
+                if buffered > max_buffered:
+                    # Document trop gros pour rester en mémoire jusqu'au parsing
+                    spool = tempfile.NamedTemporaryFile(prefix='sitemap-', delete=False)
+                    spool.writelines(chunks)
+                    chunks = None
+
+        if spool is None:
+            return content_type, b''.join(chunks)
+        spool.close()
+        logger.info(f"Sitemap {url} volumineux écrit dans un fichier temporaire avant parsing")
+        return content_type, spool.name
 
     except Exception as e:
         logger.error(f"Erreur lors de la récupération du sitemap {url} : {e}")
-        return pd.DataFrame()
+        if spool is not None:
+            spool.close()
+            with suppress(FileNotFoundError):
+                os.remove(spool.name)
+        return None, None
+
+def get_crawl_documents():
+    """Retourne les options du crawler : pipeline téléchargement → parsing en processus ou parsing en flux."""
+    if PARSE_SETTINGS['process_pool']:
+        return {
+            'fetch_document': download_sitemap_document,
+            'parse_document': parse_sitemap_columns,
+            'parse_pool': get_parse_pool(),
+            'rebuild_parse_pool': rebuild_parse_pool
+        }
+    return {'fetch_document': fetch_sitemap_document}
 
 def get_sitemap_urls(url, custom_sitemaps=None):
     """
-    Récupère les URLs du sitemap, soit depuis robots.txt, soit depuis les sitemaps personnalisés.
+    Récupère les URLs du sitemap, soit depuis les sitemaps personnalisés, soit par
+    découverte concurrente (robots.txt et emplacements courants).
     """
     logger.info("Début de la récupération des URLs du sitemap.")
 
@@ -58,100 +149,147 @@ def get_sitemap_urls(url, custom_sitemaps=None):
         logger.info(f"Utilisation des sitemaps personnalisés : {custom_sitemaps}")
         return [sitemap for sitemap in custom_sitemaps if sitemap], get_text('sitemap_manual', st.session_state.selected_language)
 
-    try:
-        # Construction de l'URL du robots.txt
-        robots_url = f"{url.rstrip('/')}/robots.txt"
-        logger.info(f"Tentative de lecture du robots.txt à : {robots_url}")
+    sitemap_urls, source = discover_sitemaps(url)
+    return sitemap_urls, get_text(DISCOVERY_MESSAGES[source], st.session_state.selected_language)
 
-        # Utilisation d'advertools pour analyser le fichier robots.txt
-        robots_df = adv.robotstxt_to_df(robots_url)
-
-        # Filtrage pour récupérer les directives de type Sitemap
-        sitemap_urls = robots_df[robots_df['directive'].str.contains('sitemap', case=False)]['content'].tolist()
+def iter_sitemap_results(sitemap_urls, site=None, sink=None, summarize=len):
+    """
+    Générateur de résultats par sitemap, dans l'ordre de complétion du crawl.
 
-        if sitemap_urls:
-            logger.info(f"Sitemaps trouvés dans robots.txt : {sitemap_urls}")
-            return sitemap_urls, get_text('sitemap_robots', st.session_state.selected_language)
-        else:
-            logger.warning("Aucun sitemap trouvé dans le robots.txt, fallback vers /sitemap.xml")
-            fallback_sitemap = [f"{url.rstrip('/')}/sitemap.xml"]
-            return fallback_sitemap, get_text('sitemap_fallback', st.session_state.selected_language)
+    Si `site` est fourni, les sitemaps enfants inchangés (même lastmod dans
+    l'index) depuis la dernière analyse du site sont réutilisés. Avec un `sink`,
+    seul le résumé `summarize(DataFrame)` de chaque sitemap est produit.
+    """
+    state = SitemapState(site) if site and INCREMENTAL_SETTINGS['enabled'] else None
+    yield from iter_crawl_sitemaps(sitemap_urls, state=state, sink=sink, summarize=summarize,
+                                   **get_crawl_documents())
 
-    except Exception as e:
-        # En cas d'erreur avec le robots.txt, fallback vers le sitemap par défaut
-        logger.warning(f"Erreur lors de la lecture du robots.txt : {e}. Utilisation du fallback.")
-        default_sitemap = [f"{url.rstrip('/')}/sitemap.xml"]
-        return default_sitemap, get_text('sitemap_error', st.session_state.selected_language)
+def fetch_and_parse_sitemaps(sitemap_urls, site=None, on_result=None):
+    """
+    Récupère et parse tous les sitemaps via le crawler asynchrone.
 
-def fetch_and_parse_sitemaps(sitemap_urls):
-    """Récupère et parse tous les sitemaps."""
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        sitemaps = list(executor.map(fetch_sitemap, sitemap_urls))
+    `on_result(sitemap_url, DataFrame)` est appelé à chaque sitemap terminé.
+    """
+    sitemaps = []
+    for sitemap_url, sitemap_df in iter_sitemap_results(sitemap_urls, site):
+        sitemaps.append(sitemap_df)
+        if on_result is not None:
+            on_result(sitemap_url, sitemap_df)
 
-    urls_df = pd.concat(sitemaps, ignore_index=True)
+    urls_df = pd.concat(sitemaps, ignore_index=True) if sitemaps else pd.DataFrame()
     logger.info(f"Total des URLs trouvées: {len(urls_df)}")
     return urls_df
 
-def analyze_website(url, custom_sitemaps=None, max_categories=-1, show_single_items=False, exclusions=None):
-    """Point d'entrée principal pour l'analyse d'un site web."""
-    from core.url_processor import process_urls
+def fetch_sitemaps_to_store(sitemap_urls, site, on_result=None, summarize=len):
+    """
+    Récupère tous les sitemaps en écrivant les URLs en batches Arrow sur disque.
+
+    `on_result(sitemap_url, résumé)` reçoit le résumé `summarize(DataFrame)` de
+    chaque sitemap terminé (les URLs ne remontent pas du crawl). Retourne le chemin du fichier et le nombre d'URLs écrites.
+    """
+    store_path = os.path.join(get_store_directory(site), 'raw.arrow')
+    writer = UrlBatchWriter(store_path, RAW_URL_SCHEMA)
+    try:
+        for sitemap_url, summary in iter_sitemap_results(sitemap_urls, site, sink=writer, summarize=summarize):
+            if on_result is not None:
+                on_result(sitemap_url, summary)
+    finally:
+        writer.close()
+    logger.info(f"Total des URLs trouvées: {writer.rows_written}")
+    return store_path, writer.rows_written
+
+def get_crawl_result(url, custom_sitemaps, out_of_core):
+    """
+    Résultat du crawl (URLs brutes) gardé en session : il n'est invalidé que si l'URL
+    du site, la liste des sitemaps ou le mode de stockage changent, ou si l'utilisateur
+    relance le crawl (st.session_state.crawl_result remis à None).
+    """
+    from ui.components import CrawlProgress
+
+    crawl_key = (url, tuple(custom_sitemaps or ()), out_of_core)
+    cached = st.session_state.get('crawl_result')
+    if cached is not None and cached['key'] == crawl_key:
+        logger.info(f"URLs déjà récupérées pour {url} ({cached['url_count']} URLs), crawl ignoré")
+        st.info(f"♻️ {get_text('crawl_reused', st.session_state.selected_language)}")
+        return cached
+
+    # Récupération des sitemaps
+    sitemap_urls, sitemap_message = get_sitemap_urls(url, custom_sitemaps)
+    logger.info(f"Sitemaps à analyser : {sitemap_urls}")
+    st.info(f"🔍 {sitemap_message}")
+
+    # Récupération des URLs, avec progression affichée à chaque sitemap terminé
+    crawl_progress = CrawlProgress(st.session_state.selected_language)
+    result = {'key': crawl_key, 'urls_df': None, 'store_path': None, 'snapshot_saved': False}
+    if out_of_core:
+        result['store_path'], result['url_count'] = fetch_sitemaps_to_store(
+            sitemap_urls, site=url, on_result=crawl_progress.add, summarize=CrawlProgress.summarize
+        )
+    else:
+        urls_df = fetch_and_parse_sitemaps(sitemap_urls, site=url, on_result=crawl_progress)
+        # Seule la colonne loc est utile aux étapes suivantes
+        result['urls_df'] = urls_df.reindex(columns=['loc'])
+        result['url_count'] = len(urls_df)
+    crawl_progress.render()
+
+    # Les URLs parsées de l'analyse précédente ne correspondent plus
+    st.session_state.crawl_result = result
+    st.session_state.parsed_urls = None
+    return result
+
+def analyze_website(url, custom_sitemaps=None, max_categories=-1, show_single_items=False, exclusions=None,
+                    out_of_core=False, depth=None):
+    """
+    Point d'entrée principal pour l'analyse d'un site web.
+
+    En mode `out_of_core`, les URLs sont stockées et traitées par batches Arrow :
+    la mémoire reste bornée par la taille d'un batch et non par celle du site.
+    `depth` fixe le nombre de niveaux de directories (dir_1 à dir_N).
+
+    Les étapes sont mises en cache en session : changer les exclusions ou les
+    options de catégories ne relance que le filtrage, changer la profondeur
+    relance le parsing, et seul un changement de site ou de sitemaps relance le crawl.
+    """
+    from core.url_processor import parse_urls, filter_urls, parse_url_batches, filter_url_batches
 
     logger.info(f"Début de l'analyse du site: {url}")
     if exclusions is None:
         exclusions = {'dir_1': [], 'dir_2': [], 'dir_3': []}
 
-    # Récupération des sitemaps
     with st.spinner(get_text('analysis_in_progress', st.session_state.selected_language)):
-        sitemap_urls, sitemap_message = get_sitemap_urls(url, custom_sitemaps)
-        logger.info(f"Sitemaps à analyser : {sitemap_urls}")
-        st.info(f"🔍 {sitemap_message}")
-
-        # Récupération des URLs
-        urls_df = fetch_and_parse_sitemaps(sitemap_urls)
+        crawl_result = get_crawl_result(url, custom_sitemaps, out_of_core)
 
-    if urls_df.empty:
+    if crawl_result['url_count'] == 0:
         logger.error("Aucune URL trouvée dans le sitemap")
         st.error("Aucune URL trouvée dans le sitemap")
         return None
 
-    # Traitement des URLs
+    # Traitement des URLs : parsing (réutilisé si la profondeur n'a pas changé) puis filtrage
     with st.spinner(get_text('analysis_in_progress', st.session_state.selected_language)):
-        success = process_urls(url, urls_df, max_categories, show_single_items, exclusions)
+        parsed = st.session_state.get('parsed_urls')
+        if parsed is None or parsed['depth'] != depth:
+            if out_of_core:
+                parsed = {'depth': depth, 'store_path': parse_url_batches(url, crawl_result['store_path'], depth)}
+            else:
+                # Un seul snapshot par crawl : un changement de profondeur ne l'enregistre pas à nouveau
+                parsed = {'depth': depth, 'url_df': parse_urls(url, crawl_result['urls_df'], depth,
+                                                               snapshot=not crawl_result['snapshot_saved'])}
+                crawl_result['snapshot_saved'] = True
+            st.session_state.parsed_urls = parsed
 
-        if success:
-            # Création du treemap
-            import datetime
-            import plotly.express as px
+        if out_of_core:
+            success = filter_url_batches(url, parsed['store_path'], max_categories, show_single_items, exclusions)
+        else:
+            success = filter_urls(parsed['url_df'], max_categories, show_single_items, exclusions)
 
+        if success:
+            # Création du treemap à partir de l'agrégat par chemin
             domain = urlparse(url).netloc.replace('www.', '').split(".")[0]
-            today = datetime.datetime.now(datetime.timezone.utc).strftime('%B %d, %Y')
-            logger.info("Création du treemap")
-
             lang = st.session_state.get('selected_language', 'fr')
-
-            st.session_state.treemap_fig = px.treemap(
-                st.session_state.directories_df,
-                path=['dominio', 'dir_1', 'dir_2', 'dir_3'],
-                title=f'{domain} Categories Structure (date: {today})',
-                height=750
-            )
-
-            # CORRECTION: Template et hover traduits
-            st.session_state.treemap_fig.update_traces(
-                texttemplate=f"<b>%{{label}}</b><br>{get_text('pages', lang)}: %{{value}}<br>%{{percentParent}} {get_text('of_parent', lang)}<br>%{{percentRoot}} {get_text('of_total', lang)}",
-                root_color="lightgrey",
-                hovertemplate=(
-                    f"<b>%{{label}}</b><br>"
-                    f"{get_text('label', lang)}: %{{label}}<br>"
-                    f"{get_text('count_label', lang)}: %{{value}}<br>"
-                    f"{get_text('parent_label', lang)}: %{{parent}}<br>"
-                    f"{get_text('id_label', lang)}: %{{id}}"
-                    "<extra></extra>"
-                )
-            )
+            st.session_state.treemap_fig = create_treemap(st.session_state.path_index.rollup, domain, lang)
 
             st.session_state.analysis_done = True
             logger.info("Analyse terminée avec succès")
             return True
 
-    return False
\ No newline at end of file
+    return False
@@ -0,0 +1,283 @@
+"""
+Crawler asynchrone d'index de sitemaps - Parcours récursif avec limites de concurrence
+"""
+
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import contextlib
+import logging
+import os
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from urllib.parse import urlparse
+from config.settings import CRAWLER_SETTINGS, PARSE_SETTINGS
+from utils.data_utils import hash_keys
+
+logger = logging.getLogger(__name__)
+
+
+class UrlKeySet:
+    """Clés 64 bits des URLs déjà collectées, en tableaux numpy triés (8 octets par URL)."""
+
+    def __init__(self):
+        self._runs = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    @property
+    def nbytes(self):
+        return sum(run.nbytes for run in self._runs)
+
+    def add_new(self, keys):
+        """Ajoute des clés et retourne le masque de celles qui sont vues pour la première fois."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        new_keys, first = np.unique(keys, return_index=True)
+        with self._lock:
+            for run in self._runs:
+                found = run[np.minimum(np.searchsorted(run, new_keys), len(run) - 1)] == new_keys
+                new_keys, first = new_keys[~found], first[~found]
+            if len(new_keys):
+                self._runs.append(new_keys)
+            # Fusion des tableaux de tailles voisines : O(log n) tableaux à parcourir, coût de tri amorti
+            while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+                last = self._runs.pop()
+                self._runs[-1] = np.sort(np.concatenate((self._runs[-1], last)), kind='stable')
+        new = np.zeros(len(keys), dtype=bool)
+        new[first] = True
+        return new
+
+
+class SitemapCrawler:
+    """Parcourt récursivement des sitemaps et index de sitemaps (URLs dédupliquées, concurrence bornée par hôte)."""
+
+    def __init__(self, fetch_document, max_concurrency=None, max_per_host=None, max_depth=None, state=None,
+                 sink=None, on_result=None, parse_document=None, parse_pool=None, rebuild_parse_pool=None,
+                 max_pending=None, stop=None):
+        self.fetch_document = fetch_document
+        self.parse_document = parse_document
+        self.parse_pool = parse_pool
+        self.rebuild_parse_pool = rebuild_parse_pool
+        self.max_pending = max_pending or PARSE_SETTINGS['max_pending']
+        self.state = state
+        self.sink = sink
+        self.on_result = on_result
+        self.stop = stop
+        self.max_concurrency = max_concurrency or CRAWLER_SETTINGS['max_concurrency']
+        self.max_per_host = max_per_host or CRAWLER_SETTINGS['max_per_host']
+        self.max_depth = max_depth if max_depth is not None else CRAWLER_SETTINGS['max_depth']
+        self._seen = set()
+        self._url_keys = UrlKeySet()
+        self._results = []
+        self._global_semaphore = None
+        self._host_semaphores = {}
+        self._pending_semaphore = None
+        self._executor = None
+
+    def _stopped(self):
+        return self.stop is not None and self.stop.is_set()
+
+    def _host_semaphore(self, url):
+        """Retourne le sémaphore associé à l'hôte de l'URL."""
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_semaphores[host]
+
+    async def _collect(self, sitemap_url, sitemap_df):
+        """Transmet les URLs d'un sitemap au sink, au callback ou à la liste des résultats."""
+        if self._stopped():
+            return
+        # Déduplication hors de la boucle d'événements : les téléchargements en vol ne sont pas bloqués
+        loop = asyncio.get_running_loop()
+        sitemap_df = await loop.run_in_executor(self._executor, self._new_urls, sitemap_df)
+        if self.sink is not None:
+            await loop.run_in_executor(self._executor, self.sink.write, sitemap_df)
+        elif self.on_result is None:
+            self._results.append(sitemap_df)
+
+        if self.on_result is not None:
+            self.on_result(sitemap_url, sitemap_df)
+
+    def _new_urls(self, sitemap_df):
+        """Écarte les URLs déjà collectées (listées par plusieurs sitemaps ou deux fois dans le même)."""
+        if sitemap_df.empty or 'loc' not in sitemap_df.columns:
+            return sitemap_df
+        new = self._url_keys.add_new(hash_keys(sitemap_df['loc']))
+        if new.all():
+            return sitemap_df
+        logger.info(f"{len(new) - new.sum()} URLs en double ignorées")
+        return sitemap_df[new].reset_index(drop=True)
+
+    async def _fetch(self, url):
+        """Télécharge et parse un document, en une étape ou via le pipeline téléchargement → parsing."""
+        loop = asyncio.get_running_loop()
+        if self.parse_document is None:
+            async with self._global_semaphore, self._host_semaphore(url):
+                if self._stopped():
+                    return None, pd.DataFrame()
+                return await loop.run_in_executor(self._executor, self.fetch_document, url)
+
+        # Le créneau est tenu jusqu'à la fin du parsing : les octets bruts en attente restent bornés
+        async with self._pending_semaphore:
+            async with self._global_semaphore, self._host_semaphore(url):
+                if self._stopped():
+                    return None, pd.DataFrame()
+                content_type, content = await loop.run_in_executor(self._executor, self.fetch_document, url)
+            if content is None:
+                return None, pd.DataFrame()
+            try:
+                parse_pool = self.parse_pool
+                try:
+                    kind, table = await loop.run_in_executor(parse_pool, self.parse_document, content,
+                                                             content_type)
+                except concurrent.futures.process.BrokenProcessPool:
+                    logger.warning(f"Pool de parsing indisponible, parsing local du sitemap {url}")
+                    if self.rebuild_parse_pool is not None:
+                        self.parse_pool = self.rebuild_parse_pool(parse_pool)
+                    kind, table = await loop.run_in_executor(self._executor, self.parse_document, content,
+                                                             content_type)
+            except Exception as e:
+                logger.error(f"Erreur lors du parsing du sitemap {url} : {e}")
+                return None, pd.DataFrame()
+            finally:
+                # Document volumineux écrit sur disque par le téléchargement
+                if isinstance(content, str):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(content)
+
+        sitemap_df = table.to_pandas()
+        if sitemap_df.empty:
+            logger.warning(f"Aucune URL trouvée dans le sitemap {url}")
+        else:
+            logger.info(f"Sitemap {url} parsé - {len(sitemap_df)} entrées trouvées.")
+        return kind, sitemap_df
+
+    async def _crawl_one(self, url, depth, lastmod=None):
+        if url in self._seen or self._stopped():
+            return
+        self._seen.add(url)
+
+        loop = asyncio.get_running_loop()
+        if self.state is not None and lastmod:
+            stored_df = await loop.run_in_executor(self._executor, self.state.load, url, lastmod)
+            if stored_df is not None:
+                await self._collect(url, stored_df)
+                return
+
+        kind, sitemap_df = await self._fetch(url)
+        if kind is None and self.state is not None:
+            # Document illisible (peut-être un index) : les sitemaps stockés sont conservés
+            self.state.mark_incomplete(url)
+
+        if kind == 'sitemapindex':
+            if depth >= self.max_depth:
+                logger.warning(f"Profondeur maximale atteinte, index ignoré : {url}")
+                if self.state is not None:
+                    self.state.mark_incomplete(url)
+                return
+            children = sitemap_df.drop_duplicates('loc')
+            if self.state is not None:
+                self.state.record_listed(children['loc'])
+            children = children[~children['loc'].isin(self._seen)]
+            logger.info(f"Index de sitemaps {url} - {len(children)} sitemaps enfants à parcourir")
+            await asyncio.gather(*(
+                self._crawl_one(child, depth + 1, child_lastmod)
+                for child, child_lastmod in zip(children['loc'], children['lastmod'].fillna(''))
+            ))
+        elif not sitemap_df.empty:
+            sitemap_df['sitemap'] = url
+            await self._collect(url, sitemap_df)
+            if self.state is not None and lastmod:
+                await loop.run_in_executor(self._executor, self.state.store, url, lastmod, sitemap_df)
+
+    async def crawl(self, sitemap_urls):
+        """Parcourt les sitemaps donnés et retourne la liste des DataFrames d'URLs."""
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._pending_semaphore = asyncio.Semaphore(self.max_pending)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            self._executor = executor
+            await asyncio.gather(*(self._crawl_one(url, 0) for url in dict.fromkeys(sitemap_urls)))
+            if self.state is not None and not self._stopped():
+                await asyncio.get_running_loop().run_in_executor(executor, self.state.save)
+        if self._stopped():
+            logger.info(f"Crawl interrompu - {len(self._seen)} sitemaps visités")
+        else:
+            logger.info(f"Crawl terminé - {len(self._seen)} sitemaps visités")
+        return self._results
+
+
+def crawl_sitemaps(sitemap_urls, fetch_document, state=None, sink=None, parse_document=None, parse_pool=None,
+                   rebuild_parse_pool=None, **limits):
+    """
+    Point d'entrée synchrone du crawler : retourne un DataFrame de toutes les URLs
+    (vide si les URLs sont écrites dans un sink).
+    """
+    crawler = SitemapCrawler(fetch_document, state=state, sink=sink, parse_document=parse_document,
+                             parse_pool=parse_pool, rebuild_parse_pool=rebuild_parse_pool, **limits)
+    results = asyncio.run(crawler.crawl(sitemap_urls))
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
+
+
+def iter_crawl_sitemaps(sitemap_urls, fetch_document, state=None, sink=None, parse_document=None, parse_pool=None,
+                        rebuild_parse_pool=None, summarize=len, **limits):
+    """
+    Générateur : exécute le crawl en arrière-plan et produit (sitemap_url, DataFrame)
+    pour chaque sitemap, dans l'ordre de complétion.
+
+    Avec un `sink`, les URLs sont déjà écrites sur disque : seul un résumé
+    (`summarize(DataFrame)`, le nombre d'URLs par défaut) est produit. La file
+    entre le crawl et le consommateur est bornée ; fermer le générateur
+    interrompt le crawl.
+    """
+    results = queue.Queue(maxsize=CRAWLER_SETTINGS['max_queued_results'])
+    stop = threading.Event()
+    done = object()
+    errors = []
+
+    def put(item):
+        # Attente bornée : le consommateur a pu fermer le générateur entre-temps
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def on_result(url, df):
+        put((url, summarize(df) if sink is not None else df))
+
+    def run():
+        try:
+            crawler = SitemapCrawler(fetch_document, state=state, sink=sink, on_result=on_result,
+                                     parse_document=parse_document, parse_pool=parse_pool,
+                                     rebuild_parse_pool=rebuild_parse_pool, stop=stop, **limits)
+            asyncio.run(crawler.crawl(sitemap_urls))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=run, name='sitemap-crawler', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        # Le sink est fermé par l'appelant : aucune écriture ne doit rester en cours
+        if sink is not None:
+            thread.join()
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,144 @@
+"""
+Découverte des sitemaps - Sondage concurrent de robots.txt et des emplacements courants, avec cache par domaine
+"""
+
+import concurrent.futures
+import ipaddress
+import logging
+import threading
+import time
+from contextlib import closing
+from urllib.parse import urlparse
+from config.settings import DISCOVERY_SETTINGS
+from core.http_client import cached_get, http_get
+from core.sitemap_parser import GZIP_MAGIC
+
+logger = logging.getLogger(__name__)
+
+# Marqueurs XML d'un document sitemap valide
+SITEMAP_ROOT_MARKERS = (b'<urlset', b'<sitemapindex')
+
+_discovery_cache = {}
+_discovery_lock = threading.Lock()
+
+
+def parse_robots_sitemaps(robots_text):
+    """Extrait les directives Sitemap d'un fichier robots.txt."""
+    sitemap_urls = []
+    for line in robots_text.splitlines():
+        directive, _, content = line.split('#', 1)[0].partition(':')
+        if directive.strip().lower() == 'sitemap' and content.strip():
+            sitemap_urls.append(content.strip())
+    return sitemap_urls
+
+
+def fetch_robots_sitemaps(robots_url, timeout=None):
+    """Récupère le robots.txt et retourne la liste des sitemaps déclarés."""
+    response = cached_get(robots_url, timeout=timeout)
+    response.raise_for_status()
+    return parse_robots_sitemaps(response.text)
+
+
+def probe_sitemap_location(sitemap_url, timeout=None):
+    """Vérifie qu'une URL répond avec un sitemap (XML urlset/sitemapindex ou gzip)."""
+    response = http_get(sitemap_url, timeout=timeout, stream=True)
+    with closing(response):
+        if response.status_code != 200:
+            return False
+        head = next(response.iter_content(chunk_size=1024), b'')
+    return head[:2] == GZIP_MAGIC or any(marker in head for marker in SITEMAP_ROOT_MARKERS)
+
+
+def get_base_variants(url):
+    """Retourne l'URL de base du site et sa variante www / sans www."""
+    parsed = urlparse(url if '://' in url else f'https://{url}')
+    host = parsed.netloc
+    hostname = parsed.hostname or ''
+    base = f'{parsed.scheme}://{host}'
+
+    # Pas de variante www pour une adresse IP ou un nom local
+    try:
+        ipaddress.ip_address(hostname)
+        return [base]
+    except ValueError:
+        if '.' not in hostname:
+            return [base]
+
+    alternate_host = host[4:] if host.startswith('www.') else f'www.{host}'
+    return [base, f'{parsed.scheme}://{alternate_host}']
+
+
+def discover_sitemaps(url):
+    """
+    Découvre les sitemaps d'un site en sondant en parallèle les robots.txt et les
+    emplacements courants (www et sans www), avec des timeouts courts.
+
+    Retourne (liste des sitemaps, source) où source vaut 'robots' (directives
+    robots.txt), 'locations' (premier emplacement courant valide, dans l'ordre
+    de DISCOVERY_SETTINGS['locations']), 'fallback' (robots.txt
+    lisible mais vide) ou 'error' (rien de trouvé). Les découvertes réussies
+    sont mises en cache par domaine pendant DISCOVERY_SETTINGS['ttl'] secondes.
+    """
+    bases = get_base_variants(url)
+    cache_key = urlparse(bases[0]).netloc.lower()
+
+    with _discovery_lock:
+        cached = _discovery_cache.get(cache_key)
+        if cached and cached[0] > time.time():
+            logger.info(f"Découverte des sitemaps en cache pour {cache_key}")
+            return cached[1]
+
+    timeout = DISCOVERY_SETTINGS['timeout']
+    # Par ordre de priorité : emplacement, puis variante de l'hôte
+    location_urls = [f'{base}/{path}' for path in DISCOVERY_SETTINGS['locations'] for base in bases]
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(bases) + len(location_urls))
+    robots_futures = {
+        executor.submit(fetch_robots_sitemaps, f'{base}/robots.txt', timeout): base for base in bases
+    }
+    location_futures = {
+        executor.submit(probe_sitemap_location, location_url, timeout): location_url for location_url in location_urls
+    }
+
+    robots_read = False
+    completed = set()
+    found_locations = set()
+    result = None
+    try:
+        for future in concurrent.futures.as_completed({**robots_futures, **location_futures}):
+            completed.add(future)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.info(f"Sonde de découverte en échec : {e}")
+                outcome = None
+
+            if future in robots_futures:
+                robots_read = robots_read or outcome is not None
+                if outcome:
+                    # Les directives robots.txt font foi : on n'attend pas les autres sondes
+                    logger.info(f"Sitemaps trouvés dans robots.txt : {outcome}")
+                    result = (list(dict.fromkeys(outcome)), 'robots')
+                    break
+            elif outcome:
+                found_locations.add(future)
+
+            # Un seul emplacement courant retenu (/sitemap.xml et /sitemap.xml.gz, ou la variante www,
+            # listent en général les mêmes URLs) : le premier valide dans l'ordre de priorité
+            if completed.issuperset(robots_futures):
+                first = next((location_future for location_future in location_futures
+                              if location_future not in completed or location_future in found_locations), None)
+                if first is not None and first in found_locations:
+                    logger.info(f"Sitemap trouvé à un emplacement courant : {location_futures[first]}")
+                    result = ([location_futures[first]], 'locations')
+                    break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if result is None:
+        logger.warning("Aucun sitemap découvert, fallback vers /sitemap.xml")
+        return [f'{bases[0]}/sitemap.xml'], 'fallback' if robots_read else 'error'
+
+    with _discovery_lock:
+        _discovery_cache[cache_key] = (time.time() + DISCOVERY_SETTINGS['ttl'], result)
+    return result
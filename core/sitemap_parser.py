@@ -0,0 +1,197 @@
+"""
+Parser de sitemaps - Lecture incrémentale du XML (urlset et sitemapindex)
+"""
+
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+import pandas as pd
+import pyarrow as pa
+from config.settings import PARSE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Balises d'entrée selon le type de sitemap
+ENTRY_TAGS = {'url', 'sitemap'}
+
+# Octets magiques des fichiers gzip (.xml.gz)
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Taille maximale d'un tampon décompressé transmis au parser
+DECOMPRESS_BUFFER_SIZE = 256 * 1024
+
+
+def _local_name(tag):
+    """Retire l'espace de noms d'une balise XML."""
+    return tag.rsplit('}', 1)[-1]
+
+
+class SitemapParser:
+    """Parser XML incrémental qui extrait les colonnes loc/lastmod au fil de l'eau."""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self.kind = None
+        self.locs = []
+        self.lastmods = []
+
+    def feed(self, data):
+        """Alimente le parser avec un morceau du document."""
+        self._parser.feed(data)
+        self._read_events()
+
+    def close(self):
+        """Termine le parsing et retourne le type de sitemap et le DataFrame."""
+        self.finish()
+        return self.kind, self.to_dataframe()
+
+    def finish(self):
+        """Termine le parsing sans construire de DataFrame."""
+        self._parser.close()
+        self._read_events()
+
+    def _read_events(self):
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                    self.kind = _local_name(elem.tag)
+                continue
+
+            if _local_name(elem.tag) not in ENTRY_TAGS:
+                continue
+
+            loc, lastmod = None, None
+            for child in elem:
+                name = _local_name(child.tag)
+                if name == 'loc':
+                    loc = (child.text or '').strip()
+                elif name == 'lastmod':
+                    lastmod = (child.text or '').strip() or None
+
+            if loc:
+                self.locs.append(loc)
+                self.lastmods.append(lastmod)
+
+            # Libère les éléments déjà traités pour garder une mémoire constante
+            self._root.clear()
+
+    def to_dataframe(self):
+        """Construit le DataFrame loc/lastmod à partir des entrées lues."""
+        return pd.DataFrame({'loc': self.locs, 'lastmod': self.lastmods})
+
+    def to_table(self):
+        """Construit la table Arrow loc/lastmod (format compact transmis entre processus)."""
+        return pa.table({
+            'loc': pa.array(self.locs, type=pa.string()),
+            'lastmod': pa.array(self.lastmods, type=pa.string())
+        })
+
+
+def is_gzip(chunk, content_type=''):
+    """Détecte un contenu gzip par ses octets magiques ou son Content-Type."""
+    if chunk[:2] == GZIP_MAGIC:
+        return True
+    # Un Content-Type gzip sans octets magiques signifie que le corps a déjà été décodé
+    return False if chunk.lstrip()[:1] == b'<' else 'gzip' in content_type
+
+
+def _feed_chunks(parser, chunks, content_type=''):
+    """Alimente le parser avec des morceaux de document, décompressés au fil de l'eau si gzip."""
+    decompressor = None
+    first_chunk = True
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if first_chunk:
+            first_chunk = False
+            if is_gzip(chunk, content_type):
+                # MAX_WBITS | 32 : détection automatique de l'en-tête gzip/zlib
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+
+        if decompressor is None:
+            parser.feed(chunk)
+            continue
+
+        data = chunk
+        while data:
+            parser.feed(decompressor.decompress(data, DECOMPRESS_BUFFER_SIZE))
+            data = decompressor.unconsumed_tail
+
+    if decompressor is not None:
+        parser.feed(decompressor.flush())
+
+
+def parse_sitemap_stream(chunks, content_type=''):
+    """
+    Parse un sitemap fourni par morceaux et retourne (type, DataFrame).
+
+    Les sitemaps gzip sont décompressés au fil de l'eau : seuls quelques
+    tampons de DECOMPRESS_BUFFER_SIZE octets sont en mémoire à la fois.
+    """
+    parser = SitemapParser()
+    _feed_chunks(parser, chunks, content_type)
+    return parser.close()
+
+
+def _read_file_chunks(path):
+    """Lit un fichier par morceaux de DECOMPRESS_BUFFER_SIZE octets."""
+    with open(path, 'rb') as file:
+        yield from iter(lambda: file.read(DECOMPRESS_BUFFER_SIZE), b'')
+
+
+def parse_sitemap_columns(content, content_type=''):
+    """
+    Parse le contenu brut d'un sitemap et retourne (type, table Arrow loc/lastmod).
+
+    `content` est le document en octets, ou le chemin du fichier temporaire où
+    un gros document a été écrit (lu par morceaux). Exécutée dans le pool de
+    processus : la table Arrow se sérialise en quelques buffers contigus, bien
+    plus vite qu'un DataFrame d'objets.
+    """
+    chunks = _read_file_chunks(content) if isinstance(content, str) else [content]
+    parser = SitemapParser()
+    _feed_chunks(parser, chunks, content_type)
+    parser.finish()
+    return parser.kind, parser.to_table()
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def _start_parse_pool():
+    context = multiprocessing.get_context(PARSE_SETTINGS['start_method'])
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=PARSE_SETTINGS['workers'], mp_context=context)
+    logger.info(f"Pool de parsing démarré ({PARSE_SETTINGS['workers'] or os.cpu_count()} processus)")
+    return pool
+
+
+def get_parse_pool():
+    """Retourne le pool de processus de parsing partagé (créé au premier appel)."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = _start_parse_pool()
+        return _parse_pool
+
+
+def rebuild_parse_pool(broken_pool):
+    """
+    Remplace le pool partagé après un BrokenProcessPool (processus tué) et retourne le nouveau pool.
+
+    Si le pool a déjà été remplacé par un autre appel, le pool courant est retourné tel quel.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None or _parse_pool is broken_pool:
+            logger.warning("Pool de parsing cassé, redémarrage")
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = _start_parse_pool()
+        return _parse_pool
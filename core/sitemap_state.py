@@ -0,0 +1,106 @@
+"""
+État persistant des sitemaps par site - Réutilisation des sitemaps enfants dont le lastmod n'a pas bougé
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import pandas as pd
+from config.settings import INCREMENTAL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+class SitemapState:
+    """
+    Résultats du dernier crawl d'un site, par sitemap enfant.
+
+    Le manifeste associe chaque sitemap enfant au `lastmod` annoncé par son
+    index lors du dernier crawl ; les lignes parsées sont stockées en Parquet.
+    Les sitemaps qu'aucun index ne liste plus sont supprimés à l'enregistrement,
+    seulement si tous les index ont été lus : un index en échec ne vide pas l'état.
+    """
+
+    def __init__(self, site, directory=None):
+        self.site = site
+        self.directory = os.path.join(directory or INCREMENTAL_SETTINGS['directory'], _hash(site))
+        self._manifest_path = os.path.join(self.directory, 'manifest.json')
+        self._lock = threading.Lock()
+        self._listed = set()
+        self._complete = True
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._manifest = {}
+        if os.path.exists(self._manifest_path):
+            try:
+                with open(self._manifest_path, encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Manifeste de sitemaps illisible pour {site} : {e}")
+
+        self.reused = 0
+        self.refreshed = 0
+
+    def _rows_path(self, sitemap_url):
+        return os.path.join(self.directory, f'{_hash(sitemap_url)}.parquet')
+
+    def load(self, sitemap_url, lastmod):
+        """Retourne les lignes stockées si le lastmod n'a pas changé, sinon None."""
+        entry = self._manifest.get(sitemap_url)
+        if not lastmod or entry is None or entry['lastmod'] != lastmod:
+            return None
+        try:
+            rows = pd.read_parquet(self._rows_path(sitemap_url))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Lignes stockées illisibles pour {sitemap_url} : {e}")
+            return None
+        with self._lock:
+            self.reused += 1
+        return rows
+
+    def store(self, sitemap_url, lastmod, rows):
+        """Enregistre les lignes d'un sitemap enfant et son lastmod."""
+        if not lastmod:
+            return
+        rows.to_parquet(self._rows_path(sitemap_url), index=False)
+        with self._lock:
+            self._manifest[sitemap_url] = {'lastmod': lastmod}
+            self.refreshed += 1
+
+    def record_listed(self, sitemap_urls):
+        """Enregistre les sitemaps enfants listés par un index lu avec succès."""
+        with self._lock:
+            self._listed.update(sitemap_urls)
+
+    def mark_incomplete(self, sitemap_url):
+        """Signale un document non lu : aucun sitemap stocké ne sera supprimé à l'enregistrement."""
+        with self._lock:
+            if self._complete:
+                logger.info(f"Sitemap {sitemap_url} non lu, sitemaps stockés de {self.site} conservés")
+            self._complete = False
+
+    def save(self):
+        """Écrit le manifeste et supprime les sitemaps qui ne sont plus listés (si tous les index ont été lus)."""
+        with self._lock:
+            removed = set(self._manifest) - self._listed if self._complete else set()
+            for sitemap_url in removed:
+                del self._manifest[sitemap_url]
+                try:
+                    os.remove(self._rows_path(sitemap_url))
+                except FileNotFoundError:
+                    pass
+
+            tmp_path = f'{self._manifest_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp_path, self._manifest_path)
+
+        logger.info(
+            f"État des sitemaps de {self.site} : {self.reused} réutilisés, {self.refreshed} rafraîchis"
+        )
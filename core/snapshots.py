@@ -0,0 +1,120 @@
+"""
+Historique des analyses - Snapshots columnar des URLs par domaine et comparaison entre analyses
+"""
+
+import datetime
+import logging
+import os
+import re
+import pandas as pd
+from config.settings import SNAPSHOT_SETTINGS, HIERARCHY_SETTINGS
+from utils.data_utils import directory_columns, get_directory_columns, hash_keys
+
+logger = logging.getLogger(__name__)
+
+# Colonnes de directories pour la profondeur par défaut
+DIR_COLUMNS = directory_columns(HIERARCHY_SETTINGS['default_depth'])
+
+
+def _domain_directory(domain):
+    safe_domain = re.sub(r'[^A-Za-z0-9._-]', '_', domain)
+    return os.path.join(SNAPSHOT_SETTINGS['directory'], safe_domain)
+
+
+def build_snapshot(url_df):
+    """Construit le snapshot compact (clés hachées + directories catégorielles) d'un ensemble d'URLs."""
+    urls = url_df['url'].astype(str)
+    slugs = urls.str.rstrip('/').str.rsplit('/', n=1).str[-1]
+
+    snapshot = pd.DataFrame({
+        'url_key': hash_keys(urls),
+        'slug_key': hash_keys(slugs),
+        'url': urls.to_numpy()
+    })
+    for dir_col in get_directory_columns(url_df):
+        snapshot[dir_col] = pd.Categorical(url_df[dir_col].astype(str))
+
+    return snapshot.drop_duplicates('url_key', ignore_index=True)
+
+
+def save_snapshot(domain, url_df):
+    """Enregistre le snapshot de l'analyse courante et retourne son identifiant."""
+    directory = _domain_directory(domain)
+    os.makedirs(directory, exist_ok=True)
+
+    snapshot_id = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    snapshot = build_snapshot(url_df)
+    snapshot.to_parquet(os.path.join(directory, f'{snapshot_id}.parquet'), index=False, compression='zstd')
+    logger.info(f"Snapshot {snapshot_id} enregistré pour {domain} - {len(snapshot)} URLs")
+
+    # Conservation des N derniers snapshots uniquement
+    for old_id in list_snapshots(domain)[SNAPSHOT_SETTINGS['max_snapshots']:]:
+        os.remove(os.path.join(directory, f'{old_id}.parquet'))
+
+    return snapshot_id
+
+
+def list_snapshots(domain):
+    """Liste les identifiants de snapshots d'un domaine, du plus récent au plus ancien."""
+    directory = _domain_directory(domain)
+    if not os.path.isdir(directory):
+        return []
+    return sorted((name[:-len('.parquet')] for name in os.listdir(directory) if name.endswith('.parquet')),
+                  reverse=True)
+
+
+def load_snapshot(domain, snapshot_id):
+    """Charge un snapshot enregistré."""
+    return pd.read_parquet(os.path.join(_domain_directory(domain), f'{snapshot_id}.parquet'))
+
+
+def _count_by_level(df, column_name, dir_columns, suffix=''):
+    """Compte les URLs par directory pour chaque niveau."""
+    counts = []
+    for dir_col in dir_columns:
+        level_counts = df[f'{dir_col}{suffix}'].astype(str).value_counts()
+        counts.append(pd.DataFrame({
+            'Niveau': dir_col.capitalize(),
+            'Directory': level_counts.index,
+            column_name: level_counts.to_numpy()
+        }))
+    return pd.concat(counts, ignore_index=True)
+
+
+def diff_snapshots(old_snapshot, new_snapshot):
+    """
+    Compare deux snapshots sur leurs clés hachées.
+
+    Retourne un dictionnaire avec les URLs ajoutées, supprimées et déplacées
+    (même dernier segment d'URL, présent une seule fois de chaque côté) ainsi
+    qu'un résumé par niveau de directory (niveaux communs aux deux snapshots).
+    """
+    dir_columns = [dir_col for dir_col in get_directory_columns(new_snapshot) if dir_col in old_snapshot.columns]
+    added = new_snapshot[~new_snapshot['url_key'].isin(old_snapshot['url_key'])]
+    removed = old_snapshot[~old_snapshot['url_key'].isin(new_snapshot['url_key'])]
+
+    # Déplacements : un slug unique supprimé d'un côté et ajouté de l'autre
+    unique_added = added.drop_duplicates('slug_key', keep=False)
+    unique_removed = removed.drop_duplicates('slug_key', keep=False)
+    moved = unique_removed.merge(unique_added, on='slug_key', suffixes=('_old', '_new'))
+
+    added = added[~added['url_key'].isin(moved['url_key_new'])]
+    removed = removed[~removed['url_key'].isin(moved['url_key_old'])]
+
+    summary = _count_by_level(added, 'added', dir_columns)
+    for other in (_count_by_level(removed, 'removed', dir_columns),
+                  _count_by_level(moved, 'moved_in', dir_columns, '_new'),
+                  _count_by_level(moved, 'moved_out', dir_columns, '_old')):
+        summary = summary.merge(other, on=['Niveau', 'Directory'], how='outer')
+    count_columns = ['added', 'removed', 'moved_in', 'moved_out']
+    summary[count_columns] = summary[count_columns].fillna(0).astype(int)
+
+    logger.info(
+        f"Comparaison de snapshots - ajoutées: {len(added)}, supprimées: {len(removed)}, déplacées: {len(moved)}"
+    )
+    return {
+        'added': added[['url'] + dir_columns].reset_index(drop=True),
+        'removed': removed[['url'] + dir_columns].reset_index(drop=True),
+        'moved': moved[['url_old', 'url_new']].reset_index(drop=True),
+        'summary': summary
+    }
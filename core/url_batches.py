@@ -0,0 +1,91 @@
+"""
+Stockage hors mémoire des URLs - Record batches Arrow de taille fixe dans un fichier local
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import pyarrow as pa
+from config.settings import OUT_OF_CORE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Schéma des URLs brutes issues des sitemaps
+RAW_URL_SCHEMA = pa.schema([
+    ('loc', pa.string()),
+    ('lastmod', pa.string()),
+    ('sitemap', pa.string())
+])
+
+
+def processed_url_schema(dir_columns):
+    """Schéma des URLs après extraction des directories (dir_1 à dir_N), exclusions et clé de jointure."""
+    return pa.schema(
+        [('url', pa.string()), ('url_key', pa.uint64())] + [(dir_col, pa.string()) for dir_col in dir_columns]
+    )
+
+
+def get_store_directory(site):
+    """Retourne (et crée) le répertoire de stockage des batches d'un site."""
+    directory = os.path.join(OUT_OF_CORE_SETTINGS['directory'], hashlib.sha1(site.encode('utf-8')).hexdigest())
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+class UrlBatchWriter:
+    """
+    Écrit des DataFrames dans un fichier Arrow IPC en record batches de taille fixe.
+
+    Les lignes reçues sont mises en attente jusqu'à atteindre `batch_size`,
+    la mémoire occupée reste donc bornée par la taille d'un batch.
+    """
+
+    def __init__(self, path, schema, batch_size=None):
+        self.path = path
+        self.schema = schema
+        self.batch_size = batch_size or OUT_OF_CORE_SETTINGS['batch_size']
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_rows = 0
+        self._sink = pa.OSFile(path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, df):
+        """Ajoute les lignes d'un DataFrame au fichier."""
+        if df.empty:
+            return
+        table = pa.Table.from_pandas(df[self.schema.names], schema=self.schema, preserve_index=False)
+        with self._lock:
+            self._pending.append(table)
+            self._pending_rows += table.num_rows
+            while self._pending_rows >= self.batch_size:
+                self._flush(self.batch_size)
+
+    def _flush(self, num_rows):
+        pending = pa.concat_tables(self._pending)
+        batch = pending.slice(0, num_rows).combine_chunks().to_batches()[0]
+        self._writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+
+        rest = pending.slice(num_rows)
+        self._pending = [rest] if rest.num_rows else []
+        self._pending_rows = rest.num_rows
+
+    def close(self):
+        """Écrit le dernier batch partiel et ferme le fichier."""
+        with self._lock:
+            if self._pending_rows:
+                self._flush(self._pending_rows)
+            self._writer.close()
+            self._sink.close()
+        logger.info(f"{self.rows_written} URLs écrites en batches Arrow dans {self.path}")
+
+
+def iter_url_batches(path):
+    """Lit un fichier Arrow IPC batch par batch (memory-map) et retourne des DataFrames."""
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
@@ -0,0 +1,118 @@
+"""
+Clés de jointure des URLs - Canonicalisation vectorisée (pyarrow.compute) et hachage 64 bits
+"""
+
+import logging
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from urllib.parse import quote, unquote
+from config.settings import URL_CANONICALIZATION_SETTINGS
+from utils.data_utils import hash_keys
+
+logger = logging.getLogger(__name__)
+
+# Schéma (et '//' d'une URL sans schéma) en tête d'URL
+URL_SCHEME_PATTERN = r'^(?:[A-Za-z][A-Za-z0-9+.-]*:)?//'
+
+# Caractères laissés tels quels au réencodage (délimiteurs d'URL et '%' littéral)
+PERCENT_ENCODING_SAFE = "/:?#[]@!$&'()*+,;=~%"
+
+
+def _split_first(values, separator):
+    """Coupe chaque chaîne à la première occurrence du séparateur : (avant, après ou null)."""
+    lists = pc.split_pattern(values, separator, max_splits=1)
+    parts = lists.flatten()
+    offsets = lists.offsets.to_numpy()
+    starts = offsets[:-1]
+    has_separator = np.diff(offsets) == 2
+    head = parts.take(pa.array(starts))
+    tail = pc.if_else(pa.array(has_separator), parts.take(pa.array(np.where(has_separator, starts + 1, starts))), None)
+    return head, tail
+
+
+def tracking_parameters_pattern(parameters):
+    """Regex des paramètres de tracking encadrés par '&' ('utm_*' couvre tous les paramètres utm_)."""
+    names = '|'.join(re.escape(parameter).replace(r'\*', '[^=&]*') for parameter in parameters)
+    return f'&(?:{names})(?:=[^&]*)?&'
+
+
+def _strip_tracking_parameters(query, parameters):
+    # Chaque paramètre est encadré par ses propres '&' pour que des paramètres consécutifs soient tous retirés
+    query = pc.binary_join_element_wise('&', pc.replace_substring(query, '&', '&&'), '&', '')
+    query = pc.replace_substring_regex(query, tracking_parameters_pattern(parameters), '')
+    query = pc.replace_substring_regex(query, '&+', '&')
+    return pc.replace_substring_regex(query, '^&|&$', '')
+
+
+def _normalize_percent_encoding(urls):
+    """
+    Encodage uniforme des URLs : décodées puis réencodées (UTF-8, hexadécimal en majuscules).
+
+    Le sitemap fournit des URLs déjà décodées et SEMrush des URLs encodées : les
+    deux formes donnent la même chaîne. Seules les URLs distinctes qui contiennent
+    un '%' ou un caractère non ASCII passent par Python.
+    """
+    mask = pc.match_substring_regex(urls, r'%|[^\x00-\x7f]')
+    if not pc.any(mask).as_py():
+        return urls
+    values = pc.filter(urls, mask)
+    distinct = pc.unique(values)
+    normalized = pa.array([quote(unquote(value), safe=PERCENT_ENCODING_SAFE) for value in distinct.to_pylist()],
+                          type=pa.string())
+    return pc.replace_with_mask(urls, mask, normalized.take(pc.index_in(values, distinct)))
+
+
+def canonicalize_urls(urls, settings=None):
+    """
+    Forme canonique des URLs (tableau Arrow de chaînes), identique côté sitemap et SEMrush.
+
+    Encodage des caractères normalisé, hôte en minuscules, puis selon `settings` :
+    schéma, www, port par défaut, fragment, slash final et paramètres de tracking ignorés.
+    """
+    settings = settings or URL_CANONICALIZATION_SETTINGS
+    urls = pa.array(urls, type=pa.string(), from_pandas=True)
+    if isinstance(urls, pa.ChunkedArray):
+        urls = urls.combine_chunks()
+    urls = _normalize_percent_encoding(pc.fill_null(pc.utf8_trim_whitespace(urls), ''))
+    if settings['strip_fragment']:
+        urls, _ = _split_first(urls, '#')
+
+    # Découpages par séparateur plutôt qu'une regex à groupes de capture (bien plus lente sur des millions d'URLs)
+    scheme = pc.utf8_lower(pc.extract_regex(urls, r'^(?P<scheme>[A-Za-z][A-Za-z0-9+.-]*)://').field('scheme')) \
+        if not settings['ignore_scheme'] else None
+    rest, query = _split_first(pc.replace_substring_regex(urls, URL_SCHEME_PATTERN, ''), '?')
+    host, path = _split_first(rest, '/')
+
+    host = pc.utf8_lower(host)
+    if settings['ignore_www']:
+        host = pc.if_else(pc.starts_with(host, 'www.'), pc.utf8_slice_codeunits(host, 4), host)
+    if settings['strip_default_port']:
+        host = pc.replace_substring_regex(host, ':(?:80|443)$', '')
+
+    path = pc.fill_null(path, '')
+    if settings['lowercase_path']:
+        path = pc.utf8_lower(path)
+    if settings['strip_trailing_slash']:
+        path = pc.utf8_rtrim(path, characters='/')
+
+    if settings['drop_query']:
+        query = pa.nulls(len(urls), pa.string())
+    elif settings['tracking_parameters']:
+        query = _strip_tracking_parameters(query, settings['tracking_parameters'])
+    # Query vide : pas de '?' dans la forme canonique
+    query = pc.if_else(pc.equal(query, ''), None, pc.binary_join_element_wise('?', query, ''))
+
+    path = pc.if_else(pc.equal(path, ''), '', pc.binary_join_element_wise('/', path, ''))
+    canonical = pc.binary_join_element_wise(host, path, pc.fill_null(query, ''), '')
+    if scheme is not None:
+        canonical = pc.binary_join_element_wise(pc.fill_null(scheme, ''), canonical, '://')
+    return canonical
+
+
+def url_keys(urls, settings=None):
+    """Clés de jointure 64 bits des URLs (hachage de leur forme canonique)."""
+    canonical = canonicalize_urls(urls, settings)
+    return hash_keys(pd.Series(canonical, dtype=pd.ArrowDtype(pa.string())))
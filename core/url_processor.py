@@ -2,42 +2,93 @@
 Processeur d'URLs - Traitement et catégorisation des URLs
 """
 
-import advertools as adv
 import pandas as pd
 import logging
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
-from urllib.parse import urlparse
+from urllib.parse import urlparse, unquote
+from config.settings import SNAPSHOT_SETTINGS, HIERARCHY_SETTINGS
+from core.snapshots import save_snapshot, DIR_COLUMNS
+from core.exclusions import compile_exclusions
+from core.path_index import build_path_index
+from core.url_keys import url_keys
+from core.url_batches import UrlBatchWriter, iter_url_batches, processed_url_schema
+from utils.data_utils import (
+    to_categories, drop_unused_categories, assign_category, directory_columns, get_directory_columns
+)
 
 logger = logging.getLogger(__name__)
 
+# Schéma, hôte et slashs de tête retirés pour ne garder que le chemin
+URL_PREFIX_PATTERN = r'^(?:[A-Za-z][A-Za-z0-9+.-]*:)?(?://[^/?#]*)?/*'
 
-def prepare_url_directories(url_df, domain):
-    """Prépare les colonnes de répertoires pour les URLs."""
+# Query string et fragment
+URL_SUFFIX_PATTERN = r'[?#].*'
+
+# URLs en chaînes Arrow (un buffer contigu plutôt qu'un objet Python par ligne)
+URL_DTYPE = pd.StringDtype('pyarrow')
+
+
+def first_directories(urls):
+    """Extrait rapidement le premier niveau de directory (dir_1) d'une série d'URLs."""
+    dir_1 = urls.str.extract(r'^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*/+([^/?#]+)', expand=False)
+    return dir_1.fillna('no directory')
+
+
+def split_url_directories(urls, dir_columns=DIR_COLUMNS):
+    """
+    Découpe une série d'URLs en colonnes url + dir_1..dir_N en une seule passe vectorisée (Arrow).
+
+    Les URLs encodées sont décodées (comme le faisait advertools) et les
+    niveaux absents ou vides valent directement 'no directory'. Les URLs sont
+    des chaînes Arrow et les directories des catégories (codes entiers).
+    """
+    urls = urls.astype(str).reset_index(drop=True)
+    encoded = urls.str.contains('%', regex=False)
+    if encoded.any():
+        urls = urls.where(~encoded, urls[encoded].map(unquote))
+
+    url_array = pa.array(urls, type=pa.string())
+    paths = pc.replace_substring_regex(url_array, URL_PREFIX_PATTERN, '')
+    paths = pc.replace_substring_regex(paths, URL_SUFFIX_PATTERN, '')
+    # Complété par des '/' : chaque liste a au moins N+1 éléments, le dernier (reste du chemin) est ignoré
+    paths = pc.binary_join_element_wise(paths, '/' * len(dir_columns), '')
+    segments = pc.split_pattern(paths, '/', max_splits=len(dir_columns))
+
+    columns = {'url': url_array}
+    for level, dir_col in enumerate(dir_columns):
+        values = pc.list_element(segments, level)
+        columns[dir_col] = pc.dictionary_encode(pc.if_else(pc.equal(values, ''), 'no directory', values))
+    return pa.table(columns).to_pandas(types_mapper={pa.string(): URL_DTYPE}.get)
+
+
+def prepare_url_directories(url_df, domain, dir_columns=DIR_COLUMNS):
+    """Prépare les colonnes de répertoires (catégorielles) pour les URLs."""
     url_df['dominio'] = domain
 
-    # Préparation des données pour les trois niveaux
-    for dir_col in ['dir_1', 'dir_2', 'dir_3']:
+    # Les niveaux manquants (URLs peu profondes) sont complétés
+    for dir_col in dir_columns:
         if dir_col not in url_df.columns:
-            url_df[dir_col] = ""
-        url_df[dir_col] = url_df[dir_col].replace('', 'no directory').astype(str)
-        logger.info(f"Traitement du niveau {dir_col} terminé")
+            url_df[dir_col] = 'no directory'
+    url_df = to_categories(url_df, ['dominio'] + dir_columns)
+    logger.info(f"Traitement des niveaux {', '.join(dir_columns)} terminé")
 
     return url_df
 
 
 def apply_exclusions(url_df, exclusions):
-    """Applique les exclusions niveau par niveau."""
-    exclude_mask = pd.Series(False, index=url_df.index)
-
-    for dir_level, exclusion_list in exclusions.items():
-        if exclusion_list:
-            logger.info(f"Application des exclusions pour {dir_level}: {exclusion_list}")
-            exclude_mask = exclude_mask | url_df[dir_level].isin(exclusion_list)
+    """Applique les exclusions (dictionnaire de règles par niveau ou moteur déjà compilé)."""
+    engine = compile_exclusions(exclusions)
+    if not engine:
+        return url_df
 
+    exclude_mask = engine.apply(url_df)
     if exclude_mask.any():
         excluded_count = exclude_mask.sum()
         logger.info(f"Nombre d'URLs exclues: {excluded_count}")
-        url_df = url_df[~exclude_mask]
+        url_df = drop_unused_categories(url_df[~exclude_mask].copy(), get_directory_columns(url_df))
 
     return url_df
 
@@ -51,7 +102,8 @@ def filter_categories(url_df, max_categories, show_single_items):
     if not show_single_items:
         small_categories = top_categories[top_categories <= 1].index
         logger.info(f"Catégories avec une seule URL: {len(small_categories)}")
-        url_df.loc[url_df['dir_1'].isin(small_categories), 'dir_1'] = 'no directory'
+        url_df = assign_category(url_df, url_df['dir_1'].isin(small_categories), 'dir_1', 'no directory')
+        url_df = drop_unused_categories(url_df, ['dir_1'])
 
     top_categories = url_df['dir_1'].value_counts()
 
@@ -65,24 +117,63 @@ def filter_categories(url_df, max_categories, show_single_items):
 def create_final_dataframes(url_df, top_categories):
     """Crée les DataFrames finaux pour l'affichage."""
     # Création du DataFrame final
-    directories_df = url_df[url_df['dir_1'].isin(top_categories.index)][['dominio', 'dir_1', 'dir_2', 'dir_3', 'url']]
+    dir_columns = get_directory_columns(url_df)
+    directories_df = url_df[url_df['dir_1'].isin(top_categories.index)][['dominio'] + dir_columns + ['url', 'url_key']]
+    directories_df = drop_unused_categories(directories_df.copy(), dir_columns)
 
     return url_df, directories_df
 
 
-def process_urls(url, urls_df, max_categories, show_single_items, exclusions):
-    """Traite toutes les URLs récupérées depuis les sitemaps."""
-    domain = urlparse(url).netloc.replace('www.', '').split(".")[0]
+def get_domain(url):
+    """Nom de domaine court utilisé comme racine de la hiérarchie (sans www ni extension)."""
+    return urlparse(url).netloc.replace('www.', '').split(".")[0]
+
+
+def parse_urls(url, urls_df, depth=None, snapshot=True):
+    """
+    Étape de parsing : découpe toutes les URLs récupérées en directories sur `depth` niveaux.
+
+    Le résultat ne dépend que des URLs et de la profondeur : il est réutilisé tel quel
+    quand seules les exclusions ou les options de catégories changent (voir filter_urls).
+    Avec `snapshot`, l'ensemble d'URLs est enregistré dans l'historique des analyses.
+    """
+    dir_columns = directory_columns(depth or HIERARCHY_SETTINGS['default_depth'])
+    domain = get_domain(url)
     logger.info(f"Domaine extrait: {domain}")
 
-    # Conversion des URLs avec advertools
-    url_df = adv.url_to_df(urls_df['loc'].dropna().tolist())
+    # Découpage des URLs en directories
+    url_df = split_url_directories(urls_df['loc'].dropna(), dir_columns)
 
     # Préparation des répertoires
-    url_df = prepare_url_directories(url_df, domain)
+    url_df = prepare_url_directories(url_df, domain, dir_columns)
+
+    # Clé de jointure avec SEMrush (URL canonique hachée), calculée une fois par ensemble d'URLs
+    url_df['url_key'] = url_keys(url_df['url'])
+
+    # Snapshot de l'ensemble d'URLs pour l'historique des analyses
+    if snapshot and SNAPSHOT_SETTINGS['enabled']:
+        site_domain = urlparse(url).netloc.replace('www.', '')
+        save_snapshot(site_domain, url_df)
+        st.session_state.snapshot_domain = site_domain
+    elif snapshot:
+        st.session_state.snapshot_domain = None
+
+    logger.info(f"Parsing des URLs terminé - {len(url_df)} URLs")
+    return url_df
+
 
-    # Application des exclusions
-    url_df = apply_exclusions(url_df, exclusions)
+def filter_urls(url_df, max_categories, show_single_items, exclusions):
+    """
+    Étape de filtrage : exclusions et regroupement des catégories sur les URLs parsées.
+
+    `url_df` (sortie de parse_urls) n'est pas modifié et peut être refiltré avec d'autres options.
+    """
+    url_df = url_df.copy()
+
+    # Application des exclusions (règles compilées une seule fois)
+    engine = compile_exclusions(exclusions)
+    url_df = apply_exclusions(url_df, engine)
+    st.session_state.exclusion_report = engine.report()
 
     # Filtrage des catégories
     url_df, top_categories = filter_categories(url_df, max_categories, show_single_items)
@@ -90,9 +181,126 @@ def process_urls(url, urls_df, max_categories, show_single_items, exclusions):
     # Création des DataFrames finaux
     url_df, directories_df = create_final_dataframes(url_df, top_categories)
 
-    # Mise à jour du session state
+    # Mise à jour du session state (index des chemins : tableau trié par chemin et agrégat par chemin)
+    path_index = build_path_index(directories_df)
     st.session_state.url_df = url_df
-    st.session_state.directories_df = directories_df
+    st.session_state.directories_df = path_index.frame
+    st.session_state.path_index = path_index
+    st.session_state.url_directory_index = None
+    st.session_state.url_store = None
 
     logger.info("Traitement des URLs terminé avec succès")
-    return True
\ No newline at end of file
+    return True
+
+
+def process_urls(url, urls_df, max_categories, show_single_items, exclusions, depth=None):
+    """Traite toutes les URLs récupérées depuis les sitemaps, sur `depth` niveaux de directories."""
+    return filter_urls(parse_urls(url, urls_df, depth), max_categories, show_single_items, exclusions)
+
+def filter_category_counts(counts_df, max_categories, show_single_items):
+    """Équivalent de filter_categories sur un tableau agrégé (une ligne par chemin, colonne 'count')."""
+    top_categories = counts_df.groupby('dir_1', observed=True)['count'].sum().sort_values(ascending=False)
+    logger.info(f"Catégories trouvées: {len(top_categories)}")
+
+    single_categories = []
+    if not show_single_items:
+        single_categories = top_categories[top_categories <= 1].index.tolist()
+        logger.info(f"Catégories avec une seule URL: {len(single_categories)}")
+        counts_df = assign_category(counts_df, counts_df['dir_1'].isin(single_categories), 'dir_1', 'no directory')
+        counts_df = counts_df.groupby(get_directory_columns(counts_df), as_index=False, observed=True)['count'].sum()
+
+    top_categories = counts_df.groupby('dir_1', observed=True)['count'].sum().sort_values(ascending=False)
+
+    if max_categories > 0:
+        logger.info(f"Limitation aux {max_categories} premières catégories")
+        top_categories = top_categories.head(max_categories)
+
+    return counts_df, top_categories, single_categories
+
+
+def parse_url_batches(url, raw_store_path, depth=None):
+    """
+    Étape de parsing hors mémoire : découpe les URLs du stockage brut batch par batch
+    et les écrit (directories + clé de jointure) dans un second fichier Arrow.
+    """
+    dir_columns = directory_columns(depth or HIERARCHY_SETTINGS['default_depth'])
+    parsed_path = os.path.join(os.path.dirname(raw_store_path), 'parsed.arrow')
+    writer = UrlBatchWriter(parsed_path, processed_url_schema(dir_columns))
+
+    try:
+        for batch_df in iter_url_batches(raw_store_path):
+            url_df = split_url_directories(batch_df['loc'].dropna(), dir_columns)
+            url_df = prepare_url_directories(url_df, get_domain(url), dir_columns)
+            url_df['url_key'] = url_keys(url_df['url'])
+            writer.write(url_df)
+    finally:
+        writer.close()
+
+    # Pas de snapshot d'URLs en mode hors mémoire
+    st.session_state.snapshot_domain = None
+
+    logger.info(f"Parsing hors mémoire terminé - {writer.rows_written} URLs")
+    return parsed_path
+
+
+def filter_url_batches(url, parsed_store_path, max_categories, show_single_items, exclusions):
+    """
+    Étape de filtrage hors mémoire : relit les URLs parsées sans jamais charger le site entier.
+
+    Chaque batch est filtré par les exclusions puis écrit dans un troisième
+    fichier Arrow ; seuls les comptages agrégés par chemin (dir_1 à dir_N)
+    sont conservés en mémoire.
+    """
+    domain = get_domain(url)
+    processed_path = os.path.join(os.path.dirname(parsed_store_path), 'processed.arrow')
+    writer = None
+    path_counts = None
+    engine = compile_exclusions(exclusions)
+
+    try:
+        for batch_df in iter_url_batches(parsed_store_path):
+            dir_columns = get_directory_columns(batch_df)
+            if writer is None:
+                writer = UrlBatchWriter(processed_path, processed_url_schema(dir_columns))
+            url_df = apply_exclusions(to_categories(batch_df, dir_columns), engine)
+            writer.write(url_df)
+
+            batch_counts = url_df.groupby(dir_columns, dropna=False, observed=True).size()
+            path_counts = batch_counts if path_counts is None else path_counts.add(batch_counts, fill_value=0)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if path_counts is None or path_counts.empty:
+        logger.error("Aucune URL à traiter dans le stockage Arrow")
+        return False
+
+    counts_df = to_categories(path_counts.astype(int).rename('count').reset_index(), dir_columns)
+    counts_df, top_categories, single_categories = filter_category_counts(
+        counts_df, max_categories, show_single_items
+    )
+
+    directories_df = drop_unused_categories(counts_df[counts_df['dir_1'].isin(top_categories.index)].copy(), dir_columns)
+    directories_df.insert(0, 'dominio', pd.Categorical([domain] * len(directories_df)))
+
+    # Mise à jour du session state : tableaux agrégés + référence au stockage par URL
+    path_index = build_path_index(directories_df)
+    st.session_state.url_df = counts_df
+    st.session_state.directories_df = path_index.frame
+    st.session_state.path_index = path_index
+    st.session_state.url_directory_index = None
+    st.session_state.exclusion_report = engine.report()
+    st.session_state.url_store = {
+        'path': processed_path,
+        'single_categories': single_categories,
+        'top_categories': top_categories.index.tolist()
+    }
+
+    logger.info(f"Traitement hors mémoire terminé - {writer.rows_written} URLs, {len(counts_df)} chemins")
+    return True
+
+
+def process_url_batches(url, raw_store_path, max_categories, show_single_items, exclusions, depth=None):
+    """Traite les URLs stockées en batches Arrow sans jamais charger le site entier."""
+    parsed_path = parse_url_batches(url, raw_store_path, depth)
+    return filter_url_batches(url, parsed_path, max_categories, show_single_items, exclusions)
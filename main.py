@@ -13,16 +13,21 @@ st.set_page_config(layout="wide", page_title="SEO Sitemap Analyzer")
 from config.translations import get_text, get_available_languages, get_translated_dimension_options
 from core.sitemap_analyzer import analyze_website
 from core.semrush_processor import process_semrush_files
-from core.data_merger import create_main_dataframe, create_directory_performance_summary
+from core.semrush_store import get_semrush_store
+from core.data_merger import (
+    create_main_dataframe, create_directory_performance_summary, build_url_directory_index, match_url_directories
+)
 from visualizations.charts import plot_global_performance
+from visualizations.treemap import create_treemap
 from ui.components import (
     render_url_input, render_custom_sitemaps_section,
-    render_analysis_options, render_semrush_section, render_exclusions_section, render_sidebar
+    render_analysis_options, render_semrush_section, render_exclusions_section, render_sidebar,
+    render_exclusion_report, render_snapshot_history, render_keyword_search
 )
 from ui.filters import (
-    render_navigation_filters, render_statistics_metrics, render_filtered_dataframe
+    render_navigation_filters, render_statistics_metrics, render_filtered_dataframe, render_performance_filters
 )
-from utils.data_utils import clean_exclusions
+from utils.data_utils import clean_exclusions, directory_columns
 
 
 def render_language_selector():
@@ -42,36 +47,11 @@ def render_language_selector():
         if selected_lang_code != st.session_state.selected_language:
             st.session_state.selected_language = selected_lang_code
 
-            # CORRECTION: Régénérer le treemap si l'analyse est déjà faite
-            if st.session_state.analysis_done and not st.session_state.directories_df.empty:
-                import datetime
-                import plotly.express as px
-
-                # Récréer le treemap avec la nouvelle langue
-                domain = st.session_state.directories_df['dominio'].iloc[
-                    0] if 'dominio' in st.session_state.directories_df.columns else 'site'
-                today = datetime.datetime.now(datetime.timezone.utc).strftime('%B %d, %Y')
-
-                st.session_state.treemap_fig = px.treemap(
-                    st.session_state.directories_df,
-                    path=['dominio', 'dir_1', 'dir_2', 'dir_3'],
-                    title=f'{domain} Categories Structure (date: {today})',
-                    height=750
-                )
-
-                # Template et hover traduits avec la nouvelle langue
-                st.session_state.treemap_fig.update_traces(
-                    texttemplate=f"<b>%{{label}}</b><br>{get_text('pages', selected_lang_code)}: %{{value}}<br>%{{percentParent}} {get_text('of_parent', selected_lang_code)}<br>%{{percentRoot}} {get_text('of_total', selected_lang_code)}",
-                    root_color="lightgrey",
-                    hovertemplate=(
-                        f"<b>%{{label}}</b><br>"
-                        f"{get_text('label', selected_lang_code)}: %{{label}}<br>"
-                        f"{get_text('count_label', selected_lang_code)}: %{{value}}<br>"
-                        f"{get_text('parent_label', selected_lang_code)}: %{{parent}}<br>"
-                        f"{get_text('id_label', selected_lang_code)}: %{{id}}"
-                        "<extra></extra>"
-                    )
-                )
+            # CORRECTION: Régénérer le treemap si l'analyse est déjà faite (agrégat par chemin déjà calculé)
+            if st.session_state.analysis_done and st.session_state.path_index is not None:
+                rollup_df = st.session_state.path_index.rollup
+                domain = rollup_df['dominio'].iloc[0] if not rollup_df.empty else 'site'
+                st.session_state.treemap_fig = create_treemap(rollup_df, domain, selected_lang_code)
 
             st.rerun()
 
@@ -82,12 +62,24 @@ if 'url_df' not in st.session_state:
     st.session_state.url_df = pd.DataFrame()
 if 'directories_df' not in st.session_state:
     st.session_state.directories_df = pd.DataFrame()
+if 'path_index' not in st.session_state:
+    st.session_state.path_index = None
+if 'url_directory_index' not in st.session_state:
+    st.session_state.url_directory_index = None
+if 'crawl_result' not in st.session_state:
+    st.session_state.crawl_result = None
+if 'parsed_urls' not in st.session_state:
+    st.session_state.parsed_urls = None
+if 'exclusion_report' not in st.session_state:
+    st.session_state.exclusion_report = None
 if 'analysis_done' not in st.session_state:
     st.session_state.analysis_done = False
 if 'treemap_fig' not in st.session_state:
     st.session_state.treemap_fig = None
 if 'semrush_data' not in st.session_state:
     st.session_state.semrush_data = pd.DataFrame()
+if 'semrush_raw' not in st.session_state:
+    st.session_state.semrush_raw = pd.DataFrame()
 if 'num_semrush_files' not in st.session_state:
     st.session_state.num_semrush_files = 2
 if 'num_custom_sitemaps' not in st.session_state:
@@ -113,28 +105,40 @@ url = render_url_input(lang)
 custom_sitemaps = render_custom_sitemaps_section(lang)
 
 # Options d'analyse
-max_categories, show_single_items = render_analysis_options(lang)
+max_categories, show_single_items, out_of_core, depth = render_analysis_options(lang)
 
 # Section SEMrush
-semrush_files, selected_markets = render_semrush_section(lang)
+semrush_files, selected_markets, keep_semrush_raw, semrush_store_selection = render_semrush_section(lang)
 
 # Section des exclusions
-exclude_dir1, exclude_dir2, exclude_dir3 = render_exclusions_section(lang)
-
-# Bouton d'analyse
-if st.button(get_text('analyze_button', lang)):
+exclusion_inputs = render_exclusions_section(lang, depth)
+
+# Boutons d'analyse et de relance du crawl
+analyze_col, refresh_col = st.columns([1, 3])
+analyze_clicked = analyze_col.button(get_text('analyze_button', lang))
+refresh_clicked = refresh_col.button(get_text('refresh_crawl_button', lang), help=get_text('refresh_crawl_help', lang))
+if refresh_clicked:
+    # URLs récupérées oubliées : l'analyse qui suit relance le crawl
+    st.session_state.crawl_result = None
+    st.session_state.parsed_urls = None
+
+if analyze_clicked or refresh_clicked:
     if url:
         # Traitement des fichiers SEMrush
         logger.info("Début du traitement global")
-        semrush_df = process_semrush_files(semrush_files, selected_markets)
+        # Exports importés en masse : agrégats des partitions sélectionnées du stockage
+        stored_semrush_df = get_semrush_store().load_aggregates(**semrush_store_selection) \
+            if semrush_store_selection else None
+        semrush_df, semrush_raw_df = process_semrush_files(semrush_files, selected_markets, keep_semrush_raw,
+                                                           stored_semrush_df)
         if not semrush_df.empty:
             st.session_state.semrush_data = semrush_df
+            st.session_state.semrush_raw = semrush_raw_df
             logger.info(f"Données SEMrush traitées: {len(semrush_df)} lignes")
 
         exclusions = {
-            'dir_1': clean_exclusions(exclude_dir1),
-            'dir_2': clean_exclusions(exclude_dir2),
-            'dir_3': clean_exclusions(exclude_dir3)
+            dir_col: clean_exclusions(exclusion_input)
+            for dir_col, exclusion_input in zip(directory_columns(depth), exclusion_inputs)
         }
 
         # Affichage des exclusions actives
@@ -145,7 +149,7 @@ if st.button(get_text('analyze_button', lang)):
             for level, terms in active_exclusions.items():
                 st.write(f"- {level}: {', '.join(terms)}")
 
-        analyze_website(url, custom_sitemaps, max_categories, show_single_items, exclusions)
+        analyze_website(url, custom_sitemaps, max_categories, show_single_items, exclusions, out_of_core, depth)
     else:
         logger.error("URL non fournie")
         st.error(get_text('enter_valid_url', lang))
@@ -155,35 +159,31 @@ if st.session_state.analysis_done:
     # Treemap
     st.plotly_chart(st.session_state.treemap_fig, use_container_width=True)
 
+    # URLs exclues par règle
+    render_exclusion_report(st.session_state.exclusion_report, lang)
+
     # Filtres de navigation
-    selected_category, selected_subcategory, selected_subsubcategory = render_navigation_filters(
-        st.session_state.directories_df, lang
-    )
+    selections = render_navigation_filters(st.session_state.path_index, lang)
 
     # Statistiques
-    render_statistics_metrics(
-        st.session_state.directories_df,
-        selected_category,
-        selected_subcategory,
-        selected_subsubcategory,
-        lang
-    )
+    render_statistics_metrics(st.session_state.path_index, selections, lang)
 
     # Tableau filtré
-    render_filtered_dataframe(
-        st.session_state.directories_df,
-        selected_category,
-        selected_subcategory,
-        selected_subsubcategory,
-        lang
-    )
+    render_filtered_dataframe(st.session_state.path_index, selections, lang)
+
+    # Historique des analyses du domaine
+    if st.session_state.get('snapshot_domain'):
+        render_snapshot_history(st.session_state.snapshot_domain, lang)
 
 # Section SEMrush (si des données sont disponibles)
 if not st.session_state.semrush_data.empty:
     st.markdown(f"### {get_text('semrush_statistics', lang)}")
 
     # CORRECTION: Traduction des en-têtes de colonnes SEMrush
-    semrush_display_df = st.session_state.semrush_data.copy()
+    # Lignes brutes par mot-clé si elles ont été conservées, agrégat par URL sinon
+    semrush_display_df = st.session_state.semrush_raw if not st.session_state.semrush_raw.empty \
+        else st.session_state.semrush_data.drop(columns='url_key')
+    semrush_display_df = semrush_display_df.copy()
     column_translations = {
         'Keyword': get_text('keyword', lang),
         'Position': get_text('position', lang),
@@ -194,7 +194,10 @@ if not st.session_state.semrush_data.empty:
         'URL': get_text('url', lang),
         'Traffic': get_text('traffic', lang),
         'Traffic (%)': get_text('traffic_percent', lang),
-        'Traffic Cost': get_text('traffic_cost', lang)
+        'Traffic Cost': get_text('traffic_cost', lang),
+        'Number of Keywords': get_text('number_of_keywords', lang),
+        'market': get_text('market', lang),
+        'Position Type': get_text('position_type', lang)
     }
 
     # Renommer les colonnes si elles existent
@@ -208,16 +211,15 @@ if not st.session_state.semrush_data.empty:
     st.markdown(f"### {get_text('semrush_url_statistics', lang)}")
     urls_in_sitemap, urls_not_in_sitemap = create_main_dataframe(
         st.session_state.directories_df,
-        st.session_state.semrush_data
+        st.session_state.semrush_data,
+        st.session_state.get('url_store')
     )
 
     if not urls_in_sitemap.empty:
         # CORRECTION: Traduction des colonnes du tableau principal
         display_columns = {
             'url': get_text('url', lang),
-            'dir_1': 'Dir_1',
-            'dir_2': 'Dir_2',
-            'dir_3': 'Dir_3',
+            **{dir_col: f'Dir_{level}' for level, dir_col in enumerate(st.session_state.path_index.dir_columns, start=1)},
             'Traffic': get_text('traffic', lang),
             'Number of Keywords': get_text('number_of_keywords', lang),
             'market': get_text('market', lang),
@@ -253,32 +255,14 @@ if not st.session_state.semrush_data.empty:
     st.markdown(f"### {get_text('results_by_page_level', lang)}")
 
     # Filtres pour les niveaux de directory
-    perf_col1, perf_col2 = st.columns(2)
-    with perf_col1:
-        dir_1_options = [get_text('all', lang)] + sorted(urls_in_sitemap['dir_1'].unique().tolist())
-        selected_dir_1 = st.selectbox(get_text('filter_by_dir1', lang), dir_1_options, key='perf_dir_1')
-
-    with perf_col2:
-        dir_2_options = [get_text('all', lang)]
-        if selected_dir_1 != get_text('all', lang):
-            dir_2_options += sorted(
-                urls_in_sitemap[urls_in_sitemap['dir_1'] == selected_dir_1]['dir_2'].unique().tolist()
-            )
-        selected_dir_2 = st.selectbox(get_text('filter_by_dir2', lang), dir_2_options, key='perf_dir_2')
-
-    # Convertir les sélections traduites vers les valeurs originales
-    selected_dir_1 = selected_dir_1 if selected_dir_1 != get_text('all', lang) else 'Toutes'
-    selected_dir_2 = selected_dir_2 if selected_dir_2 != get_text('all', lang) else 'Toutes'
-
-    # Création et affichage du tableau de résumé
-    dir_1_filter = selected_dir_1 if selected_dir_1 != 'Toutes' else None
-    dir_2_filter = selected_dir_2 if selected_dir_2 != 'Toutes' else None
+    dir_columns = st.session_state.path_index.dir_columns
+    selected_path = render_performance_filters(urls_in_sitemap, dir_columns, lang)
 
+    # Création et affichage du tableau de résumé (agrégat par chemin partagé avec le treemap)
     performance_summary = create_directory_performance_summary(
-        st.session_state.directories_df,
+        st.session_state.path_index.rollup,
         urls_in_sitemap,
-        dir_1_filter,
-        dir_2_filter
+        selected_path
     )
 
     # CORRECTION: Traduction complète du tableau de performance
@@ -360,4 +344,56 @@ if not st.session_state.semrush_data.empty:
         )
         size_dimension = dimension_options[size_dimension_display]
 
-    plot_global_performance(performance_summary, x_dimension, y_dimension, size_dimension, lang)
\ No newline at end of file
+    plot_global_performance(performance_summary, x_dimension, y_dimension, size_dimension, lang)
+
+# Recherche de mots-clés dans les exports importés en masse
+keyword_search = render_keyword_search(lang)
+if keyword_search and not keyword_search['keywords'].empty:
+    keywords_df = keyword_search['keywords']
+    keyword_dir_columns = []
+
+    # Résultats replacés dans la hiérarchie de directories du site analysé
+    if st.session_state.analysis_done:
+        keyword_dir_columns = st.session_state.path_index.dir_columns
+        # Index construit une fois par analyse : pas de relecture du stockage Arrow à chaque rerun
+        if st.session_state.url_directory_index is None:
+            st.session_state.url_directory_index = build_url_directory_index(
+                st.session_state.directories_df,
+                st.session_state.get('url_store')
+            )
+        keyword_urls_in_sitemap = match_url_directories(st.session_state.url_directory_index, keyword_search['urls'])
+        if not keyword_urls_in_sitemap.empty:
+            keywords_df = keywords_df.merge(
+                keyword_urls_in_sitemap[['URL'] + keyword_dir_columns].drop_duplicates('URL'), on='URL', how='left'
+            )
+
+            st.markdown(f"#### {get_text('keyword_search_by_directory', lang)}")
+            keyword_summary = create_directory_performance_summary(
+                st.session_state.path_index.rollup,
+                keyword_urls_in_sitemap
+            )
+            st.dataframe(
+                keyword_summary.rename(columns={
+                    'Directory': get_text('directory', lang),
+                    'Niveau': get_text('level', lang),
+                    'Nombre URLs': get_text('url_count', lang),
+                    'Traffic Total': get_text('total_traffic', lang),
+                    'Total Mots-clés': get_text('total_keywords', lang),
+                    'Volume Total': get_text('total_volume', lang)
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
+    keyword_columns = {
+        'Keyword': get_text('keyword', lang),
+        'URL': get_text('url', lang),
+        'Position': get_text('position', lang),
+        'Position Type': get_text('position_type', lang),
+        'Traffic': get_text('traffic', lang),
+        'Search Volume': get_text('search_volume', lang),
+        'market': get_text('market', lang),
+        'period': get_text('period', lang),
+        **{dir_col: f'Dir_{level}' for level, dir_col in enumerate(keyword_dir_columns, start=1)}
+    }
+    st.dataframe(keywords_df.rename(columns=keyword_columns), use_container_width=True, hide_index=True)
@@ -0,0 +1,23 @@
+"""
+Tests de la jointure sitemap / SEMrush
+"""
+
+import pandas as pd
+from core.data_merger import build_url_directory_index, match_url_directories
+from core.url_keys import url_keys
+
+
+def test_keyword_urls_are_matched_against_the_directory_index():
+    sitemap_urls = pd.Series(['https://ex.com/a/b1', 'https://ex.com/a/b2', 'https://ex.com/c/1'])
+    sitemap_df = pd.DataFrame({
+        'dominio': 'ex.com', 'dir_1': ['a', 'a', 'c'], 'dir_2': ['b1', 'b2', 'no directory'],
+        'url': sitemap_urls, 'url_key': url_keys(sitemap_urls)
+    })
+    semrush_urls = pd.Series(['http://www.ex.com/c/1/', 'https://ex.com/missing', 'https://ex.com/a/b1'])
+    semrush_df = pd.DataFrame({'URL': semrush_urls, 'Traffic': [1.0, 2.0, 3.0], 'url_key': url_keys(semrush_urls)})
+
+    matched_df = match_url_directories(build_url_directory_index(sitemap_df), semrush_df)
+    assert matched_df[['URL', 'dir_1', 'dir_2', 'Traffic']].values.tolist() == [
+        ['http://www.ex.com/c/1/', 'c', 'no directory', 1.0],
+        ['https://ex.com/a/b1', 'a', 'b1', 3.0]
+    ]
@@ -0,0 +1,55 @@
+"""
+Tests du moteur d'exclusions
+"""
+
+import pandas as pd
+from core.exclusions import ExclusionEngine
+from utils.data_utils import clean_exclusions
+
+
+def excluded_rules(exclusions, values, dir_level='dir_1'):
+    """Règle appliquée à chaque valeur d'un niveau (-1 : valeur conservée)."""
+    engine = ExclusionEngine(exclusions)
+    url_df = pd.DataFrame({dir_level: pd.Series(values, dtype='category')})
+    return engine, list(engine.match(url_df))
+
+
+def test_backreference_rule():
+    engine, rules = excluded_rules({'dir_1': ['re:^(a)\\1$', 'page-*']}, ['aa', 'ab', 'page-2'])
+    assert rules == [0, -1, 1]
+    assert engine.rules[0]['kind'] == 'regex'
+
+
+def test_duplicate_named_groups():
+    engine, rules = excluded_rules({'dir_1': ['re:^(?P<x>a)a$', 're:^(?P<x>b)b$']}, ['aa', 'bb', 'ab'])
+    assert rules == [0, 1, -1]
+
+
+def test_backreference_not_shifted_by_other_rules():
+    _, rules = excluded_rules({'dir_1': ['fr-??', 're:^(x)(y)\\2$']}, ['xyy', 'xyx', 'fr-ca'])
+    assert rules == [1, -1, 0]
+
+
+def test_global_inline_flag():
+    engine, rules = excluded_rules({'dir_1': ['re:(?i)fr-ca', 're:(?i)^EN$']}, ['FR-CA', 'shop-fr-ca', 'en', 'de'])
+    assert rules == [0, 0, 1, -1]
+    assert [rule['kind'] for rule in engine.rules] == ['regex', 'regex']
+
+
+def test_first_rule_wins_across_kinds():
+    _, rules = excluded_rules({'dir_1': ['re:^(b)\\1', 'b*', 'bb']}, ['bbc', 'bb', 'bc'])
+    assert rules == [0, 0, 1]
+
+
+def test_invalid_rule_is_ignored():
+    engine, rules = excluded_rules({'dir_1': ['re:(', 're:^blog$']}, ['blog', 'shop'])
+    assert rules == [1, -1]
+    assert engine.rules[0]['kind'] == 'invalid'
+
+
+def test_clean_exclusions_keeps_quantifier_commas():
+    assert clean_exclusions('blog, re:^[a-z]{2,3}$ ,page-*') == ['blog', 're:^[a-z]{2,3}$', 'page-*']
+
+
+def test_clean_exclusions_escaped_comma():
+    assert clean_exclusions('a\\,b, c,, ') == ['a,b', 'c']
@@ -0,0 +1,50 @@
+"""
+Tests du client HTTP (cache disque et limiteur de débit)
+"""
+
+import requests
+from core import http_client
+from core.http_cache import HttpCache
+from core.rate_limiter import HostRateLimiter
+
+
+class CountingLimiter(HostRateLimiter):
+    """Limiteur qui compte les jetons consommés."""
+
+    def __init__(self):
+        super().__init__()
+        self.acquired = 0
+
+    def acquire(self, host):
+        self.acquired += 1
+        super().acquire(host)
+
+
+def fake_response(url, status_code=200, content=b'<urlset/>'):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'application/xml'
+    response._content = content
+    return response
+
+
+def test_fresh_cache_hits_do_not_consume_tokens(tmp_path, monkeypatch):
+    limiter = CountingLimiter()
+    cache = HttpCache(directory=str(tmp_path), max_age=3600)
+    requests_sent = []
+
+    def fake_http_get(url, timeout=None, headers=None, stream=False):
+        requests_sent.append(url)
+        return fake_response(url)
+
+    monkeypatch.setattr(http_client, 'get_rate_limiter', lambda: limiter)
+    monkeypatch.setattr(http_client, 'get_http_cache', lambda: cache)
+    monkeypatch.setattr(http_client, 'http_get', fake_http_get)
+
+    for _ in range(3):
+        response = http_client.throttled_get('https://ex.com/sitemap.xml')
+        assert response.content == b'<urlset/>'
+
+    assert len(requests_sent) == 1
+    assert limiter.acquired == 1
@@ -0,0 +1,46 @@
+"""
+Tests du limiteur de débit adaptatif (AIMD par hôte)
+"""
+
+import time
+from config.settings import RATE_LIMIT_SETTINGS
+from core.rate_limiter import HostRateLimiter
+
+SETTINGS = {**RATE_LIMIT_SETTINGS, 'initial_rate': 10.0, 'min_rate': 1.0, 'max_rate': 12.0, 'burst': 10,
+            'increase': 1.0, 'decrease_factor': 0.5}
+
+
+def test_throttle_halves_the_rate_once_per_episode():
+    limiter = HostRateLimiter(SETTINGS)
+    limiter.on_throttle('ex.com', 0.2)
+    limiter.on_throttle('ex.com', 0.2)  # réponse simultanée du même épisode
+    assert limiter._buckets['ex.com'].rate == 5.0
+
+    for _ in range(5):
+        limiter._buckets['ex.com'].blocked_until = 0.0
+        limiter.on_throttle('ex.com', 0.2)
+    assert limiter._buckets['ex.com'].rate == SETTINGS['min_rate']
+
+
+def test_successes_recover_the_rate_additively_up_to_the_maximum():
+    limiter = HostRateLimiter(SETTINGS)
+    limiter.on_throttle('ex.com', 0.0)
+    limiter.on_success('ex.com')
+    limiter.on_success('ex.com')
+    assert limiter._buckets['ex.com'].rate == 7.0
+
+    for _ in range(10):
+        limiter.on_success('ex.com')
+    assert limiter._buckets['ex.com'].rate == SETTINGS['max_rate']
+
+
+def test_throttled_host_is_paused_without_blocking_other_hosts():
+    limiter = HostRateLimiter(SETTINGS)
+    limiter.on_throttle('ex.com', 0.2)
+
+    start = time.monotonic()
+    limiter.acquire('other.com')
+    assert time.monotonic() - start < 0.05
+
+    limiter.acquire('ex.com')
+    assert time.monotonic() - start >= 0.2
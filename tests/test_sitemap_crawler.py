@@ -0,0 +1,167 @@
+"""
+Tests du crawler de sitemaps
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from core.sitemap_crawler import UrlKeySet, crawl_sitemaps, iter_crawl_sitemaps
+from core.sitemap_parser import parse_sitemap_columns
+
+DOCUMENTS = {
+    'index.xml': ('sitemapindex', pd.DataFrame({'loc': ['s1.xml', 's2.xml', 's1.xml'], 'lastmod': [None] * 3})),
+    's1.xml': ('urlset', pd.DataFrame({'loc': ['https://ex.com/a', 'https://ex.com/b', 'https://ex.com/a']})),
+    's2.xml': ('urlset', pd.DataFrame({'loc': ['https://ex.com/b', 'https://ex.com/c']})),
+}
+
+
+def fetch_document(url):
+    kind, sitemap_df = DOCUMENTS[url]
+    return kind, sitemap_df.copy()
+
+
+def test_urls_listed_twice_are_crawled_once():
+    urls_df = crawl_sitemaps(['index.xml', 'index.xml'], fetch_document)
+    assert sorted(urls_df['loc']) == ['https://ex.com/a', 'https://ex.com/b', 'https://ex.com/c']
+
+
+def test_requests_in_flight_are_limited_per_host():
+    children = [f'https://{host}/s{i}.xml' for host in ('a.com', 'b.com') for i in range(6)]
+    in_flight, peaks = {}, {}
+    lock = threading.Lock()
+
+    def fetch_slow(url):
+        host = url.split('/')[2]
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), in_flight[host])
+            peaks['all'] = max(peaks.get('all', 0), sum(in_flight.values()))
+        time.sleep(0.02)
+        with lock:
+            in_flight[host] -= 1
+        if url == 'https://a.com/index.xml':
+            return 'sitemapindex', pd.DataFrame({'loc': children, 'lastmod': [None] * len(children)})
+        return 'urlset', pd.DataFrame({'loc': [url.replace('.xml', '')]})
+
+    urls_df = crawl_sitemaps(['https://a.com/index.xml'], fetch_slow, max_concurrency=8, max_per_host=2)
+    assert len(urls_df) == len(children)
+    assert peaks['a.com'] == peaks['b.com'] == 2
+    assert 2 < peaks['all'] <= 4
+
+
+class ListSink:
+    """Sink minimal : garde les DataFrames écrits et refuse les écritures après fermeture."""
+
+    def __init__(self):
+        self.frames = []
+        self.closed = False
+
+    def write(self, df):
+        assert not self.closed
+        self.frames.append(df)
+
+
+def test_closing_the_generator_stops_the_crawl():
+    children = [f'child{i}.xml' for i in range(50)]
+    fetched = []
+
+    def fetch_many(url):
+        fetched.append(url)
+        time.sleep(0.01)
+        if url == 'index.xml':
+            return 'sitemapindex', pd.DataFrame({'loc': children, 'lastmod': [None] * len(children)})
+        return 'urlset', pd.DataFrame({'loc': [f'https://ex.com/{url}']})
+
+    sink = ListSink()
+    results = iter_crawl_sitemaps(['index.xml'], fetch_many, sink=sink, max_concurrency=1)
+    sitemap_url, url_count = next(results)
+    results.close()
+    sink.closed = True
+
+    assert url_count == 1
+    assert len(fetched) < len(children)
+
+
+def test_broken_parse_pool_is_rebuilt():
+    broken_pool = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    assert isinstance(broken_pool.submit(os._exit, 1).exception(), concurrent.futures.process.BrokenProcessPool)
+    rebuilt = []
+
+    def rebuild_parse_pool(pool):
+        rebuilt.append(pool)
+        return concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def download(url):
+        return 'application/xml', f'<urlset><url><loc>https://ex.com/{url}</loc></url></urlset>'.encode()
+
+    urls_df = crawl_sitemaps(['s1.xml', 's2.xml', 's3.xml'], download, parse_document=parse_sitemap_columns,
+                             parse_pool=broken_pool, rebuild_parse_pool=rebuild_parse_pool, max_pending=1)
+    assert sorted(urls_df['loc']) == ['https://ex.com/s1.xml', 'https://ex.com/s2.xml', 'https://ex.com/s3.xml']
+    assert rebuilt == [broken_pool]
+
+
+def test_spooled_documents_are_parsed_and_removed(tmp_path):
+    spooled = []
+
+    def download(url):
+        path = tmp_path / url
+        path.write_bytes(f'<urlset><url><loc>https://ex.com/{url}</loc></url></urlset>'.encode())
+        spooled.append(path)
+        return 'application/xml', str(path)
+
+    urls_df = crawl_sitemaps(['s1.xml', 's2.xml'], download, parse_document=parse_sitemap_columns,
+                             parse_pool=concurrent.futures.ThreadPoolExecutor(max_workers=1))
+    assert sorted(urls_df['loc']) == ['https://ex.com/s1.xml', 'https://ex.com/s2.xml']
+    assert not any(path.exists() for path in spooled)
+
+
+class CountingSink:
+    """Sink qui ne garde que le nombre de lignes écrites (mode hors mémoire)."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def write(self, df):
+        self.rows += len(df)
+
+
+def sink_crawl_peak(sitemap_count, urls_per_sitemap=2000):
+    """Pic de mémoire Python (tracemalloc) d'un crawl écrit dans un sink."""
+    def fetch_generated(url):
+        if url == 'index.xml':
+            locs = [f's{i}.xml' for i in range(sitemap_count)]
+            return 'sitemapindex', pd.DataFrame({'loc': locs, 'lastmod': [None] * sitemap_count})
+        i = int(url[1:-len('.xml')])
+        return 'urlset', pd.DataFrame({'loc': [f'https://ex.com/c{j % 50}/page-{i}-{j}'
+                                               for j in range(urls_per_sitemap)]})
+
+    sink = CountingSink()
+    tracemalloc.start()
+    try:
+        crawl_sitemaps(['index.xml'], fetch_generated, sink=sink, max_concurrency=4)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert sink.rows == sitemap_count * urls_per_sitemap
+    return peak
+
+
+def test_sink_crawl_memory_stays_bounded():
+    small_peak = sink_crawl_peak(10)
+    large_peak = sink_crawl_peak(50)
+    # Seules les clés 64 bits des URLs s'accumulent (plus une copie le temps d'une fusion), pas les URLs
+    assert (large_peak - small_peak) / (40 * 2000) < 24
+
+
+def test_url_key_set():
+    keys = UrlKeySet()
+    assert list(keys.add_new([3, 1, 3, 2])) == [True, True, False, True]
+    for start in range(0, 100, 10):
+        keys.add_new(np.arange(start, start + 10))
+    assert list(keys.add_new([5, 200, 200])) == [False, True, False]
+    assert len(keys) == 101
+    assert keys.nbytes == 8 * 101
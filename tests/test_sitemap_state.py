@@ -0,0 +1,44 @@
+"""
+Tests de l'état persistant des sitemaps
+"""
+
+import pandas as pd
+from core.sitemap_crawler import crawl_sitemaps
+from core.sitemap_state import SitemapState
+
+SITE = 'https://ex.com'
+
+
+def crawl(tmp_path, children):
+    """Crawl d'un index listant `children` (None : index en échec) avec l'état stocké dans tmp_path."""
+    def fetch_document(url):
+        if url == 'index.xml':
+            if children is None:
+                return None, pd.DataFrame()
+            return 'sitemapindex', pd.DataFrame({'loc': children, 'lastmod': ['2024-01-01'] * len(children)})
+        return 'urlset', pd.DataFrame({'loc': [f'https://ex.com/{url}']})
+
+    state = SitemapState(SITE, directory=str(tmp_path))
+    urls_df = crawl_sitemaps(['index.xml'], fetch_document, state=state)
+    return urls_df, SitemapState(SITE, directory=str(tmp_path))
+
+
+def test_children_are_reused(tmp_path):
+    crawl(tmp_path, ['s1.xml', 's2.xml'])
+    urls_df, state = crawl(tmp_path, ['s1.xml', 's2.xml'])
+    assert len(urls_df) == 2
+    assert state.load('s1.xml', '2024-01-01') is not None
+
+
+def test_failed_index_keeps_stored_children(tmp_path):
+    crawl(tmp_path, ['s1.xml', 's2.xml'])
+    _, state = crawl(tmp_path, None)
+    assert state.load('s1.xml', '2024-01-01') is not None
+    assert state.load('s2.xml', '2024-01-01') is not None
+
+
+def test_children_no_longer_listed_are_pruned(tmp_path):
+    crawl(tmp_path, ['s1.xml', 's2.xml'])
+    _, state = crawl(tmp_path, ['s1.xml'])
+    assert state.load('s1.xml', '2024-01-01') is not None
+    assert state.load('s2.xml', '2024-01-01') is None
@@ -0,0 +1,24 @@
+"""
+Tests des clés de jointure des URLs
+"""
+
+import pandas as pd
+from core.url_keys import canonicalize_urls, url_keys
+from core.url_processor import split_url_directories
+
+
+def test_encoded_url_matches_decoded_sitemap_url():
+    semrush_urls = pd.Series(['https://www.ex.com/%C3%A9t%C3%A9/', 'https://ex.com/%c3%a9t%c3%a9'])
+    sitemap_urls = split_url_directories(pd.Series(['https://www.ex.com/%C3%A9t%C3%A9/']))['url']
+    keys = url_keys(semrush_urls)
+    assert keys[0] == keys[1] == url_keys(sitemap_urls)[0]
+
+
+def test_percent_encoding_is_normalized():
+    canonical = canonicalize_urls(['https://ex.com/été/a b?q=%c3%a9', 'https://ex.com/plain/'])
+    assert canonical.to_pylist() == ['ex.com/%C3%A9t%C3%A9/a%20b?q=%C3%A9', 'ex.com/plain']
+
+
+def test_tracking_parameters_removed():
+    canonical = canonicalize_urls(['https://www.ex.com:443/a/?utm_source=x&id=1#top'])
+    assert canonical.to_pylist() == ['ex.com/a?id=1']
@@ -2,9 +2,22 @@
 Composants UI réutilisables
 """
 
+import os
+import time
+import pandas as pd
 import streamlit as st
-from config.settings import MARKETS
-from config.translations import get_text
+from config.settings import MARKETS, DEFAULT_LIMITS, HIERARCHY_SETTINGS, SEMRUSH_CACHE_SETTINGS
+from config.translations import get_text, get_level_text
+from core.semrush_cache import get_semrush_cache
+from core.semrush_store import get_semrush_store
+from core.snapshots import list_snapshots, load_snapshot, diff_snapshots
+from core.url_processor import first_directories
+
+# Intervalle minimal (secondes) entre deux rafraîchissements de la progression du crawl
+CRAWL_PROGRESS_INTERVAL = 0.5
+
+# Nombre de catégories dir_1 affichées pendant le crawl
+CRAWL_PROGRESS_TOP_CATEGORIES = 20
 
 
 def render_url_input(lang='fr'):
@@ -37,7 +50,12 @@ def render_analysis_options(lang='fr'):
     """Affiche les options d'analyse."""
     max_categories = st.number_input(get_text('max_categories', lang), -1, 100, -1)
     show_single_items = st.checkbox(get_text('show_single_items', lang))
-    return max_categories, show_single_items
+    out_of_core = st.checkbox(get_text('out_of_core_mode', lang), help=get_text('out_of_core_help', lang))
+    depth = st.number_input(
+        get_text('hierarchy_depth', lang), 1, HIERARCHY_SETTINGS['max_depth'], HIERARCHY_SETTINGS['default_depth'],
+        help=get_text('hierarchy_depth_help', lang)
+    )
+    return max_categories, show_single_items, out_of_core, int(depth)
 
 
 def render_semrush_section(lang='fr'):
@@ -56,38 +74,198 @@ def render_semrush_section(lang='fr'):
             market = st.selectbox(get_text('market', lang), MARKETS, key=f"market_{i}")
             selected_markets.append(market)
 
-    if st.session_state.get('num_semrush_files', 2) < 6:
+    if st.session_state.get('num_semrush_files', 2) < DEFAULT_LIMITS['max_semrush_files']:
         if st.button(get_text('add_file', lang), key="add_semrush_file_btn"):
             st.session_state['num_semrush_files'] = st.session_state.get('num_semrush_files', 2) + 1
             st.rerun()
 
-    return semrush_files, selected_markets
+    keep_raw = st.checkbox(get_text('semrush_keep_raw', lang), help=get_text('semrush_keep_raw_help', lang))
 
+    if SEMRUSH_CACHE_SETTINGS['enabled']:
+        render_semrush_cache(lang)
 
-def render_exclusions_section(lang='fr'):
-    """Affiche la section des exclusions."""
-    st.subheader(get_text('exclusions_title', lang))
-    col1, col2, col3 = st.columns(3)
+    store_selection = render_semrush_bulk_import(lang)
 
-    with col1:
-        exclude_dir1 = st.text_input(
-            get_text('exclusions_dir1', lang),
-            help=get_text('exclusions_help1', lang)
-        )
+    return semrush_files, selected_markets, keep_raw, store_selection
 
-    with col2:
-        exclude_dir2 = st.text_input(
-            get_text('exclusions_dir2', lang),
-            help=get_text('exclusions_help2', lang)
+
+def render_semrush_bulk_import(lang='fr'):
+    """
+    Affiche l'import en masse d'exports SEMrush (archive zip ou répertoire local)
+    et retourne la sélection du stockage à analyser ({markets, period}) ou None.
+    """
+    store = get_semrush_store()
+
+    with st.expander(get_text('semrush_bulk_title', lang)):
+        st.caption(get_text('semrush_bulk_help', lang))
+        col1, col2 = st.columns(2)
+        with col1:
+            archive = st.file_uploader(get_text('semrush_bulk_zip', lang), type=['zip'], key="semrush_bulk_zip")
+        with col2:
+            directory = st.text_input(get_text('semrush_bulk_directory', lang), key="semrush_bulk_directory").strip()
+
+        if st.button(get_text('semrush_bulk_button', lang), key="semrush_bulk_import_btn"):
+            if archive is None and not os.path.isdir(directory):
+                st.error(get_text('semrush_bulk_no_source', lang))
+            else:
+                progress = st.progress(0.0)
+                report_df = store.ingest(
+                    archive if archive is not None else directory,
+                    on_progress=lambda done, total: progress.progress(done / total)
+                )
+                status_counts = report_df['status'].value_counts()
+                st.success(get_text('semrush_bulk_done', lang).format(
+                    ingested=status_counts.get('ingested', 0),
+                    duplicates=status_counts.get('duplicate', 0),
+                    failed=status_counts.get('error', 0) + status_counts.get('skipped', 0)
+                ))
+                failed_df = report_df[report_df['status'].isin(['error', 'skipped'])]
+                if not failed_df.empty:
+                    st.dataframe(pd.DataFrame({
+                        get_text('file_name', lang): failed_df['file'],
+                        get_text('market', lang): failed_df['market'],
+                        get_text('semrush_bulk_error', lang): failed_df['error'].where(
+                            failed_df['status'] == 'error', get_text('semrush_bulk_no_market', lang))
+                    }), use_container_width=True, hide_index=True)
+
+        partitions_df = store.partitions()
+        if partitions_df.empty:
+            st.info(get_text('semrush_bulk_empty', lang))
+            return None
+
+        st.dataframe(
+            partitions_df.rename(columns={
+                'market': get_text('market', lang),
+                'period': get_text('period', lang),
+                'exports': get_text('semrush_bulk_exports', lang),
+                'keywords': get_text('number_of_keywords', lang),
+                'urls': get_text('url_count', lang)
+            }),
+            use_container_width=True,
+            hide_index=True
         )
 
+        use_store = st.checkbox(get_text('semrush_bulk_use', lang), key="semrush_bulk_use")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            store_markets = st.multiselect(get_text('semrush_bulk_markets', lang),
+                                           sorted(partitions_df['market'].unique()), key="semrush_bulk_markets",
+                                           help=get_text('semrush_bulk_markets_help', lang))
+        with col2:
+            latest = get_text('latest_period', lang)
+            period = st.selectbox(get_text('period', lang),
+                                  [latest] + sorted(partitions_df['period'].unique(), reverse=True),
+                                  key="semrush_bulk_period")
+
+        if st.button(get_text('semrush_bulk_clear', lang), key="clear_semrush_store_btn"):
+            store.clear()
+            st.rerun()
+
+    if not use_store:
+        return None
+    return {'markets': store_markets or None, 'period': None if period == latest else period}
+
+
+def render_keyword_search(lang='fr'):
+    """
+    Affiche la recherche de mots-clés dans les exports importés en masse et
+    retourne le résultat de la recherche (voir SemrushStore.search_keywords) ou None.
+    """
+    store = get_semrush_store()
+    exports_df = store.exports()
+    if exports_df.empty:
+        return None
+
+    st.markdown(f"### {get_text('keyword_search', lang)}")
+    col1, col2, col3, col4 = st.columns([3, 1, 2, 1])
+    with col1:
+        query = st.text_input(get_text('keyword_search_query', lang), key="keyword_search_query",
+                              help=get_text('keyword_search_help', lang))
+    with col2:
+        mode = st.radio(get_text('keyword_search_mode', lang), ['prefix', 'tokens'],
+                        format_func=lambda search_mode: get_text(f'keyword_search_{search_mode}', lang),
+                        key="keyword_search_mode")
     with col3:
-        exclude_dir3 = st.text_input(
-            get_text('exclusions_dir3', lang),
-            help=get_text('exclusions_help3', lang)
-        )
+        markets = st.multiselect(get_text('semrush_bulk_markets', lang), sorted(exports_df['market'].unique()),
+                                 key="keyword_search_markets", help=get_text('semrush_bulk_markets_help', lang))
+    with col4:
+        latest = get_text('latest_period', lang)
+        period = st.selectbox(get_text('period', lang), [latest] + sorted(exports_df['period'].unique(), reverse=True),
+                              key="keyword_search_period")
+
+    if not query.strip():
+        return None
+
+    result = store.search_keywords(query, mode, markets or None, None if period == latest else period)
+    if result['total'] == 0:
+        st.info(get_text('keyword_search_none', lang))
+    else:
+        st.caption(get_text('keyword_search_results', lang).format(total=result['total'],
+                                                                   shown=len(result['keywords'])))
+    return result
+
+
+def render_semrush_cache(lang='fr'):
+    """Affiche le contenu du cache des exports SEMrush, avec un bouton pour le vider."""
+    cache = get_semrush_cache()
+    entries_df = cache.entries()
+    size_mb = entries_df['size'].sum() / (1024 * 1024)
+
+    with st.expander(f"{get_text('semrush_cache', lang)} ({len(entries_df)} - {size_mb:,.1f} MB)"):
+        if entries_df.empty:
+            st.info(get_text('semrush_cache_empty', lang))
+            return
 
-    return exclude_dir1, exclude_dir2, exclude_dir3
+        display_df = pd.DataFrame({
+            get_text('file_name', lang): entries_df['name'],
+            get_text('market', lang): entries_df['market'],
+            get_text('number_of_keywords', lang): entries_df['rows'],
+            get_text('semrush_keep_raw', lang): entries_df['has_raw'].astype(bool),
+            'MB': (entries_df['size'] / (1024 * 1024)).round(1),
+            get_text('last_used', lang): pd.to_datetime(entries_df['last_access'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+        })
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+        if st.button(get_text('semrush_cache_clear', lang), key="clear_semrush_cache_btn"):
+            cache.clear()
+            st.rerun()
+
+
+def render_exclusions_section(lang='fr', depth=3):
+    """Affiche la section des exclusions (un champ par niveau de directory)."""
+    st.subheader(get_text('exclusions_title', lang))
+    st.caption(get_text('exclusions_syntax', lang))
+    cols = st.columns(min(depth, 3))
+
+    exclusion_inputs = []
+    for level in range(1, depth + 1):
+        with cols[(level - 1) % 3]:
+            exclusion_inputs.append(st.text_input(
+                get_level_text(('exclusions_dir1', 'exclusions_dir2', 'exclusions_dir3'), 'exclusions_dir_n', level,
+                               lang),
+                help=get_level_text(('exclusions_help1', 'exclusions_help2', 'exclusions_help3'), 'exclusions_help_n',
+                                    level, lang)
+            ))
+
+    return exclusion_inputs
+
+
+def render_exclusion_report(report_df, lang='fr'):
+    """Affiche le nombre d'URLs exclues par chaque règle d'exclusion."""
+    if report_df is None or report_df.empty:
+        return
+
+    with st.expander(f"{get_text('exclusion_report', lang)} ({report_df['excluded'].sum():,})"):
+        st.dataframe(
+            report_df.rename(columns={
+                'level': get_text('level', lang),
+                'pattern': get_text('exclusion_rule', lang),
+                'kind': get_text('rule_type', lang),
+                'excluded': get_text('urls_excluded', lang)
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
 
 
 def render_sidebar(lang='fr'):
@@ -110,4 +288,96 @@ def render_sidebar(lang='fr'):
 
     **{get_text('exclusions_config', lang)} :**  
     {get_text('exclusions_warning', lang)}
-    """)
\ No newline at end of file
+    """)
+
+def render_snapshot_history(domain, lang='fr'):
+    """Affiche la comparaison entre deux analyses enregistrées d'un domaine."""
+    st.markdown(f"### {get_text('snapshot_history', lang)}")
+
+    snapshot_ids = list_snapshots(domain)
+    if len(snapshot_ids) < 2:
+        st.info(get_text('snapshot_none', lang))
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        reference_id = st.selectbox(get_text('snapshot_reference', lang), snapshot_ids, index=1,
+                                    key='snapshot_reference')
+    with col2:
+        compared_id = st.selectbox(get_text('snapshot_compared', lang), snapshot_ids, index=0,
+                                   key='snapshot_compared')
+
+    diff = diff_snapshots(load_snapshot(domain, reference_id), load_snapshot(domain, compared_id))
+
+    metrics_cols = st.columns(3)
+    metrics_cols[0].metric(get_text('urls_added', lang), f"{len(diff['added']):,}")
+    metrics_cols[1].metric(get_text('urls_removed', lang), f"{len(diff['removed']):,}")
+    metrics_cols[2].metric(get_text('urls_moved', lang), f"{len(diff['moved']):,}")
+
+    summary_display_df = diff['summary'].rename(columns={
+        'Directory': get_text('directory', lang),
+        'Niveau': get_text('level', lang),
+        'added': get_text('urls_added', lang),
+        'removed': get_text('urls_removed', lang),
+        'moved_in': get_text('moved_in', lang),
+        'moved_out': get_text('moved_out', lang)
+    })
+    st.dataframe(summary_display_df, use_container_width=True)
+
+    with st.expander(get_text('urls_added', lang)):
+        st.dataframe(diff['added'], use_container_width=True)
+    with st.expander(get_text('urls_removed', lang)):
+        st.dataframe(diff['removed'], use_container_width=True)
+    with st.expander(get_text('urls_moved', lang)):
+        st.dataframe(
+            diff['moved'].rename(columns={'url_old': get_text('old_url', lang), 'url_new': get_text('new_url', lang)}),
+            use_container_width=True
+        )
+
+
+class CrawlProgress:
+    """
+    Zones de progression du crawl : nombre de sitemaps et d'URLs récupérés et
+    répartition dir_1 provisoire, mises à jour à chaque sitemap terminé.
+    """
+
+    def __init__(self, lang='fr'):
+        self.lang = lang
+        self.sitemaps = 0
+        self.urls = 0
+        self.dir_1_counts = pd.Series(dtype='int64')
+        self._rendered_at = 0.0
+        self._metrics_placeholder = st.empty()
+        self._chart_placeholder = st.empty()
+
+    @staticmethod
+    def summarize(sitemap_df):
+        """Résumé d'un sitemap pour la progression : (nombre d'URLs, répartition dir_1)."""
+        if sitemap_df.empty:
+            return 0, pd.Series(dtype='int64')
+        return len(sitemap_df), first_directories(sitemap_df['loc'].dropna()).value_counts()
+
+    def __call__(self, sitemap_url, sitemap_df):
+        self.add(sitemap_url, self.summarize(sitemap_df))
+
+    def add(self, sitemap_url, summary):
+        """Ajoute le résumé d'un sitemap terminé (voir summarize)."""
+        url_count, dir_1_counts = summary
+        self.sitemaps += 1
+        self.urls += url_count
+        if url_count:
+            self.dir_1_counts = self.dir_1_counts.add(dir_1_counts, fill_value=0)
+
+        # Rafraîchissement limité pour ne pas saturer le front sur des milliers de sitemaps
+        if time.monotonic() - self._rendered_at >= CRAWL_PROGRESS_INTERVAL:
+            self.render()
+
+    def render(self):
+        """Affiche l'état courant de la progression."""
+        self._rendered_at = time.monotonic()
+        with self._metrics_placeholder.container():
+            cols = st.columns(2)
+            cols[0].metric(get_text('crawl_sitemaps_done', self.lang), f"{self.sitemaps:,}")
+            cols[1].metric(get_text('crawl_urls_found', self.lang), f"{self.urls:,}")
+        top_dir_1 = self.dir_1_counts.sort_values(ascending=False).head(CRAWL_PROGRESS_TOP_CATEGORIES)
+        self._chart_placeholder.bar_chart(top_dir_1.rename(get_text('crawl_partial_breakdown', self.lang)))
@@ -4,54 +4,51 @@ Logique des filtres et navigation dans l'interface (structure qui fonctionne)
 
 import streamlit as st
 from utils.data_utils import get_url_statistics, filter_and_display_urls
-from config.translations import get_text
+from config.translations import get_text, get_level_text
 
-def render_navigation_filters(directories_df, lang='fr'):
-    """Affiche les filtres de navigation et retourne les sélections."""
-    st.write(f"### {get_text('navigation_filters', lang)}")
-    cols = st.columns(3)
-
-    with cols[0]:
-        categories = [get_text('all', lang)] + sorted(directories_df['dir_1'].unique())
-        selected_category = st.selectbox(get_text('select_category', lang), categories)
-
-    with cols[1]:
-        subcategories = [get_text('all', lang)]
-        if selected_category != get_text('all', lang):
-            subcategories += sorted(
-                directories_df[
-                    directories_df['dir_1'] == selected_category
-                ]['dir_2'].unique().tolist()
-            )
-        selected_subcategory = st.selectbox(get_text('select_subcategory', lang), subcategories)
-
-    with cols[2]:
-        subsubcategories = [get_text('all', lang)]
-        if selected_subcategory != get_text('all', lang) and selected_category != get_text('all', lang):
-            subsubcategories += sorted(
-                directories_df[
-                    (directories_df['dir_1'] == selected_category) &
-                    (directories_df['dir_2'] == selected_subcategory)
-                ]['dir_3'].unique().tolist()
-            )
-        selected_subsubcategory = st.selectbox(get_text('select_subsubcategory', lang), subsubcategories)
+# Libellés dédiés des trois premiers niveaux (les suivants utilisent une clé générique)
+SELECT_LEVEL_KEYS = ('select_category', 'select_subcategory', 'select_subsubcategory')
+LEVEL_HELP_KEYS = ('category_urls_help', 'subcategory_urls_help', 'subsubcategory_urls_help')
+FILTER_LEVEL_KEYS = ('filter_by_dir1', 'filter_by_dir2')
 
-    # Convertir les sélections traduites vers les valeurs originales
-    selected_category = selected_category if selected_category != get_text('all', lang) else 'Toutes'
-    selected_subcategory = selected_subcategory if selected_subcategory != get_text('all', lang) else 'Toutes'
-    selected_subsubcategory = selected_subsubcategory if selected_subsubcategory != get_text('all', lang) else 'Toutes'
+# Nombre maximum de filtres par ligne
+FILTERS_PER_ROW = 3
+
+
+def render_navigation_filters(path_index, lang='fr'):
+    """Affiche les filtres de navigation (un par niveau de directory) et retourne les sélections."""
+    st.write(f"### {get_text('navigation_filters', lang)}")
+    depth = len(path_index.dir_columns)
+    cols = st.columns(min(depth, FILTERS_PER_ROW))
+
+    selections = []
+    path = ()
+    for level in range(1, depth + 1):
+        options = [get_text('all', lang)]
+        # Un niveau n'est proposé que si tous les niveaux précédents sont sélectionnés
+        if len(path) == level - 1:
+            options += path_index.children(path)
+        with cols[(level - 1) % FILTERS_PER_ROW]:
+            selection = st.selectbox(get_level_text(SELECT_LEVEL_KEYS, 'select_dir_n', level, lang), options)
+
+        # Convertir les sélections traduites vers les valeurs originales
+        if selection != get_text('all', lang):
+            selections.append(selection)
+            if len(path) == level - 1:
+                path += (selection,)
+        else:
+            selections.append('Toutes')
 
-    return selected_category, selected_subcategory, selected_subsubcategory
+    return selections
 
 
-def render_statistics_metrics(directories_df, selected_category, selected_subcategory, selected_subsubcategory,
-                              lang='fr'):
+def render_statistics_metrics(path_index, selections, lang='fr'):
     """Affiche les métriques de statistiques."""
     st.markdown(f"### {get_text('url_statistics', lang)}")
 
     with st.container():
-        metrics_cols = st.columns([1, 1, 1, 1])
-        stats = get_url_statistics(directories_df, selected_category, selected_subcategory, selected_subsubcategory)
+        stats = get_url_statistics(path_index, selections)
+        metrics_cols = st.columns(len(stats['levels']) + 1)
 
         metrics_cols[0].metric(
             label=get_text('total_urls', lang),
@@ -59,77 +56,59 @@ def render_statistics_metrics(directories_df, selected_category, selected_subcat
             help=get_text('total_urls_help', lang)
         )
 
-        # CORRECTION: Utiliser la nouvelle traduction pour les catégories
-        if stats['dir1'][0] != '-':
-            if stats['dir1'][0] == 'Toutes':
-                label = get_text('category_urls', lang)
+        for level, (directory, count) in enumerate(stats['levels'], start=1):
+            # CORRECTION: Utiliser la nouvelle traduction pour les catégories
+            if directory == '-':
+                label = f"URLs Dir_{level}"
+            elif level == 1:
+                label = get_text('category_urls', lang) if directory == 'Toutes' \
+                    else f"{get_text('category_urls', lang)} {directory}"
             else:
-                label = f"{get_text('category_urls', lang)} {stats['dir1'][0]}"
-        else:
-            label = f"URLs Dir_1"
-
-        metrics_cols[1].metric(
-            label=label,
-            value=stats['dir1'][1],
-            help=get_text('category_urls_help', lang)
-        )
-
-        if stats['dir2'][0] != '-':
-            label = f"URLs {stats['dir2'][0]}"
-        else:
-            label = f"URLs Dir_2"
+                label = f"URLs {directory}"
 
-        metrics_cols[2].metric(
-            label=label,
-            value=stats['dir2'][1],
-            help=get_text('subcategory_urls_help', lang)
-        )
-
-        if stats['dir3'][0] != '-':
-            label = f"URLs {stats['dir3'][0]}"
-        else:
-            label = f"URLs Dir_3"
-
-        metrics_cols[3].metric(
-            label=label,
-            value=stats['dir3'][1],
-            help=get_text('subsubcategory_urls_help', lang)
-        )
+            metrics_cols[level].metric(
+                label=label,
+                value=count,
+                help=get_level_text(LEVEL_HELP_KEYS, 'dir_n_urls_help', level, lang)
+            )
 
-def render_filtered_dataframe(directories_df, selected_category, selected_subcategory, selected_subsubcategory, lang='fr'):
+def render_filtered_dataframe(path_index, selections, lang='fr'):
     """Affiche le tableau filtré des URLs."""
-    filtered_df = filter_and_display_urls(directories_df, selected_category, selected_subcategory, selected_subsubcategory)
+    filtered_df = filter_and_display_urls(path_index, selections)
+
+    column_config = {"dominio": st.column_config.TextColumn(get_text('domain', lang), width=150)}
+    for level, dir_col in enumerate(path_index.dir_columns, start=1):
+        column_config[dir_col] = st.column_config.TextColumn(f"Dir_{level}", width=100)
+    column_config["url"] = st.column_config.TextColumn("URL", width=None)
+    column_config["url_key"] = None
 
     st.dataframe(
         filtered_df,
         use_container_width=True,
-        column_config={
-            "dominio": st.column_config.TextColumn(get_text('domain', lang), width=150),
-            "dir_1": st.column_config.TextColumn("Dir_1", width=100),
-            "dir_2": st.column_config.TextColumn("Dir_2", width=100),
-            "dir_3": st.column_config.TextColumn("Dir_3", width=100),
-            "url": st.column_config.TextColumn("URL", width=None),
-        }
+        column_config=column_config
     )
 
-def render_performance_filters(urls_in_sitemap, lang='fr'):
-    """Affiche les filtres pour les performances par niveau de directory."""
-    col1, col2 = st.columns(2)
-
-    with col1:
-        dir_1_options = [get_text('all', lang)] + sorted(urls_in_sitemap['dir_1'].unique().tolist())
-        selected_dir_1 = st.selectbox(get_text('filter_by_dir1', lang), dir_1_options, key='perf_dir_1')
-
-    with col2:
-        dir_2_options = [get_text('all', lang)]
-        if selected_dir_1 != get_text('all', lang):
-            dir_2_options += sorted(
-                urls_in_sitemap[urls_in_sitemap['dir_1'] == selected_dir_1]['dir_2'].unique().tolist()
-            )
-        selected_dir_2 = st.selectbox(get_text('filter_by_dir2', lang), dir_2_options, key='perf_dir_2')
-
-    # Convertir les sélections traduites vers les valeurs originales
-    selected_dir_1 = selected_dir_1 if selected_dir_1 != get_text('all', lang) else 'Toutes'
-    selected_dir_2 = selected_dir_2 if selected_dir_2 != get_text('all', lang) else 'Toutes'
-
-    return selected_dir_1, selected_dir_2
+def render_performance_filters(urls_in_sitemap, dir_columns, lang='fr'):
+    """
+    Affiche les filtres pour les performances par niveau de directory et retourne
+    le chemin sélectionné (le résumé porte sur le niveau suivant, d'où N-1 filtres).
+    """
+    filter_columns = dir_columns[:-1] or dir_columns[:1]
+    cols = st.columns(min(len(filter_columns), FILTERS_PER_ROW))
+
+    path = ()
+    filtered = urls_in_sitemap
+    for level, dir_col in enumerate(filter_columns, start=1):
+        options = [get_text('all', lang)]
+        if len(path) == level - 1:
+            options += sorted(filtered[dir_col].dropna().unique().tolist())
+        with cols[(level - 1) % FILTERS_PER_ROW]:
+            selection = st.selectbox(get_level_text(FILTER_LEVEL_KEYS, 'filter_by_dir_n', level, lang), options,
+                                     key=f'perf_{dir_col}')
+
+        # Convertir les sélections traduites vers les valeurs originales
+        if selection != get_text('all', lang) and len(path) == level - 1:
+            path += (selection,)
+            filtered = filtered[filtered[dir_col] == selection]
+
+    return path
@@ -3,85 +3,94 @@ Utilitaires pour la manipulation de données
 """
 
 import logging
+import re
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Virgule séparant deux exclusions : ni échappée (\,) ni à l'intérieur d'accolades (re:^[a-z]{2,3}$)
+EXCLUSION_SEPARATOR_PATTERN = re.compile(r'(?<!\\),(?![^{}]*\})')
+
 def clean_exclusions(exclusion_string):
     """Nettoie et prépare la liste des exclusions."""
     logger.info(f"Nettoyage des exclusions: {exclusion_string}")
     if not exclusion_string:
         return []
-    cleaned = [item.strip() for item in exclusion_string.split(',') if item.strip()]
+    items = (item.replace('\\,', ',').strip() for item in EXCLUSION_SEPARATOR_PATTERN.split(exclusion_string))
+    cleaned = [item for item in items if item]
     logger.info(f"Exclusions nettoyées: {cleaned}")
     return cleaned
 
-def get_url_statistics(directories_df, selected_category='Toutes', selected_subcategory='Toutes', selected_subsubcategory='Toutes'):
-    """Calcule les statistiques des URLs pour chaque niveau de catégorie."""
-    logger.info(
-        f"Calcul des statistiques - Catégorie: {selected_category}, Sous-catégorie: {selected_subcategory}, Sous-sous-catégorie: {selected_subsubcategory}")
-    total_urls = len(directories_df)
-
-    if selected_category == 'Toutes':
-        logger.info(f"Statistiques globales - Total URLs: {total_urls}")
-        return {
-            'total': total_urls,
-            'dir1': ('Toutes', total_urls),
-            'dir2': ('-', '-'),
-            'dir3': ('-', '-')
-        }
-
-    dir1_df = directories_df[directories_df['dir_1'] == selected_category]
-    dir1_count = len(dir1_df)
-    logger.info(f"URLs pour la catégorie {selected_category}: {dir1_count}")
-
-    if selected_subcategory == 'Toutes':
-        return {
-            'total': total_urls,
-            'dir1': (selected_category, dir1_count),
-            'dir2': ('-', '-'),
-            'dir3': ('-', '-')
-        }
-
-    dir2_df = dir1_df[dir1_df['dir_2'] == selected_subcategory]
-    dir2_count = len(dir2_df)
-    logger.info(f"URLs pour la sous-catégorie {selected_subcategory}: {dir2_count}")
-
-    if selected_subsubcategory == 'Toutes':
-        return {
-            'total': total_urls,
-            'dir1': (selected_category, dir1_count),
-            'dir2': (selected_subcategory, dir2_count),
-            'dir3': ('-', '-')
-        }
-
-    dir3_df = dir2_df[dir2_df['dir_3'] == selected_subsubcategory]
-    dir3_count = len(dir3_df)
-    logger.info(f"URLs pour la sous-sous-catégorie {selected_subsubcategory}: {dir3_count}")
-
+def hash_keys(values):
+    """Hache une série de chaînes en clés entières 64 bits (vectorisé)."""
+    return pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+
+def directory_columns(depth):
+    """Noms des colonnes de directories pour une profondeur donnée (dir_1 à dir_N)."""
+    return [f'dir_{level}' for level in range(1, depth + 1)]
+
+def get_directory_columns(df):
+    """Colonnes de directories présentes dans un tableau, dans l'ordre des niveaux."""
+    levels = [int(column[len('dir_'):]) for column in df.columns if re.fullmatch(r'dir_\d+', str(column))]
+    return directory_columns(max(levels)) if levels else []
+
+def to_categories(df, columns):
+    """Encode des colonnes en catégories (dictionnaire de valeurs + codes entiers)."""
+    for column in columns:
+        if not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+def drop_unused_categories(df, columns):
+    """Retire des colonnes catégorielles les valeurs qui n'apparaissent plus après un filtrage."""
+    for column in columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.remove_unused_categories()
+    return df
+
+def assign_category(df, mask, column, value):
+    """Affecte une valeur aux lignes sélectionnées d'une colonne catégorielle (catégorie ajoutée si besoin)."""
+    if isinstance(df[column].dtype, pd.CategoricalDtype) and value not in df[column].cat.categories:
+        df[column] = df[column].cat.add_categories([value])
+    df.loc[mask, column] = value
+    return df
+
+def selected_path(selections):
+    """Préfixe de chemin sélectionné : les sélections jusqu'au premier niveau à 'Toutes'."""
+    path = []
+    for selection in selections:
+        if selection == 'Toutes':
+            break
+        path.append(selection)
+    return tuple(path)
+
+def get_url_statistics(path_index, selections=()):
+    """
+    Calcule les statistiques des URLs pour chaque niveau de catégorie (lectures dans l'index des chemins).
+
+    `levels` contient un couple (directory, nombre d'URLs) par niveau : ('Toutes', total)
+    au premier niveau sans sélection, ('-', '-') pour les niveaux non sélectionnés.
+    """
+    path = selected_path(selections)
+    logger.info(f"Calcul des statistiques - Chemin: {'/'.join(path) or 'Toutes'}")
+    total_urls = path_index.count()
+
+    levels = [(directory, path_index.count(path[:level + 1])) for level, directory in enumerate(path)]
+    if not path:
+        levels.append(('Toutes', total_urls))
+    levels += [('-', '-')] * (len(path_index.dir_columns) - len(levels))
+
+    logger.info(f"Statistiques - Total URLs: {total_urls}, niveaux: {levels}")
     return {
         'total': total_urls,
-        'dir1': (selected_category, dir1_count),
-        'dir2': (selected_subcategory, dir2_count),
-        'dir3': (selected_subsubcategory, dir3_count)
+        'levels': levels
     }
 
-def filter_and_display_urls(directories_df, selected_category, selected_subcategory='Toutes', selected_subsubcategory='Toutes'):
-    """Filtre les URLs en fonction des catégories sélectionnées."""
-    logger.info(
-        f"Application des filtres - Catégorie: {selected_category}, Sous-catégorie: {selected_subcategory}, Sous-sous-catégorie: {selected_subsubcategory}")
-    if selected_category == 'Toutes':
-        logger.info("Retour de toutes les URLs sans filtre")
-        return directories_df
-
-    filtered_df = directories_df[directories_df['dir_1'] == selected_category]
-    logger.info(f"URLs après filtre dir_1: {len(filtered_df)}")
-
-    if selected_subcategory != 'Toutes':
-        filtered_df = filtered_df[filtered_df['dir_2'] == selected_subcategory]
-        logger.info(f"URLs après filtre dir_2: {len(filtered_df)}")
-
-    if selected_subsubcategory != 'Toutes':
-        filtered_df = filtered_df[filtered_df['dir_3'] == selected_subsubcategory]
-        logger.info(f"URLs après filtre dir_3: {len(filtered_df)}")
+def filter_and_display_urls(path_index, selections=()):
+    """Filtre les URLs en fonction des catégories sélectionnées (plage de lignes de l'index des chemins)."""
+    path = selected_path(selections)
+    logger.info(f"Application des filtres - Chemin: {'/'.join(path) or 'aucun'}")
 
-    return filtered_df
\ No newline at end of file
+    filtered_df = path_index.rows(path)
+    logger.info(f"URLs après filtre {'/'.join(path) or 'aucun'}: {len(filtered_df)}")
+    return filtered_df
@@ -5,26 +5,39 @@ import plotly.express as px
 import datetime
 import logging
 from config.translations import get_text
+from utils.data_utils import get_directory_columns
 
 logger = logging.getLogger(__name__)
 
-def create_treemap(directories_df, domain, lang='fr'):
-    """Crée le treemap de la structure du site avec traductions."""
+def create_treemap(rollup_df, domain, lang='fr'):
+    """
+    Crée le treemap de la structure du site avec traductions, à partir de l'agrégat
+    par chemin complet (colonnes dominio, dir_1..dir_N et count).
+    """
     logger.info("Création du treemap")
 
     today = datetime.datetime.now(datetime.timezone.utc).strftime('%B %d, %Y')
 
     treemap_fig = px.treemap(
-        directories_df,
-        path=['dominio', 'dir_1', 'dir_2', 'dir_3'],
+        rollup_df,
+        path=['dominio'] + get_directory_columns(rollup_df),
+        values='count',
         title=f'{domain} Categories Structure (date: {today})',
         height=750
     )
 
-    # CORRECTION: Template traduit
+    # CORRECTION: Template et hover traduits
     treemap_fig.update_traces(
         texttemplate=f"<b>%{{label}}</b><br>{get_text('pages', lang)}: %{{value}}<br>%{{percentParent}} {get_text('of_parent', lang)}<br>%{{percentRoot}} {get_text('of_total', lang)}",
-        root_color="lightgrey"
+        root_color="lightgrey",
+        hovertemplate=(
+            f"<b>%{{label}}</b><br>"
+            f"{get_text('label', lang)}: %{{label}}<br>"
+            f"{get_text('count_label', lang)}: %{{value}}<br>"
+            f"{get_text('parent_label', lang)}: %{{parent}}<br>"
+            f"{get_text('id_label', lang)}: %{{id}}"
+            "<extra></extra>"
+        )
     )
 
     return treemap_fig
\ No newline at end of file